@@ -0,0 +1,75 @@
+"""
+BelgeResolver'ın doğruluğunu gerçek belge adlarıyla (dokuman_listesi.txt) sınar
+ve çözümleme hızını ölçer.
+
+Beklenen eşleşmeler regresyon vakalarıdır: başlığında başka bir kanunu anan
+yönetmelik/usul ve esaslar ("... 4734 sayılı Kamu İhale Kanununun ... Hakkında
+Yönetmelik") o kanunun numarasıyla eşlenmemeli, külliyat dışı kanunlar
+çözülmeden kalmalıdır.
+
+Kullanım:
+    python -m benchmarks.bench_belge_resolver --tekrar 2000
+"""
+import argparse
+import re
+import sys
+import time
+
+from src.belge_resolver import BelgeResolver
+
+_G_BENDI = ("Türkiye Elektrik Dağıtım A.Ş. Genel Müdürlüğünün 4734 Sayılı Kamu İhale Kanununun 3 üncü "
+            "maddesinin (g) Bendi Kapsamında Yapacağı Mal ve Hizmet Alımları Hakkında Yönetmelik")
+
+# (ham atıf hedefi, beklenen kanonik isim; None = çözülmemeli)
+VAKALAR = [
+    ("6446 sayılı kanun", "6446 sayılı Güncel Elektrik Piyasası Kanunu"),
+    ("399 sayılı KHK'nin", "399 Sayılı KHK"),
+    ("233 sayılı Kanun Hükmünde Kararname", "233 Sayılı KHK"),
+    ("Türkiye İstatistik Kanunu", "5429 Türkiye İstatistik Kanunu"),
+    ("7429 Sayılı Kanun Kapsamında Hazırlanmış Usul ve Esaslar",
+     "7429 Sayılı Kanun Kapsamında Hazırlanmış Usul ve Esaslar"),
+    # Başlıkta yalnızca anılan kanun numaraları belgenin kendi numarası değildir
+    ("7244 sayılı Kanun", None),
+    ("7429 sayılı Kanun", None),
+    ("4734 sayılı Kamu İhale Kanunu", None),
+]
+# Yalnızca (g) Bendi yönetmeliği yüklüyken de 4734 sayılı Kanun ona çözülmemeli
+TEK_BELGE_VAKALARI = [([_G_BENDI], "4734 sayılı Kamu İhale Kanunu", None)]
+
+
+def load_names(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [re.sub(r"\.pdf$", "", line.strip().replace("/", "\\").split("\\")[-1])
+                for line in f if line.strip().endswith(".pdf")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Belge adı çözümleme doğruluğu ve hızı")
+    parser.add_argument("--liste", default="dokuman_listesi.txt", help="Belge adlarının alınacağı yükleme raporu")
+    parser.add_argument("--tekrar", type=int, default=2000, help="Hız ölçümünde çözülen ad sayısı")
+    args = parser.parse_args()
+
+    names = load_names(args.liste)
+    resolver = BelgeResolver(names)
+    print(f"{len(names)} kanonik belge adı")
+
+    hatalar = 0
+    vakalar = [(None, ham, beklenen) for ham, beklenen in VAKALAR] + TEK_BELGE_VAKALARI
+    for kanonik, ham, beklenen in vakalar:
+        sonuc = (BelgeResolver(kanonik) if kanonik else resolver).resolve(ham)
+        dogru = sonuc == beklenen
+        hatalar += not dogru
+        print(f"  {'✓' if dogru else '✗'} {ham!r} -> {sonuc!r}" + ("" if dogru else f" (beklenen {beklenen!r})"))
+
+    start = time.perf_counter()
+    for i in range(args.tekrar):
+        # Önbelleği atlatmak için her seferinde yeni ad
+        resolver.resolve(f"{VAKALAR[i % len(VAKALAR)][0]} {i}")
+    elapsed = time.perf_counter() - start
+    print(f"Çözümleme: {args.tekrar / elapsed:,.0f} ad/sn ({elapsed / args.tekrar * 1e6:.1f} µs/ad)")
+    print("Regresyon vakaları:", "hepsi doğru" if not hatalar else f"{hatalar} hata")
+    sys.exit(1 if hatalar else 0)
+
+
+if __name__ == "__main__":
+    main()
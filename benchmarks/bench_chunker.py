@@ -0,0 +1,117 @@
+"""
+Büyük belgelerde chunk'lama hızını ve bellek kullanımını ölçer: eski
+'chunk_document_by_article' (tüm metin üzerinde re.split + çağrı başına yeni
+bölücü) ile 'iter_chunks'ın sayfa sayfa okuyan akış yolu karşılaştırılır.
+Girdi, sentetik külliyattaki belgelerin birleştirilmesiyle elde edilen çok
+megabaytlık tek bir konsolide metindir; sayfalar sabit uzunlukta parçalardır.
+Üç yolun ürettiği chunk'ların birebir aynı olduğu da doğrulanır.
+
+Kullanım:
+    python -m benchmarks.bench_chunker --mb 8 --page-chars 3000
+"""
+import argparse
+import contextlib
+import io
+import re
+import time
+import tracemalloc
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from benchmarks.corpus import generate_corpus
+from src.chunker import chunk_document_by_article, iter_chunks, parse_madde_basligi
+from src.config import MADDE_REGEX, CHUNK_SIZE, CHUNK_OVERLAP
+
+
+def _legacy_chunk_document_by_article(document_text: str) -> list:
+    """Değişiklikten önceki chunker: tüm metin bellekte, her çağrıda yeni bölücü."""
+    sub_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, separators=["\n\n", "\n", ". ", " ", ""]
+    )
+    parts = re.split(MADDE_REGEX, document_text, flags=re.IGNORECASE | re.MULTILINE)
+    chunks = []
+    giris_metni = parts[0].strip()
+    if giris_metni:
+        if len(giris_metni) > CHUNK_SIZE:
+            for j, sub_text in enumerate(sub_splitter.split_text(giris_metni)):
+                chunks.append({"metin": sub_text, "madde_basligi_tahmini": f"Giriş (Bölüm {j+1})",
+                               "madde_turu": None, "madde_no": None, "bolum": j + 1})
+        else:
+            chunks.append({"metin": giris_metni, "madde_basligi_tahmini": "Giriş",
+                           "madde_turu": None, "madde_no": None, "bolum": None})
+    for i in range(1, len(parts), 2):
+        madde_basligi = parts[i].strip()
+        madde_icerigi = parts[i + 1].strip() if (i + 1) < len(parts) else ""
+        full_chunk_text = f"{madde_basligi}\n{madde_icerigi}"
+        madde_basligi_tahmini = madde_basligi.split('\n')[0]
+        madde_turu, madde_no = parse_madde_basligi(madde_basligi_tahmini)
+        if len(full_chunk_text) > CHUNK_SIZE:
+            for j, sub_text in enumerate(sub_splitter.split_text(madde_icerigi)):
+                chunks.append({"metin": f"{madde_basligi}\n(Bölüm {j+1})\n{sub_text}",
+                               "madde_basligi_tahmini": f"{madde_basligi_tahmini} (Bölüm {j+1})",
+                               "madde_turu": madde_turu, "madde_no": madde_no, "bolum": j + 1})
+        else:
+            chunks.append({"metin": full_chunk_text.strip(), "madde_basligi_tahmini": madde_basligi_tahmini,
+                           "madde_turu": madde_turu, "madde_no": madde_no, "bolum": None})
+    return chunks
+
+
+def _large_text(megabytes: float, madde_sayisi: int) -> str:
+    pieces, size, seed = [], 0, 0
+    while size < megabytes * 1024 * 1024:
+        for doc in generate_corpus(20, madde_sayisi, seed=seed):
+            pieces.append(doc.metin)
+            size += len(doc.metin)
+        seed += 1
+    return "".join(pieces)
+
+
+def _pages(text: str, page_chars: int):
+    for start in range(0, len(text), page_chars):
+        yield text[start:start + page_chars]
+
+
+def _measure(label: str, run, text_chars: int):
+    """Süreyi ve (tracemalloc ile) girdiye ek tepe bellek kullanımını ölçer."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        chunk_count, result = run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {elapsed:8.3f} sn  {text_chars / elapsed / 1e6:7.2f} M char/sn  "
+          f"{chunk_count:7d} chunk  tepe bellek {peak / 1e6:8.1f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk'lama benchmark'ı (büyük belgeler)")
+    parser.add_argument("--mb", type=float, default=8.0, help="Birleştirilmiş belge boyutu (MB)")
+    parser.add_argument("--maddeler", type=int, default=60, help="Sentetik belge başına madde sayısı")
+    parser.add_argument("--page-chars", type=int, default=3000, help="Sayfa başına karakter")
+    args = parser.parse_args()
+
+    text = _large_text(args.mb, args.maddeler)
+    print(f"Girdi: {len(text) / 1e6:.1f} M karakter, {len(text) // args.page_chars + 1} sayfa")
+
+    legacy = _measure("eski (re.split, tüm metin)",
+                      lambda: (len(chunks := _legacy_chunk_document_by_article(text)), chunks), len(text))
+    current = _measure("chunk_document_by_article",
+                       lambda: (len(chunks := chunk_document_by_article(text)), chunks), len(text))
+
+    def stream():
+        # Chunk'lar biriktirilmeden tüketilir (yazma aşamasına aktarılıyormuş gibi)
+        count = 0
+        for _ in iter_chunks(_pages(text, args.page_chars)):
+            count += 1
+        return count, None
+
+    _measure("iter_chunks (sayfa sayfa, akış)", stream, len(text))
+    with contextlib.redirect_stdout(io.StringIO()):
+        streamed = list(iter_chunks(_pages(text, args.page_chars)))
+    print("Çıktılar aynı:", legacy == current == streamed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+CSV dışa aktarımının (main_ingest.py --csv-export) transaction'lı yazma yoluyla
+aynı grafı kurduğunu doğrular ve iki yolun yazma süresini karşılaştırır.
+
+Sentetik külliyat sahte Ollama ile bir kez hazırlanır (chunk, embedding, atıf
+çıkarımı); aynı satırlar hem GraphBuilder.write_document ile sahte Neo4j'ye
+hem CsvGraphExporter ile CSV'ye yazılır. CSV dosyaları neo4j-admin'in başlık
+kurallarıyla geri okunur ve iki graf nod/ilişki/özellik düzeyinde karşılaştırılır.
+
+Kullanım:
+    python -m benchmarks.bench_csv_export --docs 20 --maddeler 40 --neo4j-latency 0.002
+"""
+import argparse
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import time
+
+from benchmarks.corpus import generate_corpus, write_corpus
+from benchmarks.fake_neo4j import FakeDriver
+from benchmarks.fake_ollama import FakeOllamaServer
+from src.belge_resolver import BelgeResolver
+from src.csv_export import ARRAY_DELIMITER, CsvGraphExporter
+from src.data_loader import load_documents_from_path
+from src.embedding_utils import EmbeddingGenerator
+from src.graph_builder import GraphBuilder
+
+_SCALARS = {"long": int, "double": float, "string": str, "boolean": lambda value: value == "true"}
+
+
+def _read_csv(path: str) -> list:
+    """neo4j-admin başlık tiplerine göre satırları sözlük olarak okur (boş alan = özellik yok)."""
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = []
+        for values in reader:
+            row = {}
+            for column, value in zip(header, values):
+                if value == "":
+                    continue
+                name, _, tip = column.partition(":")
+                tip = tip.split("(")[0] or "string"
+                if tip.endswith("[]"):
+                    cast = _SCALARS[tip[:-2]]
+                    row[name or tip] = tuple(cast(v) for v in value.split(ARRAY_DELIMITER))
+                elif tip in _SCALARS:
+                    row[name or tip] = _SCALARS[tip](value)
+                else:
+                    row[f"{name}:{tip}" if name else tip] = value
+            rows.append(row)
+        return rows
+
+
+def _csv_graph(out_dir: str) -> dict:
+    def read(name):
+        return _read_csv(os.path.join(out_dir, name))
+
+    chunks = {row["ID"]: row for row in read("chunk.csv")}
+    key = {cid: (row["kaynak_belge"], row["sira"]) for cid, row in chunks.items()}
+    return {
+        "kurum": {row["isim:ID"] for row in read("kurum.csv")},
+        "belge": {row["isim:ID"]: (row.get("tur"), row.get("kurum"), row.get("icerik_hash"), row.get("sema_surumu"),
+                                   row.get("eksik"))
+                  for row in read("belge.csv")},
+        "chunk": {key[cid]: (row["metin"], row.get("kurum"), row.get("tur"), row.get("madde_turu"),
+                             row.get("madde_no"), row.get("bolum"), row["embedding"]) for cid, row in chunks.items()},
+        "yayinladi": {(row["START_ID"], row["END_ID"]) for row in read("yayinladi.csv")},
+        "icerir": {(row["START_ID"], key[row["END_ID"]]) for row in read("icerir.csv")},
+        "atif_yapar": {(key[row["START_ID"]], row["END_ID"]): tuple(zip(row.get("madde_turu", ()), row.get("madde", ())))
+                       for row in read("atif_yapar.csv")},
+        "atif_madde": {(key[row["START_ID"]], key[row["END_ID"]]) for row in read("atif_madde.csv")},
+    }
+
+
+def _fake_graph(graph) -> dict:
+    def key(cid):
+        return graph.chunks[cid]["kaynak_belge"], graph.chunks[cid]["sira"]
+
+    return {
+        "kurum": set(graph.kurumlar),
+        "belge": {isim: (b.get("tur"), b.get("kurum"), b.get("icerik_hash"), b.get("sema_surumu"), b.get("eksik"))
+                  for isim, b in graph.belgeler.items()},
+        "chunk": {key(cid): (c["metin"], c["kurum"], c["tur"], c["madde_turu"], c["madde_no"], c["bolum"],
+                             tuple(c["embedding"])) for cid, c in graph.chunks.items()},
+        "yayinladi": {(kurum, belge) for belge, kurum in graph.yayinlayan.items()},
+        "icerir": {(belge, key(cid)) for belge, cids in graph.belge_chunklari.items() for cid in cids},
+        "atif_yapar": {(key(cid), hedef): tuple(maddeler)
+                       for cid, hedefler in graph.atiflar.items() for hedef, maddeler in hedefler.items()},
+        "atif_madde": {(key(cid), key(hedef)) for cid, hedefler in graph.atif_madde.items() for hedef in hedefler},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV dışa aktarımı ile transaction'lı yazma karşılaştırması")
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--maddeler", type=int, default=40, help="Belge başına madde sayısı")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--neo4j-latency", type=float, default=0.002, help="Sorgu başına gidiş-dönüş (sn)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir, \
+            FakeOllamaServer(request_latency=0.0, item_latency=0.0, chat_latency=0.0, token_latency=0.0) as server:
+        data_dir = os.path.join(work_dir, "data")
+        write_corpus(data_dir, generate_corpus(args.docs, args.maddeler, seed=args.seed))
+        with contextlib.redirect_stdout(io.StringIO()):
+            documents = load_documents_from_path(data_dir, workers=1)
+            builder = GraphBuilder(None, EmbeddingGenerator(host=server.url), host=server.url,
+                                   resolver=BelgeResolver(doc.isim for doc in documents))
+            prepared = [(doc, builder.prepare_chunks(doc)) for doc in documents]
+        chunk_count = sum(len(rows) for _, rows in prepared)
+        print(f"Girdi: {len(documents)} belge, {chunk_count} chunk")
+
+        driver = FakeDriver(round_trip_latency=args.neo4j_latency)
+        builder.driver = driver
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for doc, rows in prepared:
+                builder.write_document(doc, rows)
+        transactional = time.perf_counter() - start
+        print(f"transaction'lı yazma (sahte Neo4j) {transactional:8.3f} sn  {driver.query_count} sorgu")
+
+        out_dir = os.path.join(work_dir, "import")
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            exporter = CsvGraphExporter(out_dir)
+            for doc, rows in prepared:
+                exporter.add_document(doc, rows)
+            exporter.finish()
+        exported = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(out_dir, name)) for name in os.listdir(out_dir))
+        print(f"CSV dışa aktarımı                 {exported:8.3f} sn  {size / 1e6:.1f} MB")
+        print(exporter.stats())
+
+        beklenen, csv_grafi = _fake_graph(driver.graph), _csv_graph(out_dir)
+        for part in beklenen:
+            ayni = beklenen[part] == csv_grafi[part]
+            print(f"  {part:<11} {len(beklenen[part]):6d} {'aynı' if ayni else 'FARKLI'}")
+        print("Graflar aynı:", beklenen == csv_grafi)
+
+
+if __name__ == "__main__":
+    main()
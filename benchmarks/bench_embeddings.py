@@ -0,0 +1,62 @@
+"""
+Embedding üretim hızını ölçer: tek tek 'get_embedding' çağrıları ile
+toplu/eşzamanlı 'get_embeddings' karşılaştırılır. Gerçek Ollama yerine
+yerel sahte sunucu kullanılır, böylece yalnızca istemci tarafı ve ağ
+gidiş-dönüşlerinin maliyeti ölçülür.
+
+Kullanım:
+    python -m benchmarks.bench_embeddings --chunks 500 --request-latency 0.02
+"""
+import argparse
+import time
+
+from benchmarks.fake_ollama import FakeOllamaServer
+from src.embedding_utils import EmbeddingGenerator
+
+
+def _sample_texts(n: int) -> list:
+    return [
+        f"Madde {i}\n(1) Bu madde kapsamında lisans sahibi tüzel kişiler "
+        f"{i} sayılı karar uyarınca Kuruma bildirimde bulunur."
+        for i in range(n)
+    ]
+
+
+def _measure(label: str, func, texts: list, server: FakeOllamaServer):
+    server.request_count = 0
+    start = time.perf_counter()
+    results = func(texts)
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for r in results if r is None)
+    print(f"{label:<32} {elapsed:8.3f} sn  {len(texts) / elapsed:9.1f} chunk/sn  "
+          f"istek: {server.request_count:5d}  hata: {failed}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding toplu işleme benchmark'ı")
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--request-latency", type=float, default=0.02)
+    parser.add_argument("--item-latency", type=float, default=0.002)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    texts = _sample_texts(args.chunks)
+    with FakeOllamaServer(request_latency=args.request_latency,
+                          item_latency=args.item_latency) as server:
+        baseline = EmbeddingGenerator(host=server.url)
+        expected = _measure("sıralı get_embedding", lambda t: [baseline.get_embedding(x) for x in t],
+                            texts, server)
+
+        for batch_size in args.batch_sizes:
+            for concurrency in args.concurrency:
+                generator = EmbeddingGenerator(host=server.url, batch_size=batch_size,
+                                               max_concurrency=concurrency)
+                results = _measure(f"get_embeddings b={batch_size} c={concurrency}",
+                                   generator.get_embeddings, texts, server)
+                assert results == expected, "Toplu sonuçlar girdi sırasıyla eşleşmiyor!"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Neo4j yazma hızını ölçer: eski chunk başına oturum + atıf başına 'session.run'
+yolu ile GraphBuilder.write_document'ın tek transaction'lı UNWIND yolu
+karşılaştırılır. Çalışan bir Neo4j gerekir (bağlantı bilgileri src/config.py).
+Benchmark geçici '__bench__' belgelerini yazar ve sonunda siler.
+
+Kullanım:
+    python -m benchmarks.bench_neo4j_writes --chunks 300 --citations 2
+"""
+import argparse
+import random
+import time
+
+from neo4j import GraphDatabase
+
+from src.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
+from src.data_loader import Document
+from src.graph_builder import GraphBuilder, BELGE_WRITE_CYPHER
+
+BENCH_PREFIX = "__bench__"
+
+
+def _make_rows(n_chunks: int, n_citations: int, dim: int) -> list:
+    rng = random.Random(42)
+    return [
+        {
+            "sira": i,
+            "metin": f"Madde {i}\n(1) Sentetik benchmark metni {i}.",
+            "embedding": [rng.uniform(-1.0, 1.0) for _ in range(dim)],
+            "atiflar": [
+                {"hedef_belge_isim": f"{BENCH_PREFIX} hedef {j}", "madde_listesi": [j + 1]}
+                for j in range(n_citations)
+            ],
+        }
+        for i in range(n_chunks)
+    ]
+
+
+def _legacy_write(driver, doc: Document, rows: list):
+    """Değişiklikten önceki yazma yolu: her chunk ve her atıf ayrı bir gidiş-dönüş."""
+    with driver.session(database=NEO4J_DATABASE) as session:
+        session.run(BELGE_WRITE_CYPHER, kurum_isim=doc.kurum, belge_isim=doc.isim, belge_tur=doc.tur)
+    for row in rows:
+        with driver.session(database=NEO4J_DATABASE) as session:
+            result = session.run(
+                """
+                MATCH (b:BELGE {isim: $belge_isim})
+                CREATE (c:CHUNK {metin: $metin, kaynak_belge: $belge_isim, embedding: $embedding})
+                CREATE (b)-[:ICERIR]->(c)
+                RETURN elementId(c) AS chunk_id
+                """,
+                belge_isim=doc.isim, metin=row["metin"], embedding=row["embedding"]
+            )
+            chunk_id = result.single()["chunk_id"]
+            for atif in row["atiflar"]:
+                session.run(
+                    """
+                    MATCH (c:CHUNK) WHERE elementId(c) = $chunk_id
+                    MERGE (b_hedef:BELGE {isim: $hedef_belge_isim})
+                    MERGE (c)-[r:ATIF_YAPAR]->(b_hedef)
+                    SET r.madde = $madde_listesi
+                    """,
+                    chunk_id=chunk_id,
+                    hedef_belge_isim=atif["hedef_belge_isim"],
+                    madde_listesi=atif["madde_listesi"]
+                )
+
+
+def _cleanup(driver):
+    with driver.session(database=NEO4J_DATABASE) as session:
+        session.run(
+            """
+            MATCH (b:BELGE) WHERE b.isim STARTS WITH $prefix
+            OPTIONAL MATCH (b)-[:ICERIR]->(c:CHUNK)
+            DETACH DELETE c, b
+            """,
+            prefix=BENCH_PREFIX
+        )
+        session.run("MATCH (k:KURUM {isim: $isim}) DETACH DELETE k", isim=BENCH_PREFIX)
+
+
+def _report(label: str, elapsed: float, rows: list):
+    writes = len(rows) + sum(len(r["atiflar"]) for r in rows)
+    print(f"{label:<28} {elapsed:8.3f} sn  {len(rows) / elapsed:9.1f} chunk/sn  "
+          f"{writes / elapsed:9.1f} yazım/sn")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neo4j yazma benchmark'ı")
+    parser.add_argument("--chunks", type=int, default=300)
+    parser.add_argument("--citations", type=int, default=2, help="Chunk başına atıf sayısı")
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    rows = _make_rows(args.chunks, args.citations, args.dim)
+    builder = GraphBuilder(driver, embedder=None)
+    try:
+        _cleanup(driver)
+        legacy_doc = Document(f"{BENCH_PREFIX} eski", BENCH_PREFIX, "Kanun", "", "")
+        start = time.perf_counter()
+        _legacy_write(driver, legacy_doc, rows)
+        _report("eski (chunk başına oturum)", time.perf_counter() - start, rows)
+
+        bulk_doc = Document(f"{BENCH_PREFIX} toplu", BENCH_PREFIX, "Kanun", "", "")
+        start = time.perf_counter()
+        builder.write_document(bulk_doc, rows, batch_size=args.batch_size)
+        _report(f"UNWIND (batch={args.batch_size})", time.perf_counter() - start, rows)
+    finally:
+        _cleanup(driver)
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Sorgu tarafı getirme (retrieval) gecikmesini ölçer: eski üç oturumlu yol
+(vektör arama, ilişki sorgusu, her ilişki için ayrı derin gezinti sorgusu) ile
+ChatRetriever.retrieve'in tek transaction'lı birleşik sorgusu karşılaştırılır.
+Sorular chat_history.txt'den alınır; embedding'ler ölçümden önce üretilir,
+böylece yalnızca Neo4j tarafı ölçülür. Çalışan Neo4j ve Ollama gerekir.
+
+Kullanım:
+    python -m benchmarks.bench_retrieval --repeat 5
+"""
+import argparse
+import time
+
+from neo4j import GraphDatabase
+
+from benchmarks.stats import summarize, load_questions
+from src.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
+from src.embedding_utils import EmbeddingGenerator
+from src.retriever import ChatRetriever
+
+
+def legacy_retrieve(driver, query_embedding, k_seed: int = 5) -> int:
+    """Değişiklikten önceki getirme yolu. Neo4j gidiş-dönüş sayısını döndürür."""
+    round_trips = 0
+    with driver.session(database=NEO4J_DATABASE) as session:
+        seeds = [r.data() for r in session.run(
+            """
+            CALL db.index.vector.queryNodes('chunk_embeddings', $k, $embedding)
+            YIELD node AS chunk, score
+            MATCH (b_kaynak:BELGE)-[:ICERIR]->(chunk)
+            MATCH (k_kaynak:KURUM)-[:YAYINLADI]->(b_kaynak)
+            RETURN elementId(chunk) AS chunk_id, chunk.metin AS metin,
+                   b_kaynak.isim AS kaynak_belge, k_kaynak.isim AS kaynak_kurum, score
+            ORDER BY score DESC LIMIT $k
+            """, k=k_seed, embedding=query_embedding)]
+        round_trips += 1
+    with driver.session(database=NEO4J_DATABASE) as session:
+        relations = [r.data() for r in session.run(
+            """
+            MATCH (c:CHUNK)-[r:ATIF_YAPAR]->(b_hedef:BELGE)
+            WHERE elementId(c) IN $chunk_ids
+            RETURN b_hedef.isim AS hedef_belge, r.madde AS hedef_maddeler
+            """, chunk_ids=[s["chunk_id"] for s in seeds])]
+        round_trips += 1
+    with driver.session(database=NEO4J_DATABASE) as session:
+        for relation in relations:
+            if not relation["hedef_maddeler"]:
+                continue
+            list(session.run(
+                """
+                MATCH (c:CHUNK)
+                WHERE c.kaynak_belge = $belge_isim AND c.madde_no IN $maddeler
+                RETURN c.metin AS metin
+                """, belge_isim=relation["hedef_belge"], maddeler=relation["hedef_maddeler"]))
+            round_trips += 1
+    return round_trips
+
+
+def _print_row(label: str, timings: list, round_trips: list):
+    summary = summarize(timings)
+    print(f"{label:<26} p50 {summary['p50_ms']:7.1f} ms  p95 {summary['p95_ms']:7.1f} ms  "
+          f"ort. gidiş-dönüş {sum(round_trips) / len(round_trips):5.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Getirme gecikmesi benchmark'ı")
+    parser.add_argument("--history", default="chat_history.txt")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    questions = load_questions(args.history)
+    embedder = EmbeddingGenerator()
+    embeddings = [e for e in embedder.get_embeddings(questions) if e]
+    print(f"{len(embeddings)} soru, her biri {args.repeat} kez ölçülecek.")
+
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    retriever = ChatRetriever(driver, embedder, lexical_routing=False)
+    try:
+        legacy_times, legacy_trips = [], []
+        new_times, new_trips = [], []
+        for _ in range(args.repeat):
+            for embedding in embeddings:
+                start = time.perf_counter()
+                legacy_trips.append(legacy_retrieve(driver, embedding, args.k))
+                legacy_times.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                retriever.retrieve(embedding, k_seed=args.k)
+                new_times.append(time.perf_counter() - start)
+                new_trips.append(1)
+        _print_row("eski (3 oturum + N sorgu)", legacy_times, legacy_trips)
+        _print_row("birleşik tek sorgu", new_times, new_trips)
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
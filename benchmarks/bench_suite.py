@@ -0,0 +1,207 @@
+"""
+Çevrim dışı uçtan uca benchmark paketi: canlı Neo4j ve Ollama gerekmez.
+
+Sentetik bir Türkçe mevzuat külliyatı üretilir (benchmarks/corpus.py) ve
+şu aşamalar ölçülür:
+  chunking   -> chunk_document_by_article (belge başına)
+  loading    -> load_documents_from_path (PDF okuma, belge başına süre)
+  ingestion  -> GraphBuilder.process_document (sahte Ollama + sahte Neo4j)
+  query      -> ChatRetriever.get_response (sahte Ollama + sahte Neo4j)
+
+Sonuçlar (throughput ve p50/p95/p99 gecikme) makinece okunabilir JSON olarak
+ekrana ve isteğe bağlı olarak --output dosyasına yazılır; böylece farklı
+commit'lerin sonuçları karşılaştırılabilir.
+
+Kullanım:
+    python -m benchmarks.bench_suite --docs 12 --questions 30 --output bench_sonuc.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+
+from benchmarks.corpus import generate_corpus, write_corpus, sample_questions
+from benchmarks.fake_neo4j import FakeDriver
+from benchmarks.fake_ollama import FakeOllamaServer
+from benchmarks.stats import summarize
+from src.chunker import chunk_document_by_article
+from src.config import RETRIEVAL_MODE
+from src.belge_resolver import BelgeResolver
+from src.data_loader import LoadReport, load_documents_from_path
+from src.embedding_utils import EmbeddingGenerator
+from src.graph_builder import GraphBuilder
+from src.retriever import ChatRetriever
+
+
+@contextlib.contextmanager
+def _quiet(enabled: bool = True):
+    """Ölçülen kodun ekran çıktılarını bastırır (print maliyeti ölçüme karışmasın)."""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _result(latencies: list, elapsed: float, items: int, unit: str, **extra) -> dict:
+    return {
+        **summarize(latencies),
+        "toplam_sn": elapsed,
+        "birim": unit,
+        "adet": items,
+        "throughput_per_sn": items / elapsed if elapsed > 0 else 0.0,
+        **extra,
+    }
+
+
+def bench_chunking(corpus, quiet: bool) -> dict:
+    latencies, chunk_count = [], 0
+    start = time.perf_counter()
+    for doc in corpus:
+        t = time.perf_counter()
+        with _quiet(quiet):
+            chunk_count += len(chunk_document_by_article(doc.metin))
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    return _result(latencies, elapsed, chunk_count, "chunk", belge=len(corpus))
+
+
+def bench_loading(data_dir: str, workers: int, quiet: bool):
+    report = LoadReport()
+    start = time.perf_counter()
+    with _quiet(quiet):
+        documents = load_documents_from_path(data_dir, workers=workers, report=report)
+    elapsed = time.perf_counter() - start
+    return documents, _result(list(report.timings.values()), elapsed, len(documents), "belge",
+                              isci=workers, hatali=len(report.failed) + len(report.empty))
+
+
+def bench_ingestion(documents, driver, server_url: str, extraction_mode: str, resolve: bool, quiet: bool) -> dict:
+    with _quiet(quiet):
+        embedder = EmbeddingGenerator(host=server_url)
+        resolver = BelgeResolver(doc.isim for doc in documents) if resolve else None
+        builder = GraphBuilder(driver, embedder, extraction_mode=extraction_mode, host=server_url,
+                               resolver=resolver)
+    latencies = []
+    chunks_before = len(driver.graph.chunks)
+    start = time.perf_counter()
+    for doc in documents:
+        t = time.perf_counter()
+        with _quiet(quiet):
+            builder.process_document(doc)
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    chunk_count = len(driver.graph.chunks) - chunks_before
+    return _result(latencies, elapsed, len(documents), "belge", chunk=chunk_count,
+                   chunk_per_sn=chunk_count / elapsed if elapsed > 0 else 0.0,
+                   llm_cikarim=builder.llm_extractions, kural_cikarim=builder.rule_extractions,
+                   belge_dugumu=len(driver.graph.belgeler),
+                   cozulen_atif=resolver.resolved if resolver else 0)
+
+
+def bench_query(questions, driver, server_url: str, use_answer_cache: bool, retrieval_mode: str,
+                quiet: bool) -> dict:
+    with _quiet(quiet):
+        embedder = EmbeddingGenerator(host=server_url)
+        retriever = ChatRetriever(driver, embedder, use_answer_cache=use_answer_cache,
+                                  retrieval_mode=retrieval_mode, host=server_url)
+    latencies = []
+    stages = defaultdict(list)
+    start = time.perf_counter()
+    for question in questions:
+        t = time.perf_counter()
+        with _quiet(quiet):
+            retriever.get_response(question)
+        latencies.append(time.perf_counter() - t)
+        for stage, seconds in retriever.last_timings.items():
+            stages[stage].append(seconds)
+    elapsed = time.perf_counter() - start
+    extra = {}
+    if retriever.neighbor_cache is not None:
+        extra["komsu_onbellegi"] = {"isabet": retriever.neighbor_cache.hits, "iska": retriever.neighbor_cache.misses}
+    return _result(latencies, elapsed, len(questions), "soru",
+                   asamalar={stage: summarize(values) for stage, values in stages.items()}, **extra)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çevrim dışı uçtan uca benchmark paketi")
+    parser.add_argument("--docs", type=int, default=12)
+    parser.add_argument("--maddeler", type=int, default=40, help="Belge başına madde sayısı")
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--loader-workers", type=int, default=2)
+    parser.add_argument("--extraction-mode", default="rules_then_llm", choices=["rules", "rules_then_llm", "llm"])
+    parser.add_argument("--answer-cache", action="store_true", help="Sorgu ölçümünde cevap önbelleğini aç")
+    parser.add_argument("--retrieval-mode", default=RETRIEVAL_MODE, choices=["single_hop", "ppr"],
+                        help="Sorgu ölçümünde atıf gezintisi")
+    parser.add_argument("--no-resolver", action="store_true", help="Atıf hedeflerini ham adlarıyla yaz")
+    parser.add_argument("--request-latency", type=float, default=0.02)
+    parser.add_argument("--item-latency", type=float, default=0.002)
+    parser.add_argument("--chat-latency", type=float, default=0.2)
+    parser.add_argument("--token-latency", type=float, default=0.01)
+    parser.add_argument("--answer-tokens", type=int, default=40)
+    parser.add_argument("--neo4j-latency", type=float, default=0.001, help="Sorgu başına gidiş-dönüş (sn)")
+    parser.add_argument("--only", nargs="+", choices=["chunking", "loading", "ingestion", "query"])
+    parser.add_argument("--verbose", action="store_true", help="Ölçülen kodun ekran çıktılarını da göster")
+    parser.add_argument("--output", help="JSON sonuç dosyası")
+    args = parser.parse_args()
+
+    selected = set(args.only or ["chunking", "loading", "ingestion", "query"])
+    quiet = not args.verbose
+    corpus = generate_corpus(args.docs, args.maddeler, seed=args.seed)
+    results = {}
+
+    if "chunking" in selected:
+        results["chunking"] = bench_chunking(corpus, quiet)
+
+    with tempfile.TemporaryDirectory() as data_dir, \
+            FakeOllamaServer(request_latency=args.request_latency, item_latency=args.item_latency,
+                             chat_latency=args.chat_latency, token_latency=args.token_latency,
+                             answer_tokens=args.answer_tokens) as server:
+        documents = []
+        if selected & {"loading", "ingestion", "query"}:
+            write_corpus(data_dir, corpus)
+            documents, loading = bench_loading(data_dir, args.loader_workers, quiet)
+            if "loading" in selected:
+                results["loading"] = loading
+
+        driver = FakeDriver(round_trip_latency=args.neo4j_latency)
+        if selected & {"ingestion", "query"}:
+            ingestion = bench_ingestion(documents, driver, server.url, args.extraction_mode,
+                                        not args.no_resolver, quiet)
+            if "ingestion" in selected:
+                results["ingestion"] = ingestion
+        if "query" in selected:
+            questions = sample_questions(corpus, args.questions, seed=args.seed)
+            results["query"] = bench_query(questions, driver, server.url, args.answer_cache,
+                                           args.retrieval_mode, quiet)
+
+    output = {
+        "zaman": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "parametreler": vars(args),
+        "sonuclar": results,
+    }
+    text = json.dumps(output, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
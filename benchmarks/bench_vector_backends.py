@@ -0,0 +1,84 @@
+"""
+Neo4j vektör indexi (HNSW, yaklaşık) ile süreç içi LocalVectorIndex'i
+(float32 tam arama ve int8 + yeniden puanlama) karşılaştırır.
+Doğruluk ölçütü: tüm CHUNK embedding'leri üzerinde tam (brute-force) kosinüs
+aramasına göre recall@k. Sorgular chat_history.txt soruları ile rastgele seçilen
+chunk embedding'lerinin gürültülü kopyalarıdır. Çalışan Neo4j ve Ollama gerekir.
+
+Kullanım:
+    python -m benchmarks.bench_vector_backends --k 5 --samples 200
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+from neo4j import GraphDatabase
+
+from benchmarks.stats import summarize, load_questions
+from src.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
+from src.embedding_utils import EmbeddingGenerator
+from src.vector_store import LocalVectorIndex, EXPORT_EMBEDDINGS_CYPHER
+
+
+def _neo4j_search(driver, embedding, k):
+    with driver.session(database=NEO4J_DATABASE) as session:
+        result = session.run(
+            """
+            CALL db.index.vector.queryNodes('chunk_embeddings', $k, $embedding)
+            YIELD node, score
+            RETURN elementId(node) AS chunk_id, score
+            """, k=k, embedding=list(map(float, embedding)))
+        return [(r["chunk_id"], r["score"]) for r in result]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vektör arama arka uçları karşılaştırması")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=200, help="Gürültülü chunk sorgusu sayısı")
+    parser.add_argument("--noise", type=float, default=0.02)
+    args = parser.parse_args()
+
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        chunk_ids, embeddings = [], []
+        with driver.session(database=NEO4J_DATABASE) as session:
+            for record in session.run(EXPORT_EMBEDDINGS_CYPHER):
+                chunk_ids.append(record["chunk_id"])
+                embeddings.append(record["embedding"])
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        print(f"{len(chunk_ids)} chunk embedding'i okundu.")
+
+        rng = np.random.default_rng(0)
+        picks = rng.choice(len(matrix), size=min(args.samples, len(matrix)), replace=False)
+        queries = [matrix[i] + rng.normal(0, args.noise, matrix.shape[1]).astype(np.float32) for i in picks]
+        questions = load_questions()
+        queries += [np.asarray(e, dtype=np.float32)
+                    for e in EmbeddingGenerator().get_embeddings(questions) if e]
+
+        workdir = tempfile.mkdtemp()
+        exact = LocalVectorIndex.build(f"{workdir}/f32", chunk_ids, matrix, quantize=False)
+        quantized = LocalVectorIndex.build(f"{workdir}/i8", chunk_ids, matrix, quantize=True)
+        truth = [{cid for cid, _ in exact.search(q, args.k)} for q in queries]
+
+        backends = {
+            "neo4j (HNSW)": lambda q: _neo4j_search(driver, q, args.k),
+            "yerel float32": lambda q: exact.search(q, args.k),
+            "yerel int8+rescore": lambda q: quantized.search(q, args.k),
+        }
+        for name, search in backends.items():
+            timings, recall = [], 0.0
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                found = {cid for cid, _ in search(query)}
+                timings.append(time.perf_counter() - start)
+                recall += len(found & expected) / max(1, len(expected))
+            summary = summarize(timings)
+            print(f"{name:<20} recall@{args.k} {recall / len(queries):.3f}  "
+                  f"p50 {summary['p50_ms']:7.2f} ms  p95 {summary['p95_ms']:7.2f} ms")
+    finally:
+        driver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark'lar için sentetik Türkçe mevzuat külliyatı üreticisi.
+
+Üretilen belgeler gerçek mevzuatın yapısını taklit eder: giriş bölümü,
+satır başında "Madde N –" / "Geçici Madde N –" başlıkları, fıkralar,
+"6446 sayılı ... Kanununun 14 üncü maddesi" ve "bu Kanunun 5 inci maddesi"
+gibi atıflar, CHUNK_SIZE'ı aşan uzun maddeler. Aynı tohum (seed) her
+zaman aynı külliyatı üretir.
+"""
+import html
+import os
+import random
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import pymupdf as fitz
+
+# (numara, isim, tamlayan hali) — atıf hedefi olarak kullanılan kanun/KHK'lar
+REFERANS_BELGELER = [
+    ("6446", "Elektrik Piyasası Kanunu", "Elektrik Piyasası Kanununun"),
+    ("4628", "Elektrik Piyasası Kanunu", "Elektrik Piyasası Kanununun"),
+    ("5346", "Yenilenebilir Enerji Kanunu", "Yenilenebilir Enerji Kanununun"),
+    ("5429", "Türkiye İstatistik Kanunu", "Türkiye İstatistik Kanununun"),
+    ("233", "Kanun Hükmünde Kararname", "Kanun Hükmünde Kararnamenin"),
+    ("399", "Kanun Hükmünde Kararname", "Kanun Hükmünde Kararnamenin"),
+]
+
+KURUMLAR = ["teias", "tedas", "epdk"]
+TURLER = ["yonetmelik", "usul-esaslar", "kanunlar", "yonerge"]
+
+_KELIMELER = (
+    "lisans sahibi tüzel kişi dağıtım şirketi iletim sistemi serbest tüketici tarife "
+    "Kurul kararı bağlantı anlaşması sayaç şebeke işletmeci üretim tesisi kapasite "
+    "başvuru süre bildirim denetim yaptırım idari para cezası piyasa faaliyeti "
+    "teminat mektubu kamulaştırma ölçüm kesinti tazminat sözleşme yükümlülük"
+).split()
+
+_ORDINAL_EKLER = {1: "inci", 2: "nci", 3: "üncü", 4: "üncü", 5: "inci", 6: "ncı", 7: "nci",
+                  8: "inci", 9: "uncu", 0: "uncu"}
+
+
+def ordinal(n: int) -> str:
+    """Türkçe sıra sayısı eki: 14 -> '14 üncü', 5 -> '5 inci'."""
+    if n % 100 in (10, 30, 90):
+        return f"{n} uncu"
+    if n % 100 in (20, 50, 70, 80):
+        return f"{n} inci"
+    if n % 100 in (40, 60):
+        return f"{n} ıncı"
+    return f"{n} {_ORDINAL_EKLER[n % 10]}"
+
+
+@dataclass
+class SyntheticDocument:
+    isim: str
+    kurum_klasoru: str
+    tur_klasoru: str
+    metin: str
+    madde_sayisi: int
+
+
+def _cumle(rng: random.Random, madde_sayisi: int) -> str:
+    kelimeler = " ".join(rng.choice(_KELIMELER) for _ in range(rng.randint(8, 20)))
+    r = rng.random()
+    if r < 0.15:
+        numara, _, tamlayan = rng.choice(REFERANS_BELGELER)
+        madde = rng.randint(1, 30)
+        return f"{kelimeler}, {numara} sayılı {tamlayan} {ordinal(madde)} maddesi uyarınca belirlenir."
+    if r < 0.25:
+        maddeler = sorted(rng.sample(range(1, madde_sayisi + 1), k=min(2, madde_sayisi)))
+        liste = " ve ".join(ordinal(m) for m in maddeler)
+        return f"{kelimeler}, bu Yönetmeliğin {liste} maddelerinde belirtilen usule göre yapılır."
+    return f"{kelimeler[0].upper()}{kelimeler[1:]} ilgili mevzuat çerçevesinde yerine getirilir."
+
+
+def generate_document(rng: random.Random, index: int, madde_sayisi: int = 40,
+                      uzun_madde_orani: float = 0.2) -> SyntheticDocument:
+    """Tek bir sentetik belge metni üretir."""
+    kurum = KURUMLAR[index % len(KURUMLAR)]
+    tur = TURLER[index % len(TURLER)]
+    isim = f"Sentetik_Belge_{index:04d}"
+    if index < len(REFERANS_BELGELER):
+        # İlk belgeler atıf hedefi olan kanunlardır; böylece atıflar ve madde soruları çözülebilir
+        numara, ad, _ = REFERANS_BELGELER[index]
+        isim, tur = f"{numara} {ad}", "kanunlar"
+    satirlar = [
+        f"{isim.replace('_', ' ').upper()}",
+        "BİRİNCİ BÖLÜM",
+        "Amaç, Kapsam, Dayanak ve Tanımlar",
+        _cumle(rng, madde_sayisi),
+    ]
+    for no in range(1, madde_sayisi + 1):
+        satirlar.append(f"Madde {no} – {rng.choice(_KELIMELER).capitalize()} hükümleri")
+        fikra_sayisi = rng.randint(8, 14) if rng.random() < uzun_madde_orani else rng.randint(1, 4)
+        for fikra in range(1, fikra_sayisi + 1):
+            satirlar.append(f"({fikra}) " + " ".join(_cumle(rng, madde_sayisi) for _ in range(rng.randint(1, 3))))
+    for no in range(1, rng.randint(1, 3) + 1):
+        satirlar.append(f"Geçici Madde {no} – Geçiş hükümleri")
+        satirlar.append(f"(1) {_cumle(rng, madde_sayisi)}")
+    return SyntheticDocument(isim, kurum, tur, "\n".join(satirlar) + "\n", madde_sayisi)
+
+
+def generate_corpus(n_docs: int, madde_sayisi: int = 40, seed: int = 42) -> List[SyntheticDocument]:
+    rng = random.Random(seed)
+    return [generate_document(rng, i, madde_sayisi) for i in range(n_docs)]
+
+
+def write_pdf(path: str, metin: str):
+    """Metni satır satır, sayfalara akıtarak PDF'e yazar (Türkçe karakterler korunur)."""
+    body = "".join(f"<p>{html.escape(satir)}</p>" for satir in metin.splitlines())
+    story = fitz.Story(html=body)
+    mediabox = fitz.paper_rect("a4")
+    where = mediabox + (50, 50, -50, -50)
+    writer = fitz.DocumentWriter(path)
+    more = True
+    while more:
+        device = writer.begin_page(mediabox)
+        more, _ = story.place(where)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+
+
+def write_corpus(root: str, documents: List[SyntheticDocument]) -> List[Tuple[str, SyntheticDocument]]:
+    """Belgeleri 'root/kurum/tur/isim.pdf' düzeninde (data/ klasörü yapısı) yazar."""
+    written = []
+    for doc in documents:
+        directory = os.path.join(root, doc.kurum_klasoru, doc.tur_klasoru)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{doc.isim}.pdf")
+        write_pdf(path, doc.metin)
+        written.append((path, doc))
+    return written
+
+
+def sample_questions(documents: List[SyntheticDocument], n: int, seed: int = 7) -> List[str]:
+    """Kullanıcı sorularını taklit eder: açık madde atıfları ve serbest sorular karışık."""
+    rng = random.Random(seed)
+    questions = []
+    for _ in range(n):
+        if rng.random() < 0.4:
+            numara, _, tamlayan = rng.choice(REFERANS_BELGELER)
+            madde = rng.randint(1, min(doc.madde_sayisi for doc in documents))
+            questions.append(f"{numara} sayılı {tamlayan} {ordinal(madde)} maddesi ne diyor?")
+        else:
+            konu = " ".join(rng.sample(_KELIMELER, 3))
+            questions.append(f"{konu} konusunda {rng.choice(documents).isim.replace('_', ' ')} ne düzenliyor?")
+    return questions
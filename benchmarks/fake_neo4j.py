@@ -0,0 +1,377 @@
+"""
+Benchmark'lar için süreç içi sahte Neo4j sürücüsü.
+
+Projenin kullandığı Cypher sorgularını (modül seviyesindeki sabitler) metin
+eşleşmesiyle tanır ve aynı anlamı bellek içi bir graf üzerinde uygular.
+Genel bir Cypher yorumlayıcısı değildir: tanınmayan sorgu NotImplementedError
+verir, böylece yeni bir sorgu eklendiğinde benchmark sessizce yanlış ölçmez.
+
+'round_trip_latency' her sorguya (ağ gidiş-dönüşü yerine) sabit bir gecikme
+ekler. Yazma transaction'ları geri alınamaz (rollback yoktur).
+"""
+import itertools
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.graph_builder import (
+    BELGE_WRITE_CYPHER, CHUNK_DELETE_CYPHER, CHUNK_WRITE_CYPHER, MANIFEST_WRITE_CYPHER,
+    MANIFEST_READ_CYPHER, BELGE_REMOVE_CYPHER, GENERATION_BUMP_CYPHER, GENERATION_READ_CYPHER,
+    LINK_OUTGOING_CYPHER, LINK_INCOMING_CYPHER, LINKS_READY_CYPHER, LINKS_MARK_CYPHER,
+    CITATION_LINK_STATS_CYPHER
+)
+from src.lexical_index import LEXICAL_CHUNKS_CYPHER
+from src.retriever import (
+    RETRIEVE_CONTEXT_CYPHER, RETRIEVE_CONTEXT_BY_IDS_CYPHER, SEED_VECTOR_IDS_CYPHER, NEIGHBORS_CYPHER,
+    RETRIEVE_CONTEXT_SCOPED_CYPHER, SEED_SCOPED_IDS_CYPHER
+)
+from src.vector_store import EXPORT_EMBEDDINGS_CYPHER
+
+
+class FakeRecord(dict):
+    def data(self) -> dict:
+        return dict(self)
+
+
+class FakeResult:
+    def __init__(self, records: Optional[List[dict]] = None):
+        self._records = [FakeRecord(r) for r in (records or [])]
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def single(self) -> Optional[FakeRecord]:
+        return self._records[0] if self._records else None
+
+    def data(self) -> List[dict]:
+        return [r.data() for r in self._records]
+
+    def consume(self):
+        return None
+
+
+class FakeGraph:
+    """Bellek içi graf: KURUM, BELGE, CHUNK nodları, ATIF_YAPAR ve ATIF_MADDE ilişkileri."""
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.belgeler: Dict[str, Dict[str, Any]] = {}
+        self.yayinlayan: Dict[str, str] = {}  # belge -> kurum
+        self.kurumlar = set()
+        self.chunks: Dict[str, Dict[str, Any]] = {}
+        self.belge_chunklari: Dict[str, List[str]] = defaultdict(list)
+        # chunk -> {hedef: [(madde_turu, madde_no)]} (ATIF_YAPAR.madde / madde_turu ikilileri)
+        self.atiflar: Dict[str, Dict[str, list]] = defaultdict(dict)
+        self.madde_index: Dict[tuple, List[str]] = defaultdict(list)  # (kaynak_belge, madde_turu, madde_no) -> chunk'lar
+        self.atif_madde: Dict[str, set] = defaultdict(set)   # chunk -> atıf yapılan madde chunk'ları
+        self.gelen_madde: Dict[str, set] = defaultdict(set)  # ters yön (silmeler için)
+        self.nesil = 0
+        self.atif_madde_surumu = 0
+        self._ids = itertools.count(1)
+        self._matrix = None
+        self._matrix_ids: List[str] = []
+
+    # --- Yardımcılar ---
+
+    def _delete_chunk(self, chunk_id: str):
+        chunk = self.chunks.pop(chunk_id)
+        self.atiflar.pop(chunk_id, None)
+        for hedef in self.atif_madde.pop(chunk_id, ()):
+            self.gelen_madde[hedef].discard(chunk_id)
+        for kaynak in self.gelen_madde.pop(chunk_id, ()):
+            self.atif_madde[kaynak].discard(chunk_id)
+        key = (chunk["kaynak_belge"], chunk.get("madde_turu"), chunk.get("madde_no"))
+        if chunk_id in self.madde_index.get(key, []):
+            self.madde_index[key].remove(chunk_id)
+        self._matrix = None
+
+    def _vector_search(self, embedding: list, k: int, p: Optional[dict] = None) -> List[tuple]:
+        if self._matrix is None:
+            self._matrix_ids = [cid for cid, c in self.chunks.items() if c.get("embedding") is not None]
+            if self._matrix_ids:
+                matrix = np.asarray([self.chunks[cid]["embedding"] for cid in self._matrix_ids], dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                self._matrix = matrix / norms
+            else:
+                self._matrix = np.zeros((0, len(embedding)), dtype=np.float32)
+        if not self._matrix_ids:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = self._matrix @ query
+        if p is not None:
+            # Kapsamlı arama: filtreye uymayan chunk'lar aday olmaz
+            kurumlar, turler = p.get("kurumlar"), p.get("turler")
+            for i, cid in enumerate(self._matrix_ids):
+                chunk = self.chunks[cid]
+                if (kurumlar and chunk.get("kurum") not in kurumlar) or (turler and chunk.get("tur") not in turler):
+                    scores[i] = -np.inf
+        top = [i for i in np.argsort(-scores)[:k] if np.isfinite(scores[i])]
+        return [(self._matrix_ids[i], float((1.0 + scores[i]) / 2.0)) for i in top]
+
+    def _expand(self, seeds: List[tuple], k: int) -> List[dict]:
+        rows = []
+        for chunk_id, score in seeds:
+            chunk = self.chunks.get(chunk_id)
+            if chunk is None:
+                continue
+            belge = chunk["kaynak_belge"]
+            kurum = self.yayinlayan.get(belge)
+            if belge not in self.belgeler or kurum is None:
+                continue
+            rows.append((chunk_id, chunk, belge, kurum, score))
+        rows.sort(key=lambda row: -row[4])
+
+        records = []
+        for chunk_id, chunk, belge, kurum, score in rows[:k]:
+            atiflar = []
+            bagli = self.atif_madde.get(chunk_id, ())
+            for hedef, maddeler in self.atiflar.get(chunk_id, {}).items():
+                hedef_chunklar = [cid for cid in bagli if self.chunks[cid]["kaynak_belge"] == hedef]
+                hedef_chunklar.sort(key=lambda cid: self.chunks[cid].get("sira") or 0)
+                atiflar.append({
+                    "hedef_belge": hedef,
+                    "hedef_maddeler": [madde_no for _, madde_no in maddeler],
+                    "hedef_madde_turleri": [madde_turu for madde_turu, _ in maddeler],
+                    "hedef_chunklar": [
+                        {"chunk_id": cid, "metin": self.chunks[cid]["metin"],
+                         "madde_no": self.chunks[cid].get("madde_no"),
+                         "madde_turu": self.chunks[cid].get("madde_turu")}
+                        for cid in hedef_chunklar
+                    ],
+                })
+            records.append({"chunk_id": chunk_id, "metin": chunk["metin"], "kaynak_belge": belge,
+                            "kaynak_kurum": kurum, "score": score, "atiflar": atiflar})
+        return records
+
+    # --- Sorgu uygulamaları ---
+
+    def belge_write(self, p):
+        self.kurumlar.add(p["kurum_isim"])
+        belge = self.belgeler.setdefault(p["belge_isim"], {})
+        belge.update(tur=p["belge_tur"], kurum=p["kurum_isim"])
+        self.yayinlayan[p["belge_isim"]] = p["kurum_isim"]
+
+    def chunk_delete(self, p):
+        for chunk_id in self.belge_chunklari.pop(p["belge_isim"], []):
+            self._delete_chunk(chunk_id)
+
+    def chunk_write(self, p):
+        belge = p["belge_isim"]
+        if belge not in self.belgeler:
+            return
+        for row in p["rows"]:
+            chunk_id = f"4:fake:{next(self._ids)}"
+            self.chunks[chunk_id] = {
+                "metin": row["metin"], "kaynak_belge": belge, "kurum": p.get("kurum_isim"), "tur": p.get("belge_tur"),
+                "embedding": row.get("embedding"),
+                "sira": row.get("sira"), "madde_turu": row.get("madde_turu"),
+                "madde_no": row.get("madde_no"), "bolum": row.get("bolum"),
+            }
+            self.belge_chunklari[belge].append(chunk_id)
+            self.madde_index[(belge, row.get("madde_turu"), row.get("madde_no"))].append(chunk_id)
+            for atif in row.get("atiflar") or []:
+                self.belgeler.setdefault(atif["hedef_belge_isim"], {})
+                maddeler = atif["madde_listesi"] or []
+                turler = atif.get("madde_turleri") or ["Madde"] * len(maddeler)
+                self.atiflar[chunk_id][atif["hedef_belge_isim"]] = list(zip(turler, maddeler))
+        self._matrix = None
+
+    def manifest_write(self, p):
+        if p["belge_isim"] in self.belgeler:
+            self.belgeler[p["belge_isim"]].update(icerik_hash=p["icerik_hash"], sema_surumu=p["sema_surumu"])
+            if p["eksik"]:
+                self.belgeler[p["belge_isim"]]["eksik"] = True
+            else:
+                self.belgeler[p["belge_isim"]].pop("eksik", None)
+
+    def manifest_read(self, p):
+        return [
+            {"isim": isim, "icerik_hash": b["icerik_hash"]
+             if b.get("sema_surumu") == p["sema_surumu"] and not b.get("eksik") else ""}
+            for isim, b in self.belgeler.items() if b.get("icerik_hash") is not None
+        ]
+
+    def belge_remove(self, p):
+        isim = p["belge_isim"]
+        if isim not in self.belgeler:
+            return
+        self.chunk_delete(p)
+        self.yayinlayan.pop(isim, None)
+        for key in ("icerik_hash", "sema_surumu", "eksik", "tur", "kurum"):
+            self.belgeler[isim].pop(key, None)
+        if not any(isim in hedefler for hedefler in self.atiflar.values()):
+            del self.belgeler[isim]
+
+    def _link(self, kaynak: str, hedef_belge: str, maddeler: list) -> int:
+        kenar = 0
+        for madde_turu, madde_no in maddeler:
+            for hedef in self.madde_index.get((hedef_belge, madde_turu, madde_no), []):
+                self.atif_madde[kaynak].add(hedef)
+                self.gelen_madde[hedef].add(kaynak)
+                kenar += 1
+        return kenar
+
+    def link_outgoing(self, p):
+        kenar = 0
+        for chunk_id in self.belge_chunklari.get(p["belge_isim"], []):
+            for hedef_belge, maddeler in self.atiflar.get(chunk_id, {}).items():
+                kenar += self._link(chunk_id, hedef_belge, maddeler)
+        return [{"kenar": kenar}]
+
+    def link_incoming(self, p):
+        isim, kenar = p["belge_isim"], 0
+        for chunk_id, hedefler in self.atiflar.items():
+            if isim in hedefler and self.chunks[chunk_id]["kaynak_belge"] != isim:
+                kenar += self._link(chunk_id, isim, hedefler[isim])
+        return [{"kenar": kenar}]
+
+    def links_ready(self, p):
+        return [{"surum": self.atif_madde_surumu}]
+
+    def links_mark(self, p):
+        self.atif_madde_surumu = p["surum"]
+
+    def citation_link_stats(self, p):
+        stats = {"madde_atfi": 0, "bagli": 0, "yuklenmemis_belge": 0, "eksik_madde": 0}
+        for chunk_id, hedefler in self.atiflar.items():
+            bagli = {(self.chunks[cid]["kaynak_belge"], self.chunks[cid].get("madde_turu"),
+                      self.chunks[cid].get("madde_no")) for cid in self.atif_madde.get(chunk_id, ())}
+            for hedef_belge, maddeler in hedefler.items():
+                for madde_turu, madde_no in maddeler:
+                    stats["madde_atfi"] += 1
+                    if (hedef_belge, madde_turu, madde_no) in bagli:
+                        stats["bagli"] += 1
+                    elif self.belgeler.get(hedef_belge, {}).get("icerik_hash") is None:
+                        stats["yuklenmemis_belge"] += 1
+                    else:
+                        stats["eksik_madde"] += 1
+        return [stats]
+
+    def generation_bump(self, p):
+        self.nesil += 1
+
+    def generation_read(self, p):
+        return [{"nesil": self.nesil}]
+
+    def retrieve_by_vector(self, p):
+        return self._expand(self._vector_search(p["embedding"], p["k"]), p["k"])
+
+    def retrieve_by_ids(self, p):
+        return self._expand([(seed["chunk_id"], seed["score"]) for seed in p["seeds"]], p["k"])
+
+    def seed_vector_ids(self, p):
+        return [{"chunk_id": cid, "score": score} for cid, score in self._vector_search(p["embedding"], p["k"])]
+
+    def retrieve_scoped(self, p):
+        return self._expand(self._vector_search(p["embedding"], p["k"], p), p["k"])
+
+    def seed_scoped_ids(self, p):
+        return [{"chunk_id": cid, "score": score} for cid, score in self._vector_search(p["embedding"], p["k"], p)]
+
+    def neighbors(self, p):
+        records = []
+        for chunk_id in p["chunk_ids"]:
+            if chunk_id not in self.chunks:
+                continue
+            hedefler = sorted(self.atif_madde.get(chunk_id, ()),
+                              key=lambda cid: (self.chunks[cid]["kaynak_belge"], self.chunks[cid].get("sira") or 0))
+            records.append({"chunk_id": chunk_id, "komsular": [
+                {"chunk_id": cid, "metin": self.chunks[cid]["metin"], "kaynak_belge": self.chunks[cid]["kaynak_belge"],
+                 "madde_no": self.chunks[cid].get("madde_no"), "madde_turu": self.chunks[cid].get("madde_turu")}
+                for cid in hedefler
+            ]})
+        return records
+
+    def lexical_chunks(self, p):
+        return [
+            {"chunk_id": cid, "metin": c["metin"], "kaynak_belge": c["kaynak_belge"],
+             "kurum": c.get("kurum"), "tur": c.get("tur"),
+             "madde_no": c.get("madde_no"), "madde_turu": c.get("madde_turu"), "sira": c.get("sira")}
+            for cid, c in self.chunks.items()
+        ]
+
+    def export_embeddings(self, p):
+        return [{"chunk_id": cid, "embedding": c["embedding"], "kurum": c.get("kurum"), "tur": c.get("tur")}
+                for cid, c in self.chunks.items() if c.get("embedding") is not None]
+
+
+_HANDLERS: Dict[str, Callable[[FakeGraph, dict], Optional[List[dict]]]] = {
+    BELGE_WRITE_CYPHER: FakeGraph.belge_write,
+    CHUNK_DELETE_CYPHER: FakeGraph.chunk_delete,
+    CHUNK_WRITE_CYPHER: FakeGraph.chunk_write,
+    MANIFEST_WRITE_CYPHER: FakeGraph.manifest_write,
+    MANIFEST_READ_CYPHER: FakeGraph.manifest_read,
+    BELGE_REMOVE_CYPHER: FakeGraph.belge_remove,
+    GENERATION_BUMP_CYPHER: FakeGraph.generation_bump,
+    GENERATION_READ_CYPHER: FakeGraph.generation_read,
+    LINK_OUTGOING_CYPHER: FakeGraph.link_outgoing,
+    LINK_INCOMING_CYPHER: FakeGraph.link_incoming,
+    LINKS_READY_CYPHER: FakeGraph.links_ready,
+    LINKS_MARK_CYPHER: FakeGraph.links_mark,
+    CITATION_LINK_STATS_CYPHER: FakeGraph.citation_link_stats,
+    RETRIEVE_CONTEXT_CYPHER: FakeGraph.retrieve_by_vector,
+    RETRIEVE_CONTEXT_BY_IDS_CYPHER: FakeGraph.retrieve_by_ids,
+    SEED_VECTOR_IDS_CYPHER: FakeGraph.seed_vector_ids,
+    NEIGHBORS_CYPHER: FakeGraph.neighbors,
+    LEXICAL_CHUNKS_CYPHER: FakeGraph.lexical_chunks,
+    EXPORT_EMBEDDINGS_CYPHER: FakeGraph.export_embeddings,
+    **{query: FakeGraph.retrieve_scoped for query in RETRIEVE_CONTEXT_SCOPED_CYPHER.values()},
+    **{query: FakeGraph.seed_scoped_ids for query in SEED_SCOPED_IDS_CYPHER.values()},
+}
+
+
+class FakeSession:
+    def __init__(self, driver: "FakeDriver"):
+        self.driver = driver
+        self.query_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query: str, parameters: Optional[dict] = None, **kwargs) -> FakeResult:
+        params = dict(parameters or {}, **kwargs)
+        self.driver.query_count += 1
+        if self.driver.round_trip_latency:
+            time.sleep(self.driver.round_trip_latency)
+        if query.lstrip().upper().startswith("CREATE") and "INDEX" in query.upper():
+            return FakeResult()  # Index oluşturma sorguları: bellek içi grafta karşılığı yok
+        handler = _HANDLERS.get(query)
+        if handler is None:
+            raise NotImplementedError(f"Sahte Neo4j bu sorguyu tanımıyor: {query.strip()[:80]}...")
+        with self.driver.graph.lock:
+            return FakeResult(handler(self.driver.graph, params))
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        # Yazma transaction'ları tek kilit altında çalışır (transaction izolasyonunun yerine)
+        with self.driver.graph.lock:
+            return work(self, *args, **kwargs)
+
+    def close(self):
+        pass
+
+
+class FakeDriver:
+    """'neo4j.GraphDatabase.driver' yerine geçen, bellek içi graf tutan sürücü."""
+    def __init__(self, round_trip_latency: float = 0.0, graph: Optional[FakeGraph] = None):
+        self.round_trip_latency = round_trip_latency
+        self.graph = graph or FakeGraph()
+        self.query_count = 0
+
+    def session(self, database: Optional[str] = None, **kwargs) -> FakeSession:
+        return FakeSession(self)
+
+    def verify_connectivity(self, **kwargs):
+        return None
+
+    def close(self):
+        pass
@@ -0,0 +1,167 @@
+"""
+Performans ölçümleri için yerel sahte Ollama HTTP sunucusu.
+
+Gerçek bir model yüklemeden /api/embed, /api/embeddings, /api/chat ve
+/api/tags uç noktalarını taklit eder. Embedding'ler metnin özetinden (hash)
+türetildiği için deterministiktir; gecikme istek başına ve metin başına
+ayarlanabilir. /api/chat, 'format=json' isteklerinde metindeki "N sayılı ...
+M. madde" atıflarını atıf çıkarım şemasında döndürür, diğer isteklerde
+sabit sayıda token'ı (isteğe bağlı akış halinde) üretir.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBEDDING_DIM = 1024
+
+_ATIF_PATTERN = re.compile(r"(\d{3,4}) sayılı [^,.;]*? (\d+) \w+ maddesi")
+
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM) -> list:
+    """Aynı metin için her zaman aynı birim vektörü üretir."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+def fake_extraction(text: str) -> dict:
+    """Atıf çıkarım isteğine, metindeki sayılı belge atıflarından deterministik bir cevap üretir."""
+    return {"atiflar_raw": [
+        {"belge_adi_raw": f"{numara} sayılı kanun", "madde_referanslari": [int(madde)]}
+        for numara, madde in _ATIF_PATTERN.findall(text)
+    ]}
+
+
+class FakeOllamaServer:
+    """
+    Arka planda çalışan sahte Ollama sunucusu.
+
+    request_latency: Her HTTP isteğinin sabit gecikmesi (saniye).
+    item_latency: İstekteki her metin için eklenen gecikme (saniye).
+    chat_latency: /api/chat isteğinde ilk token'a kadar geçen süre (prefill, saniye).
+    token_latency: Üretilen her token için eklenen gecikme (saniye).
+    answer_tokens: Sohbet cevaplarının token sayısı.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 request_latency: float = 0.02, item_latency: float = 0.002,
+                 dim: int = EMBEDDING_DIM, chat_latency: float = 0.2,
+                 token_latency: float = 0.01, answer_tokens: int = 40):
+        self.request_latency = request_latency
+        self.item_latency = item_latency
+        self.dim = dim
+        self.chat_latency = chat_latency
+        self.token_latency = token_latency
+        self.answer_tokens = answer_tokens
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count_request(self):
+        with self._lock:
+            self.request_count += 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # İstek loglarını sustur
+
+            def _send_json(self, payload: dict, status: int = 200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                server._count_request()
+
+                if self.path == "/api/embed":
+                    inputs = request.get("input", "")
+                    if isinstance(inputs, str):
+                        inputs = [inputs]
+                    time.sleep(server.request_latency + server.item_latency * len(inputs))
+                    self._send_json({
+                        "model": request.get("model", ""),
+                        "embeddings": [fake_embedding(t, server.dim) for t in inputs],
+                    })
+                elif self.path == "/api/embeddings":
+                    time.sleep(server.request_latency + server.item_latency)
+                    self._send_json({"embedding": fake_embedding(request.get("prompt", ""), server.dim)})
+                elif self.path == "/api/chat":
+                    self._chat(request)
+                else:
+                    self._send_json({"error": f"bilinmeyen uç nokta: {self.path}"}, status=404)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json({"models": []})
+                else:
+                    self._send_json({"error": f"bilinmeyen uç nokta: {self.path}"}, status=404)
+
+            def _chat(self, request: dict):
+                model = request.get("model", "")
+                prompt = "\n".join(m.get("content", "") for m in request.get("messages", []))
+                time.sleep(server.chat_latency)
+                if request.get("format") == "json":
+                    content = json.dumps(fake_extraction(prompt), ensure_ascii=False)
+                    time.sleep(server.token_latency * max(1, len(content) // 4))
+                    self._send_json({"model": model, "message": {"role": "assistant", "content": content},
+                                     "done": True})
+                    return
+
+                rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+                tokens = [rng.choice(["Kanun", " uyarınca", " lisans", " sahibi", " Kurum", "a",
+                                      " bildirim", " yapar", ".", " Madde", " kapsamında"])
+                          for _ in range(server.answer_tokens)]
+                if not request.get("stream", True):
+                    time.sleep(server.token_latency * len(tokens))
+                    self._send_json({"model": model, "message": {"role": "assistant", "content": "".join(tokens)},
+                                     "done": True})
+                    return
+
+                # Akış: satır başına bir JSON (NDJSON); bağlantı kapanınca gövde biter
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                for token in tokens:
+                    time.sleep(server.token_latency)
+                    line = {"model": model, "message": {"role": "assistant", "content": token}, "done": False}
+                    self.wfile.write(json.dumps(line, ensure_ascii=False).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+                final = {"model": model, "message": {"role": "assistant", "content": ""}, "done": True}
+                self.wfile.write(json.dumps(final).encode("utf-8") + b"\n")
+
+        return Handler
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,36 @@
+"""Benchmark'lar için küçük istatistik yardımcıları."""
+from typing import Dict, List
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Doğrusal ara değerlemeli yüzdelik (p: 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Saniye cinsinden ölçümleri milisaniye p50/p95/p99 özetine çevirir."""
+    return {
+        "n": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "ortalama_ms": (sum(values) / len(values) * 1000) if values else 0.0,
+    }
+
+
+def load_questions(path: str = "chat_history.txt") -> List[str]:
+    """main_chat.py'nin sohbet logundan kullanıcı sorularını okur."""
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("user_question:"):
+                question = line[len("user_question:"):].strip()
+                if question:
+                    questions.append(question)
+    return questions
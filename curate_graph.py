@@ -1,6 +1,10 @@
 import sys
 from neo4j import GraphDatabase
 from src.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
+from src.graph_builder import (
+    GENERATION_BUMP_CYPHER, LINK_INCOMING_CYPHER, citation_link_stats, format_citation_link_stats
+)
+from src.belge_resolver import BelgeResolver
 
 # --- FAZ 2 MANUEL EŞLEŞTİRME LİSTESİ ---
 CANONICAL_MAPPING = {
@@ -23,10 +27,48 @@ CANONICAL_MAPPING = {
 }
 # --- EŞLEŞTİRME LİSTESİ SONU ---
 
+# Yüklenmiş (kanonik) belgeler ve hiçbir PDF'e karşılık gelmeyen atıf hedefleri
+BELGE_NAMES_CYPHER = """
+MATCH (b:BELGE)
+RETURN b.isim AS isim, b.icerik_hash IS NOT NULL AS yuklu
+"""
+
+# Tüm eşleştirmeleri tek sorguda uygular: atıflar kanonik noda taşınır. Chunk zaten
+# kanonik belgeye atıf yapıyorsa madde listeleri birleştirilir (üzerine yazılmaz).
+# 'madde' ve 'madde_turu' paralel listelerdir: (tür, no) çiftleri üzerinden
+# tekilleştirilir ve iki liste birlikte yeniden yazılır ("geçici 3" ile "3" ayrıdır).
+CURATE_REWIRE_CYPHER = """
+UNWIND $mappings AS m
+MATCH (dirty:BELGE {isim: m.dirty})
+MATCH (canonical:BELGE {isim: m.canonical})
+WHERE dirty <> canonical
+MATCH (c:CHUNK)-[r:ATIF_YAPAR]->(dirty)
+MERGE (c)-[r_new:ATIF_YAPAR]->(canonical)
+WITH m, r, r_new,
+     [i IN range(0, size(coalesce(r_new.madde, [])) - 1)
+        | [coalesce(r_new.madde_turu[i], 'Madde'), r_new.madde[i]]] AS mevcut,
+     [i IN range(0, size(coalesce(r.madde, [])) - 1)
+        | [coalesce(r.madde_turu[i], 'Madde'), r.madde[i]]] AS gelen
+WITH m, r, r_new, mevcut + [cift IN gelen WHERE NOT cift IN mevcut] AS ciftler
+SET r_new.madde = CASE WHEN size(ciftler) > 0 THEN [cift IN ciftler | cift[1]] END,
+    r_new.madde_turu = CASE WHEN size(ciftler) > 0 THEN [cift IN ciftler | cift[0]] END
+DELETE r
+RETURN m.dirty AS dirty, count(r_new) AS moved_count
+"""
+
+# Artık ilişkisi kalmayan 'hatalı' nodları siler
+CURATE_DELETE_CYPHER = """
+UNWIND $dirty_names AS dirty_name
+MATCH (dirty:BELGE {isim: dirty_name})
+WHERE NOT (()-[:ATIF_YAPAR]->(dirty)) AND NOT ((dirty)-[:ICERIR]->())
+DETACH DELETE dirty
+RETURN count(dirty) AS deleted_count
+"""
+
 
 class GraphCurator:
     """
-    Neo4j grafiğini alır ve manuel eşleştirme listelerine göre temizler.
+    Neo4j grafiğini alır ve otomatik çözümleme ile manuel eşleştirme listelerine göre temizler.
     İlişkileri yeniden yönlendirir (rewire) ve hatalı nodeları siler.
     """
     def __init__(self, driver):
@@ -47,46 +89,60 @@ class GraphCurator:
                 return None
     # --- DÜZELTİLEN FONKSİYON SONU ---
 
+    def resolve_dangling(self) -> dict:
+        """
+        PDF'i yüklenmemiş (icerik_hash'siz) her atıf hedefini BelgeResolver ile
+        yüklenmiş belgelere çözer ve {hatalı_isim: kanonik_isim} eşleştirmesi döndürür.
+        Yükleme sırasında çözülemeyip sonradan PDF'i eklenen belgeleri de yakalar.
+        """
+        records = self._run_query(BELGE_NAMES_CYPHER) or []
+        canonical = [record["isim"] for record in records if record["yuklu"]]
+        resolver = BelgeResolver(canonical)
+        mapping = {}
+        for record in records:
+            if record["yuklu"]:
+                continue
+            target = resolver.resolve(record["isim"])
+            if target and target != record["isim"]:
+                mapping[record["isim"]] = target
+        print(f"Otomatik çözümleme: {len(records) - len(canonical)} yüklenmemiş atıf hedefinden "
+              f"{len(mapping)} tanesi kanonik belgeye eşlendi.")
+        return mapping
+
+    @staticmethod
+    def _apply_mappings_tx(tx, mappings: list):
+        moved = {record["dirty"]: record["moved_count"] for record in tx.run(CURATE_REWIRE_CYPHER, mappings=mappings)}
+        deleted = tx.run(CURATE_DELETE_CYPHER, dirty_names=[m["dirty"] for m in mappings]).single()["deleted_count"]
+        # Taşınan atıflar artık kanonik belgeyi gösteriyor: madde kenarlarını çöz
+        for canonical_name in sorted({m["canonical"] for m in mappings}):
+            tx.run(LINK_INCOMING_CYPHER, belge_isim=canonical_name).consume()
+        # Graf değişti: sohbet tarafındaki cevap önbellekleri geçersiz olsun
+        tx.run(GENERATION_BUMP_CYPHER)
+        return moved, deleted
+
     def fix_canonical_mappings(self, mapping):
         """
-        CANONICAL_MAPPING'i işler.
-        İlişkileri 'hatalı' noddan 'doğru' noda taşır ve 'hatalı' nodu siler.
+        Eşleştirmeyi (ör. CANONICAL_MAPPING) tek bir yazma transaction'ında işler:
+        ilişkiler 'hatalı' nodlardan 'doğru' nodlara toplu (UNWIND) taşınır ve
+        boşalan 'hatalı' nodlar silinir. Hata olursa hiçbir değişiklik kalmaz.
         """
         print("\n--- Kanonik Eşleştirme (Spesifik Hatalar) Başlatıldı ---")
         if not mapping:
-            print("CANONICAL_MAPPING boş, bu adım atlanıyor.")
+            print("Eşleştirme listesi boş, bu adım atlanıyor.")
             return
 
-        for dirty_name, canonical_name in mapping.items():
-            print(f"İşleniyor: '{dirty_name}' -> '{canonical_name}'")
-            
-            # 1. İlişkileri yeniden yönlendir (rewire)
-            query_rewire = """
-            MATCH (dirty:BELGE {isim: $dirty_name})
-            MATCH (canonical:BELGE {isim: $canonical_name})
-            MATCH (c:CHUNK)-[r:ATIF_YAPAR]->(dirty)
-            MERGE (c)-[r_new:ATIF_YAPAR]->(canonical)
-            SET r_new = properties(r)
-            DELETE r
-            RETURN count(r_new) AS moved_count
-            """
-            result = self._run_query(query_rewire, {"dirty_name": dirty_name, "canonical_name": canonical_name})
-            if result is not None:
-                # .data() çağrısına gerek yok, result.single() zaten kaydı verir (eğer varsa)
-                count = result[0]["moved_count"] if (result and result[0]) else 0
-                print(f"  > {count} atıf ilişkisi '{canonical_name}' noduna taşındı.")
-
-            # 2. Artık ilişkisi kalmayan 'hatalı' nodu sil
-            query_delete = """
-            MATCH (dirty:BELGE {isim: $dirty_name})
-            WHERE NOT (()-[:ATIF_YAPAR]->(dirty)) AND NOT ((dirty)-[:ICERIR]->())
-            DELETE dirty
-            RETURN count(dirty) AS deleted_count
-            """
-            result = self._run_query(query_delete, {"dirty_name": dirty_name})
-            if result and result[0] and result[0]["deleted_count"] > 0:
-                print(f"  > '{dirty_name}' nodu başarıyla silindi.")
+        mappings = [{"dirty": dirty, "canonical": canonical} for dirty, canonical in mapping.items()]
+        try:
+            with self.driver.session(database=NEO4J_DATABASE) as session:
+                moved, deleted = session.execute_write(self._apply_mappings_tx, mappings)
+        except Exception as e:
+            print(f"[HATA] Kanonik eşleştirme başarısız, değişiklik yapılmadı: {e}", file=sys.stderr)
+            return
 
+        for dirty_name, canonical_name in mapping.items():
+            if moved.get(dirty_name):
+                print(f"  > '{dirty_name}' -> '{canonical_name}': {moved[dirty_name]} atıf ilişkisi taşındı.")
+        print(f"  > Toplam {sum(moved.values())} atıf ilişkisi taşındı, {deleted} hatalı nod silindi.")
         print("--- Kanonik Eşleştirme Tamamlandı ---")
 
 
@@ -103,8 +159,11 @@ def main():
 
     curator = GraphCurator(driver)
     
-    # Spesifik hataları düzelt
-    curator.fix_canonical_mappings(CANONICAL_MAPPING)
+    # Otomatik çözümlenenler + elle girilen spesifik hatalar (elle girilenler önceliklidir)
+    mapping = curator.resolve_dangling()
+    mapping.update(CANONICAL_MAPPING)
+    curator.fix_canonical_mappings(mapping)
+    print(format_citation_link_stats(citation_link_stats(driver)))
     
     print("\nGrafik kürasyonu tamamlandı.")
     driver.close()
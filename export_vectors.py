@@ -0,0 +1,22 @@
+import sys
+from neo4j import GraphDatabase
+from src.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE, VECTOR_STORE_PATH
+from src.vector_store import export_from_neo4j
+
+def main():
+    print(f"Yerel vektör indexi '{NEO4J_DATABASE}' veritabanından oluşturuluyor.")
+
+    try:
+        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        driver.verify_connectivity(database=NEO4J_DATABASE)
+    except Exception as e:
+        print(f"Neo4j'e bağlanılamadı: {e}", file=sys.stderr)
+        return
+
+    try:
+        export_from_neo4j(driver, VECTOR_STORE_PATH)
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,13 @@ import re
 import os
 from datetime import datetime
 from neo4j import GraphDatabase
-from src.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE
+from src.config import (
+    NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE, TELEMETRY_TRACE_PATH, TELEMETRY_METRICS_PATH
+)
 from src.embedding_utils import EmbeddingGenerator
+from src.cache import EmbeddingCache
 from src.retriever import ChatRetriever
+from src import telemetry
 
 LOG_FILENAME = "chat_history.txt"
 
@@ -37,7 +41,7 @@ def main():
         print(f"Neo4j'e bağlanılamadı: {e}", file=sys.stderr)
         return
 
-    embedder = EmbeddingGenerator()
+    embedder = EmbeddingGenerator(cache=EmbeddingCache())
     retriever = ChatRetriever(driver, embedder)
 
     try:
@@ -55,6 +59,13 @@ def main():
     except KeyboardInterrupt:
         print("\nÇıkış yapılıyor...")
     finally:
+        if retriever.answer_cache is not None:
+            print(retriever.answer_cache.stats())
+        if retriever.neighbor_cache is not None:
+            print(retriever.neighbor_cache.stats())
+        if telemetry.is_enabled():
+            telemetry.write_metrics()
+            print(f"Aşama izleri '{TELEMETRY_TRACE_PATH}', metrikler '{TELEMETRY_METRICS_PATH}' dosyasına yazıldı.")
         driver.close()
         print("Bağlantılar kapatıldı.")
 
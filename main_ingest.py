@@ -1,15 +1,116 @@
 import sys
 import re
+import argparse
 from neo4j import GraphDatabase
 from src.config import (
     NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, DATA_PATH, 
-    NEO4J_DATABASE
+    NEO4J_DATABASE, LOADER_WORKERS, DOCUMENT_REPORT_PATH,
+    PIPELINE_EMBED_WORKERS, PIPELINE_LLM_WORKERS, PIPELINE_WRITERS,
+    RETRIEVAL_BACKEND, TELEMETRY_TRACE_PATH, TELEMETRY_METRICS_PATH
 )
-from src.data_loader import load_documents_from_path
+from src.data_loader import iter_documents_from_path, list_document_names, LoadReport
 from src.embedding_utils import EmbeddingGenerator, setup_neo4j_vector_index
-from src.graph_builder import GraphBuilder
+from src.cache import EmbeddingCache, ExtractionCache, TextCache
+from src.graph_builder import (
+    GraphBuilder, setup_neo4j_property_indexes, citation_links_ready, materialize_citation_links,
+    citation_link_stats, format_citation_link_stats
+)
+from src.belge_resolver import BelgeResolver
+from src.csv_export import CsvGraphExporter, finalize_import
+from src.ingest_journal import IngestJournal
+from src.pipeline import IngestionPipeline
+from src.vector_store import export_from_neo4j
+from src import telemetry
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="GraphRAG mevzuat verisini Neo4j'ye yükler.")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Manifesti yok say, içeriği değişmemiş belgeleri de yeniden işle."
+    )
+    parser.add_argument(
+        "--loader-workers", type=int, default=LOADER_WORKERS,
+        help="PDF metin çıkarımı için paralel süreç sayısı."
+    )
+    parser.add_argument(
+        "--pipeline", action="store_true",
+        help="Aşamaları (chunk, embedding, LLM, yazma) eşzamanlı boru hattında çalıştır."
+    )
+    parser.add_argument("--embed-workers", type=int, default=PIPELINE_EMBED_WORKERS,
+                        help="Boru hattı: embedding iş parçacığı sayısı.")
+    parser.add_argument("--llm-workers", type=int, default=PIPELINE_LLM_WORKERS,
+                        help="Boru hattı: atıf çıkarımı (LLM) iş parçacığı sayısı.")
+    parser.add_argument("--writers", type=int, default=PIPELINE_WRITERS,
+                        help="Boru hattı: Neo4j yazıcı iş parçacığı sayısı.")
+    parser.add_argument(
+        "--relink", action="store_true",
+        help="Tüm belgelerin madde atıf kenarlarını (ATIF_MADDE) baştan çöz."
+    )
+    parser.add_argument(
+        "--reparse", action="store_true",
+        help="PDF metin önbelleğini yok say, tüm PDF'leri yeniden ayrıştır (boş/hatalı olanlar dahil)."
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Yarıda kalan son çalışmaya kaldığı yerden devam et (yükleme günlüğü ile)."
+    )
+    parser.add_argument(
+        "--csv-export", metavar="KLASOR",
+        help="Neo4j'ye yazma; tüm belgeleri 'neo4j-admin database import' için CSV olarak bu klasöre yaz."
+    )
+    parser.add_argument(
+        "--post-import", action="store_true",
+        help="'neo4j-admin' içe aktarımından sonra indexleri oluştur ve bekle (yükleme yapmaz)."
+    )
+    return parser.parse_args()
+
+def run_csv_export(args):
+    """
+    Tam yeniden kurulum: belgeler transaction'larla yazılmak yerine CSV'ye
+    aktarılır (Neo4j bağlantısı gerekmez). Chunk'lama, embedding ve atıf
+    çıkarımı normal yüklemeyle aynıdır; manifest yok sayılır.
+    """
+    embedder = EmbeddingGenerator(cache=EmbeddingCache())
+    document_names = list_document_names(DATA_PATH)
+    graph_builder = GraphBuilder(None, embedder, extraction_cache=ExtractionCache(),
+                                 resolver=BelgeResolver(document_names))
+    exporter = CsvGraphExporter(args.csv_export)
+
+    report = LoadReport()
+    text_cache = TextCache()
+    documents = iter_documents_from_path(DATA_PATH, workers=args.loader_workers, report=report,
+                                         text_cache=text_cache, reparse=args.reparse)
+    if args.pipeline:
+        pipeline = IngestionPipeline(graph_builder, embed_workers=args.embed_workers,
+                                     llm_workers=args.llm_workers, writers=args.writers)
+        pipeline.run(documents, write=exporter.add_document)
+    else:
+        for doc in documents:
+            print(f"İşleniyor: {doc.isim}")
+            try:
+                exporter.add_document(doc, graph_builder.prepare_chunks(doc))
+            except Exception as e:
+                print(f"[!!!] {doc.isim} işlenirken ciddi hata: {e}")
+    command = exporter.finish()
+    report.write(DOCUMENT_REPORT_PATH)
+
+    print(exporter.stats())
+    print(text_cache.stats())
+    print(embedder.cache.stats())
+    print(graph_builder.extraction_stats())
+    print(graph_builder.resolver.stats())
+    print("\nNeo4j durdurulduktan sonra içe aktarın (hedef veritabanı baştan oluşturulur):\n")
+    print(command)
+    print("\nArdından Neo4j'yi başlatıp indexleri kurun: python main_ingest.py --post-import")
+    if telemetry.is_enabled():
+        telemetry.write_metrics()
 
 def main():
+    args = parse_args()
+    if args.csv_export:
+        print(f"GraphRAG Mevzuat Projesi - '{args.csv_export}' klasörüne CSV dışa aktarımı başlatıldı")
+        run_csv_export(args)
+        return
     print(f"GraphRAG Mevzuat Projesi - Veri Yükleme '{NEO4J_DATABASE}' veritabanına başlatıldı")
 
     try:
@@ -20,33 +121,107 @@ def main():
         print(f"Neo4j'e bağlanılamadı: {e}", file=sys.stderr)
         return
 
-    # 1. Vektör İndexini Kur
+    if args.post_import:
+        finalize_import(driver)
+        print(format_citation_link_stats(citation_link_stats(driver)))
+        if RETRIEVAL_BACKEND == "local":
+            export_from_neo4j(driver)
+        driver.close()
+        return
+
+    # 1. Vektör ve Özellik İndexlerini Kur
     setup_neo4j_vector_index(driver)
+    setup_neo4j_property_indexes(driver)
     
     # 2. Embedding Modelini Başlat
-    embedder = EmbeddingGenerator()
+    embedder = EmbeddingGenerator(cache=EmbeddingCache())
     
-    # 3. Graph Builder'ı Başlat
-    graph_builder = GraphBuilder(driver, embedder)
+    # 3. Graph Builder'ı Başlat. Atıf hedefleri 'data/' klasöründeki belge isimlerine
+    # çözülerek yazılır; çözülemeyen ham adlar yine MERGE edilir ve Faz 2'de temizlenir.
+    document_names = list_document_names(DATA_PATH)
+    journal = IngestJournal()
+    previous_run = journal.start_run(resume=args.resume)
+    graph_builder = GraphBuilder(driver, embedder, extraction_cache=ExtractionCache(),
+                                 resolver=BelgeResolver(document_names), journal=journal)
 
-    # 4. Dokümanları Yükle
-    documents = load_documents_from_path(DATA_PATH)
-    if not documents:
-        print("İşlenecek doküman bulunamadı.")
-        return
-
-    # 'all_doc_names' listesi kaldırıldı, çünkü artık %100 eşleşme kontrolü yapmıyoruz.
-    print("Atıf mantığı: MERGE (Tüm atıflar node'a dönüştürülecek).")
-
-    # 5. Tüm Dokümanları İşle
-    for doc in documents:
+    # 4. Manifesti oku ve 'data/' klasöründen silinmiş belgeleri kaldır
+    manifest = graph_builder.get_manifest()
+    print(f"Manifest: Neo4j'de daha önce yüklenmiş {len(manifest)} belge bulundu.")
+    for belge_isim in sorted(set(manifest) - document_names):
         try:
-            # 'all_doc_names' parametresi olmadan çağır
-            graph_builder.process_document(doc)
+            graph_builder.remove_document(belge_isim)
         except Exception as e:
-            print(f"[!!!] {doc.isim} işlenirken ciddi hata: {e}")
+            print(f"[!!!] {belge_isim} kaldırılırken hata: {e}")
+
+    # 5. Yeni veya değişmiş dokümanları yükle (PDF'ler paralel okunur, hazır olan işlenir).
+    # Devam edilirken yarıda kalan çalışmada yazılmış belgeler --force ile de atlanır.
+    known_hashes = {} if args.force else dict(manifest)
+    if args.resume:
+        if previous_run is None:
+            print("[~] Devam edilecek bir çalışma bulunamadı, yeni çalışma başlatıldı.")
+        else:
+            completed = journal.completed_documents()
+            known_hashes.update(completed)
+            print(f"[~] {previous_run} numaralı çalışmaya devam ediliyor: {len(completed)} belge zaten yazılmış.")
+            for belge_isim in sorted(journal.interrupted_documents()):
+                print(f"   [~] Yarım kalan belge: {belge_isim} (yazma tek transaction olduğundan grafta yarım "
+                      f"kayıt yok; tamamlanmış LLM çıkarımları atıf çıkarım önbelleğinden alınacak)")
+    report = LoadReport()
+    text_cache = TextCache()
+    documents = iter_documents_from_path(
+        DATA_PATH,
+        known_hashes=known_hashes or None,
+        workers=args.loader_workers,
+        report=report,
+        text_cache=text_cache,
+        reparse=args.reparse
+    )
+
+    print(f"Atıf mantığı: MERGE ({len(graph_builder.resolver)} kanonik belge ismine çözümleme ile).")
+
+    # 6. Yeni/Değişmiş Dokümanları İşle (eski chunk'lar atomik olarak değiştirilir)
+    if args.pipeline:
+        pipeline = IngestionPipeline(
+            graph_builder,
+            embed_workers=args.embed_workers,
+            llm_workers=args.llm_workers,
+            writers=args.writers
+        )
+        pipeline.run(documents)
+    else:
+        for doc in documents:
+            try:
+                graph_builder.process_document(doc)
+            except Exception as e:
+                print(f"[!!!] {doc.isim} işlenirken ciddi hata: {e}")
+
+    report.write(DOCUMENT_REPORT_PATH)
+    print(f"Okuma özeti '{DOCUMENT_REPORT_PATH}' dosyasına yazıldı: "
+          f"{len(report.loaded)} okundu, {len(report.unchanged)} değişmemiş, "
+          f"{len(report.empty) + len(report.failed)} okunamadı/boş.")
+    # 7. Madde atıf kenarları yeni/değişen belgeler için yazma sırasında artımlı olarak
+    # çözüldü. Kenarlardan önce kurulmuş graflar (veya --relink) bir kez baştan bağlanır.
+    if args.relink or not citation_links_ready(driver):
+        belgeler = sorted(graph_builder.get_manifest())
+        kenar = materialize_citation_links(driver, belgeler)
+        print(f"Madde atıf kenarları {len(belgeler)} belge için baştan çözüldü ({kenar} kenar).")
+    print(format_citation_link_stats(citation_link_stats(driver)))
+
+    # 8. Süreç içi vektör araması kullanılıyorsa yerel indexi graf ile eşitle
+    if RETRIEVAL_BACKEND == "local":
+        export_from_neo4j(driver)
 
+    journal.finish_run()
     print("Veri yükleme tamamlandı.")
+    print(text_cache.stats())
+    print(embedder.cache.stats())
+    print(graph_builder.extraction_stats())
+    print(graph_builder.resolver.stats())
+    print(graph_builder.extraction_cache.stats())
+    print(f"Bu çalışmada LLM'e harcanan süre: {graph_builder.llm_seconds:.1f} sn")
+    if telemetry.is_enabled():
+        telemetry.write_metrics()
+        print(f"Aşama izleri '{TELEMETRY_TRACE_PATH}', metrikler '{TELEMETRY_METRICS_PATH}' dosyasına yazıldı.")
     driver.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+import sys
+import asyncio
+import argparse
+from neo4j import GraphDatabase
+from src.config import (
+    NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE,
+    SERVER_HOST, SERVER_PORT, MAX_CONCURRENT_GENERATIONS
+)
+from src.embedding_utils import EmbeddingGenerator
+from src.cache import EmbeddingCache
+from src.retriever import ChatRetriever
+from src.server import QueryServer
+
+def main():
+    parser = argparse.ArgumentParser(description="GraphRAG mevzuat sorgu servisi (HTTP + Server-Sent Events).")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--max-generations", type=int, default=MAX_CONCURRENT_GENERATIONS,
+                        help="Aynı anda Ollama'ya gönderilen cevap üretimi üst sınırı")
+    args = parser.parse_args()
+
+    try:
+        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        driver.verify_connectivity(database=NEO4J_DATABASE)
+        print(f"Neo4j bağlantısı başarılı. (Kullanıcı: {NEO4J_USER}, Veritabanı: {NEO4J_DATABASE})")
+    except Exception as e:
+        print(f"Neo4j'e bağlanılamadı: {e}", file=sys.stderr)
+        return
+
+    embedder = EmbeddingGenerator(cache=EmbeddingCache())
+    retriever = ChatRetriever(driver, embedder)
+    server = QueryServer(retriever, host=args.host, port=args.port, max_generations=args.max_generations)
+
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("\nServis durduruluyor...")
+    finally:
+        driver.close()
+        print("Bağlantılar kapatıldı.")
+
+if __name__ == "__main__":
+    main()
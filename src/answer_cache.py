@@ -0,0 +1,167 @@
+import time
+import threading
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+from .config import (
+    ANSWER_CACHE_SIMILARITY, ANSWER_CACHE_TTL_SECONDS, ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_GENERATION_CHECK_SECONDS
+)
+from .embedding_utils import normalize_text
+
+
+@dataclass
+class _CachedAnswer:
+    answer: str
+    vector: Optional[np.ndarray]  # Normalize edilmiş sorgu embedding'i (yoksa yalnızca metin eşleşir)
+    created: float
+    kapsam: str = ""              # Kurum/tür filtresi ve anılan belge/madde numaraları (yalnızca aynı kapsamdaki sorulara döner)
+
+
+class AnswerCache:
+    """
+    Sık sorulan ve birbirine çok benzeyen sorular için bellek içi cevap önbelleği.
+
+    Önce normalleştirilmiş soru metni birebir aranır (embedding gerekmez), sonra
+    sorgu embedding'inin kayıtlı sorulara kosinüs benzerliği 'similarity'
+    eşiğine bakılır. Kayıtlar 'ttl_seconds' sonra geçersiz olur; 'max_entries'
+    aşılınca en uzun süredir kullanılmayan kayıt atılır. 'kapsam' (kurum/tür
+    filtresi, sorguda anılan belge/madde numaraları) farklı olan kayıtlar
+    birbirinin yerine kullanılmaz: "TEİAŞ'ta ..." ile "TEDAŞ'ta ..." ya da
+    "14. madde" ile "15. madde" sorusu ne kadar benzer olsa da ayrı cevaplardır.
+
+    'generation_reader' verilirse graf nesil sayacı en fazla
+    'generation_check_seconds' aralıkla okunur; sayaç değişmişse (yeni yükleme,
+    belge silme, kürasyon) tüm önbellek boşaltılır.
+    """
+    def __init__(self, similarity: float = ANSWER_CACHE_SIMILARITY,
+                 ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+                 max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+                 generation_reader: Optional[Callable[[], int]] = None,
+                 generation_check_seconds: float = ANSWER_CACHE_GENERATION_CHECK_SECONDS):
+        self.similarity = similarity
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.generation_reader = generation_reader
+        self.generation_check_seconds = generation_check_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, _CachedAnswer]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._generation_checked = 0.0
+        # Benzerlik araması için kayıt vektörlerinden oluşan matris; kayıtlar değişince yeniden kurulur
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: list = []
+        self._matrix_scopes: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def _refresh_generation(self):
+        if self.generation_reader is None:
+            return
+        now = time.monotonic()
+        if now - self._generation_checked < self.generation_check_seconds:
+            return
+        self._generation_checked = now
+        try:
+            generation = self.generation_reader()
+        except Exception as e:
+            print(f"[!] Graf nesil sayacı okunamadı, cevap önbelleği boşaltılıyor: {e}")
+            generation = None
+        if generation != self._generation or generation is None:
+            if self._entries:
+                print(f"[~] Graf değişti (nesil {self._generation} -> {generation}), "
+                      f"cevap önbelleğindeki {len(self._entries)} kayıt silindi.")
+            self._entries.clear()
+            self._matrix = None
+        self._generation = generation
+
+    def _expired(self, entry: _CachedAnswer) -> bool:
+        return time.monotonic() - entry.created > self.ttl_seconds
+
+    def _evict_expired(self):
+        expired = [key for key, entry in self._entries.items() if self._expired(entry)]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _hit(self, key: str, entry: _CachedAnswer):
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.answer
+
+    @staticmethod
+    def _normalize_vector(embedding) -> Optional[np.ndarray]:
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    @staticmethod
+    def _key(query: str, kapsam: str) -> str:
+        key = normalize_text(query).lower()
+        return f"{key}\x00{kapsam}" if kapsam else key
+
+    def lookup_text(self, query: str, kapsam: str = "") -> Optional[str]:
+        """Normalleştirilmiş metni (ve kapsamı) birebir aynı olan bir soru önbellekteyse cevabını döndürür."""
+        key = self._key(query, kapsam)
+        with self._lock:
+            self._refresh_generation()
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry):
+                return None
+            return self._hit(key, entry)
+
+    def lookup(self, query_embedding, kapsam: str = "") -> Optional[Tuple[str, float]]:
+        """Aynı kapsamda embedding'i eşiğin üzerinde benzer bir soru varsa (cevap, benzerlik) döndürür."""
+        vector = self._normalize_vector(query_embedding)
+        with self._lock:
+            self._refresh_generation()
+            self._evict_expired()
+            if vector is None:
+                self.misses += 1
+                return None
+            if self._matrix is None:
+                self._matrix_keys = [key for key, entry in self._entries.items() if entry.vector is not None]
+                self._matrix = (np.vstack([self._entries[key].vector for key in self._matrix_keys])
+                                if self._matrix_keys else np.zeros((0, len(vector)), dtype=np.float32))
+                self._matrix_scopes = np.asarray([self._entries[key].kapsam for key in self._matrix_keys],
+                                                 dtype=object)
+            if not len(self._matrix_keys) or self._matrix.shape[1] != len(vector):
+                self.misses += 1
+                return None
+            similarities = self._matrix @ vector
+            similarities[self._matrix_scopes != kapsam] = -np.inf
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity:
+                self.misses += 1
+                return None
+            key = self._matrix_keys[best]
+            return self._hit(key, self._entries[key]), float(similarities[best])
+
+    def put(self, query: str, query_embedding, answer: str, kapsam: str = ""):
+        key = self._key(query, kapsam)
+        with self._lock:
+            self._refresh_generation()
+            self._entries[key] = _CachedAnswer(answer, self._normalize_vector(query_embedding), time.monotonic(),
+                                               kapsam)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        oran = (self.hits / total * 100) if total else 0.0
+        return (f"Cevap önbelleği: {len(self._entries)} kayıt, {self.hits} isabet / "
+                f"{self.misses} ıskalama (%{oran:.1f} isabet)")
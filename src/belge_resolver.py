@@ -0,0 +1,186 @@
+import re
+import threading
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+from .config import BELGE_FUZZY_THRESHOLD, BELGE_FUZZY_MARGIN
+
+# Atıflardaki ham belge adlarını ('6446 sayılı kanun', 'Elektrik Piyasası Kanununun')
+# graftaki kanonik BELGE isimlerine (data/ klasöründeki dosya adları) çözer.
+
+_TR_LOWER = str.maketrans("Iİ", "ıi")
+_KESME_EKI_PATTERN = re.compile(r"['’`]\w*")          # "KHK'nin" -> "KHK"
+_AYRAC_PATTERN = re.compile(r"[^\w]+|_")
+_NUMARA_PATTERN = re.compile(r"^\d{2,5}$")
+_OZ_ATIF_PATTERN = re.compile(r"^(?:bu|işbu)\b")
+# Çekim eklerini atarak kelimeyi kök haline getirir: "kanununun" -> "kanun"
+_KOK_ONEKLERI = (
+    ("kanun", "kanun"), ("yönetmeli", "yönetmelik"), ("kararname", "kararname"),
+    ("khk", "khk"), ("yönerge", "yönerge"), ("tebliğ", "tebliğ"), ("esas", "esaslar"),
+)
+_DOLGU_KELIMELERI = {"sayılı", "sayili"}
+_BELGE_CINSLERI = ("khk", "kararname", "kanun", "yönetmelik", "yönerge", "tebliğ", "esaslar")
+
+
+def _tr_lower(text: str) -> str:
+    return text.translate(_TR_LOWER).lower()
+
+
+def _kok_kelimeler(isim: str) -> List[str]:
+    """Türkçe küçük harf, kesme ekleri ve noktalama atılmış, çekimleri köke indirilmiş kelimeler."""
+    metin = _KESME_EKI_PATTERN.sub("", _tr_lower(isim))
+    metin = metin.replace("kanun hükmünde kararname", "khk")
+    kelimeler = []
+    for kelime in _AYRAC_PATTERN.sub(" ", metin).split():
+        for onek, kok in _KOK_ONEKLERI:
+            if kelime.startswith(onek):
+                kelime = kok
+                break
+        kelimeler.append(kelime)
+    return kelimeler
+
+
+def normalize_belge_adi(isim: str) -> str:
+    """
+    Belge adını karşılaştırma anahtarına çevirir: Türkçe küçük harf, kesme
+    ekleri ve noktalama atılır, 'kanun hükmünde kararname' -> 'khk', 'sayılı'
+    kelimesi atılır, 'kanunu/kanununun' gibi çekimler köke indirilir.
+    """
+    return " ".join(kelime for kelime in _kok_kelimeler(isim) if kelime not in _DOLGU_KELIMELERI)
+
+
+def _belge_cinsi_kelimeler(kelimeler: List[str]) -> Optional[str]:
+    # Başlığın kendi cinsi son cins kelimesidir: "... 4734 sayılı Kamu İhale Kanununun ... Hakkında Yönetmelik"
+    for kelime in reversed(kelimeler):
+        if kelime in _BELGE_CINSLERI:
+            return kelime
+    return None
+
+
+def extract_belge_numarasi(isim: str) -> Optional[str]:
+    """
+    Belgenin kendi kanun/KHK numarası: baştaki numara ('6446 Elektrik Piyasası
+    Kanunu') ya da ardından gelen ilk cins kelimesi başlığın kendi cinsi olan
+    'N sayılı' ('6446 sayılı Kanun', '233 Sayılı KHK'). Başlıkta yalnızca anılan
+    başka bir kanunun numarası ('7244 sayılı Kanunun ... Usul ve Esasları',
+    '7429 Sayılı Kanun Kapsamında ... Usul ve Esaslar') belgenin numarası değildir.
+    """
+    kelimeler = _kok_kelimeler(isim)
+    cins = _belge_cinsi_kelimeler(kelimeler)
+    for i, kelime in enumerate(kelimeler):
+        if not _NUMARA_PATTERN.match(kelime):
+            continue
+        sonraki = kelimeler[i + 1:]
+        if sonraki and sonraki[0] in _DOLGU_KELIMELERI:
+            anilan = next((k for k in sonraki if k in _BELGE_CINSLERI), None)
+            if anilan is None or anilan == cins:
+                return kelime
+        elif i == 0:
+            return kelime
+    return None
+
+
+def _belge_cinsi(anahtar: str) -> Optional[str]:
+    return _belge_cinsi_kelimeler(anahtar.split())
+
+
+def _numarasiz(anahtar: str) -> str:
+    return " ".join(kelime for kelime in anahtar.split() if not kelime.isdigit())
+
+
+class BelgeResolver:
+    """
+    Ham atıf hedeflerini bilinen kanonik belge isimlerine eşler:
+      1. Normalleştirilmiş ad birebir eşleşiyorsa o belge.
+      2. 'bu Kanun' gibi öz atıflar atıf yapan belgenin kendisi.
+      3. Kanun/KHK numarası varsa aynı numaralı (ve aynı cinsten) tek belge;
+         birden çoksa bunlar arasında bulanık eşleşme. Numara bilinen hiçbir
+         belgede yoksa (külliyat dışı bir kanun) çözülmez.
+      4. Numara yoksa tüm belgeler arasında difflib benzerliği; en iyi aday
+         eşiği geçmeli ve ikinciden 'margin' kadar ayrışmalıdır (ör. iki farklı
+         'Elektrik Piyasası Kanunu' varken tahmin yapılmaz).
+    Çözülemeyen adlar None döner; çağıran ham adı kullanır ve bunlar Faz 2'de
+    (curate_graph.py) temizlenir. Sonuçlar ham ada göre önbelleklenir.
+    """
+    def __init__(self, canonical_names: Iterable[str], threshold: float = BELGE_FUZZY_THRESHOLD,
+                 margin: float = BELGE_FUZZY_MARGIN):
+        self.threshold = threshold
+        self.margin = margin
+        self._by_key: Dict[str, List[str]] = {}
+        self._by_numara: Dict[str, List[str]] = {}
+        self._entries: List[Tuple[str, str, Optional[str]]] = []  # (isim, numarasız anahtar, cins)
+        self._memo: Dict[Tuple[str, Optional[str]], Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.resolved = 0
+        self.unresolved = 0
+        for isim in sorted(set(canonical_names)):
+            anahtar = normalize_belge_adi(isim)
+            self._by_key.setdefault(anahtar, []).append(isim)
+            numara = extract_belge_numarasi(isim)
+            if numara:
+                self._by_numara.setdefault(numara, []).append(isim)
+            self._entries.append((isim, _numarasiz(anahtar), _belge_cinsi(anahtar)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _fuzzy(self, anahtar: str, adaylar: List[Tuple[str, str, Optional[str]]]) -> Optional[str]:
+        hedef = _numarasiz(anahtar)
+        if not hedef:
+            return None
+        matcher = SequenceMatcher(autojunk=False)
+        matcher.set_seq2(hedef)
+        skorlar = []
+        for isim, aday, _ in adaylar:
+            matcher.set_seq1(aday)
+            # Ucuz üst sınırlar eşiğin altındaysa tam hesaplamaya gerek yok
+            if matcher.real_quick_ratio() >= self.threshold and matcher.quick_ratio() >= self.threshold:
+                skorlar.append((matcher.ratio(), isim))
+        skorlar.sort(reverse=True)
+        if not skorlar or skorlar[0][0] < self.threshold:
+            return None
+        if len(skorlar) > 1 and skorlar[0][0] - skorlar[1][0] < self.margin:
+            return None
+        return skorlar[0][1]
+
+    def _resolve(self, ham_isim: str, doc_name: Optional[str]) -> Optional[str]:
+        anahtar = normalize_belge_adi(ham_isim)
+        if not anahtar:
+            return None
+        birebir = self._by_key.get(anahtar)
+        if birebir:
+            return birebir[0] if len(birebir) == 1 else None
+        if doc_name and _OZ_ATIF_PATTERN.match(anahtar):
+            return doc_name
+
+        cins = _belge_cinsi(anahtar)
+        numara = extract_belge_numarasi(ham_isim)
+        if numara:
+            adaylar = [
+                entry for entry in self._entries
+                if entry[0] in self._by_numara.get(numara, ()) and (cins is None or entry[2] in (None, cins))
+            ]
+            if len(adaylar) <= 1:
+                return adaylar[0][0] if adaylar else None
+            # Aynı numaralı birden çok belge: adlarına göre seç, ayırt edilemiyorsa tahmin etme
+            return self._fuzzy(anahtar, adaylar)
+        return self._fuzzy(anahtar, self._entries)
+
+    def resolve(self, ham_isim: str, doc_name: Optional[str] = None) -> Optional[str]:
+        """Ham adın kanonik belge ismini döndürür; güvenle çözülemezse None."""
+        memo_key = (ham_isim, doc_name if ham_isim and _OZ_ATIF_PATTERN.match(_tr_lower(ham_isim.strip())) else None)
+        with self._lock:
+            if memo_key in self._memo:
+                sonuc = self._memo[memo_key]
+            else:
+                sonuc = self._memo[memo_key] = self._resolve(ham_isim, doc_name)
+            if sonuc is None:
+                self.unresolved += 1
+            else:
+                self.resolved += 1
+        return sonuc
+
+    def stats(self) -> str:
+        total = self.resolved + self.unresolved
+        rate = (100.0 * self.resolved / total) if total else 0.0
+        return (f"Belge adı çözümleme: {total} atıf hedefi, {self.resolved} tanesi kanonik belgeye "
+                f"eşlendi (%{rate:.1f}), {self.unresolved} tanesi ham adıyla yazıldı")
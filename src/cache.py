@@ -0,0 +1,320 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import zlib
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from .config import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES, EXTRACTION_CACHE_PATH, TEXT_CACHE_PATH
+
+
+def _open_sqlite(path: str) -> sqlite3.Connection:
+    """Önbellek dosyası için (gerekirse klasörünü oluşturarak) SQLite bağlantısı açar."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class EmbeddingCache:
+    """
+    Embedding'ler için kalıcı, içerik adresli önbellek (SQLite).
+
+    Anahtar: embedding modeli adı + normalleştirilmiş metnin SHA-256 özeti.
+    Vektörler float32 olarak saklanır. Kayıt sayısı 'max_entries'ı aşınca
+    en uzun süredir kullanılmayan (LRU) kayıtlar silinir.
+    """
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH,
+                 max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = _open_sqlite(path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                anahtar TEXT PRIMARY KEY,
+                vektor BLOB NOT NULL,
+                son_erisim INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_son_erisim ON embeddings(son_erisim)"
+        )
+        self._conn.commit()
+        # LRU sırası için artan bir sayaç (duvar saatinden bağımsız)
+        row = self._conn.execute("SELECT COALESCE(MAX(son_erisim), 0) FROM embeddings").fetchone()
+        self._clock = row[0]
+
+    @staticmethod
+    def make_key(model: str, normalized_text: str) -> str:
+        return hashlib.sha256(f"{model}\n{normalized_text}".encode("utf-8")).hexdigest()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Bulunan anahtarları vektörleriyle döndürür ve erişim zamanlarını günceller."""
+        found = {}
+        if not keys:
+            return found
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), 500):  # SQLite parametre sınırı
+                part = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT anahtar, vektor FROM embeddings WHERE anahtar IN ({placeholders})", part
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                stamp = self._tick()
+                self._conn.executemany(
+                    "UPDATE embeddings SET son_erisim = ? WHERE anahtar = ?",
+                    [(stamp, key) for key in found]
+                )
+                self._conn.commit()
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def get(self, key: str) -> Optional[List[float]]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, List[float]]):
+        """Vektörleri kaydeder; boyut sınırı aşılırsa LRU kayıtları siler."""
+        if not items:
+            return
+        with self._lock:
+            stamp = self._tick()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (anahtar, vektor, son_erisim) VALUES (?, ?, ?)",
+                [(key, array("f", vector).tobytes(), stamp) for key, vector in items.items()]
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    """
+                    DELETE FROM embeddings WHERE anahtar IN (
+                        SELECT anahtar FROM embeddings ORDER BY son_erisim ASC LIMIT ?
+                    )
+                    """,
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def put(self, key: str, vector: List[float]):
+        self.put_many({key: vector})
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return f"Embedding önbelleği: {self.hits} isabet, {self.misses} ıska (%{rate:.1f} isabet)"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ExtractionCache:
+    """
+    LLM atıf çıkarımı ('atiflar_raw') sonuçları için kalıcı önbellek (SQLite).
+
+    Anahtar: chunk metninin SHA-256 özeti + LLM modeli + sistem prompt'unun özeti.
+    Prompt veya model değişince eski kayıtlar artık eşleşmez; 'purge_stale'
+    ile diskten de silinebilir. Her kayıtla birlikte LLM çağrısının süresi
+    saklanır, böylece önbellekten dönen her sonuç için kazanılan süre raporlanır.
+    """
+    def __init__(self, path: str = EXTRACTION_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._conn = _open_sqlite(path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cikarimlar (
+                metin_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                sonuc TEXT NOT NULL,
+                llm_suresi REAL NOT NULL,
+                PRIMARY KEY (metin_hash, model, prompt_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, chunk_text: str, model: str, prompt_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sonuc, llm_suresi FROM cikarimlar "
+                "WHERE metin_hash = ? AND model = ? AND prompt_hash = ?",
+                (self.hash_text(chunk_text), model, prompt_hash)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += row[1]
+        return json.loads(row[0])
+
+    def put(self, chunk_text: str, model: str, prompt_hash: str,
+            result: Dict[str, Any], llm_seconds: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cikarimlar "
+                "(metin_hash, model, prompt_hash, sonuc, llm_suresi) VALUES (?, ?, ?, ?, ?)",
+                (self.hash_text(chunk_text), model, prompt_hash,
+                 json.dumps(result, ensure_ascii=False), llm_seconds)
+            )
+            self._conn.commit()
+
+    def purge_stale(self, model: str, prompt_hash: str) -> int:
+        """Güncel model/prompt ikilisine ait olmayan kayıtları siler, silinen sayısını döndürür."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cikarimlar WHERE model != ? OR prompt_hash != ?",
+                (model, prompt_hash)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self) -> str:
+        return (f"Atıf çıkarım önbelleği: {self.hits} isabet, {self.misses} ıska, "
+                f"kazanılan LLM süresi: {self.saved_seconds:.1f} sn")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class CachedText:
+    """Bir PDF için önbellekteki ayrıştırma sonucu (metnin kendisi ayrıca okunur)."""
+    icerik_hash: str
+    sayfa_sayisi: int
+    bos: bool              # Ayrıştırıldı ama metin çıkmadı (taranmış/görsel PDF)
+    hata: Optional[str]    # Ayrıştırma hata verdiyse mesajı
+
+
+class TextCache:
+    """
+    PDF'lerden çıkarılan metinler için kalıcı önbellek (SQLite, sayfa başına zlib).
+
+    Kayıtlar dosya yoluna göre tutulur ve dosyanın boyutu, değişiklik zamanı
+    (mtime) ve içerik özetiyle (SHA-256) doğrulanır: boyut ve mtime aynıysa
+    dosya hiç okunmaz (özeti de önbellekten gelir); farklıysa özet yeniden
+    hesaplanır ve yalnızca içerik aynıysa kayıt kullanılır. Metin çıkmayan ve
+    ayrıştırılamayan dosyalar da kaydedilir, böylece her çalışmada yeniden
+    denenmezler ('main_ingest.py --reparse' ile hepsi yeniden ayrıştırılır).
+    """
+    def __init__(self, path: str = TEXT_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = _open_sqlite(path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS belgeler (
+                yol TEXT PRIMARY KEY,
+                boyut INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                icerik_hash TEXT NOT NULL,
+                sayfa_sayisi INTEGER NOT NULL,
+                bos INTEGER NOT NULL,
+                hata TEXT
+            );
+            CREATE TABLE IF NOT EXISTS sayfalar (
+                yol TEXT NOT NULL,
+                sayfa_no INTEGER NOT NULL,
+                metin BLOB NOT NULL,
+                PRIMARY KEY (yol, sayfa_no)
+            );
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _entry(row) -> CachedText:
+        return CachedText(icerik_hash=row[0], sayfa_sayisi=row[1], bos=bool(row[2]), hata=row[3])
+
+    def lookup(self, yol: str, boyut: int, mtime_ns: int) -> Optional[CachedText]:
+        """Dosyanın boyutu ve mtime'ı kayıtla aynıysa kaydı döndürür (dosya okunmadan)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT icerik_hash, sayfa_sayisi, bos, hata FROM belgeler "
+                "WHERE yol = ? AND boyut = ? AND mtime_ns = ?",
+                (yol, boyut, mtime_ns)
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def lookup_by_hash(self, yol: str, icerik_hash: str, boyut: int, mtime_ns: int) -> Optional[CachedText]:
+        """
+        Boyut/mtime değiştiğinde (ör. dosya kopyalandı) içerik özetiyle doğrular;
+        içerik aynıysa kaydın boyut/mtime bilgisi güncellenir.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT icerik_hash, sayfa_sayisi, bos, hata FROM belgeler WHERE yol = ? AND icerik_hash = ?",
+                (yol, icerik_hash)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE belgeler SET boyut = ?, mtime_ns = ? WHERE yol = ?",
+                               (boyut, mtime_ns, yol))
+            self._conn.commit()
+        return self._entry(row)
+
+    def read_pages(self, yol: str) -> List[str]:
+        """Kayıtlı sayfa metinlerini sırasıyla döndürür."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT metin FROM sayfalar WHERE yol = ? ORDER BY sayfa_no", (yol,)
+            ).fetchall()
+            self.hits += 1
+        return [zlib.decompress(blob).decode("utf-8") for (blob,) in rows]
+
+    def put(self, yol: str, boyut: int, mtime_ns: int, icerik_hash: str,
+            pages: Optional[List[str]] = None, hata: Optional[str] = None):
+        """Ayrıştırma sonucunu (sayfalar ya da hata) dosyanın eski kaydının yerine yazar."""
+        pages = pages or []
+        bos = hata is None and not "".join(pages).strip()
+        with self._lock:
+            self.misses += 1
+            self._conn.execute("DELETE FROM sayfalar WHERE yol = ?", (yol,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO belgeler (yol, boyut, mtime_ns, icerik_hash, sayfa_sayisi, bos, hata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (yol, boyut, mtime_ns, icerik_hash, len(pages), int(bos), hata)
+            )
+            if not bos:
+                self._conn.executemany(
+                    "INSERT INTO sayfalar (yol, sayfa_no, metin) VALUES (?, ?, ?)",
+                    [(yol, i, zlib.compress(page.encode("utf-8"), 6)) for i, page in enumerate(pages)]
+                )
+            self._conn.commit()
+
+    def stats(self) -> str:
+        return (f"PDF metin önbelleği: {self.hits} belge önbellekten okundu, "
+                f"{self.misses} belge ayrıştırılıp kaydedildi")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
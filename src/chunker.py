@@ -1,8 +1,141 @@
 import re
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from .config import MADDE_REGEX, CHUNK_SIZE, CHUNK_OVERLAP
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+# Madde başlığından türü ve numarayı ayırır: "Geçici Madde 3" -> ("Geçici Madde", 3)
+_MADDE_BASLIGI_PATTERN = re.compile(r"(Geçici Madde|Ek Madde|Madde)\s+(\d+)", re.IGNORECASE)
+_MADDE_TURLERI = {"geçici madde": "Geçici Madde", "ek madde": "Ek Madde", "madde": "Madde"}
+
+def parse_madde_basligi(madde_basligi: str) -> Tuple[Optional[str], Optional[int]]:
+    """Madde başlığından (madde_turu, madde_no) çıkarır; başlık değilse (None, None)."""
+    match = _MADDE_BASLIGI_PATTERN.search(madde_basligi)
+    if not match:
+        return None, None
+    madde_turu = _MADDE_TURLERI.get(
+        re.sub(r"\s+", " ", match.group(1)).replace("İ", "i").lower(), "Madde"
+    )
+    return madde_turu, int(match.group(2))
+
+# Derlenmiş desenler ve tek bir alt bölücü tüm çağrılarda yeniden kullanılır
+# (bölücü durumsuzdur; boru hattının chunk iş parçacıkları paylaşabilir).
+_MADDE_PATTERN = re.compile(MADDE_REGEX, re.IGNORECASE | re.MULTILINE)
+_SUB_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP,
+    separators=["\n\n", "\n", ". ", " ", ""]
+)
+
+def _giris_chunks(giris_metni: str) -> Iterator[Dict[str, Any]]:
+    if not giris_metni:
+        return
+    if len(giris_metni) > CHUNK_SIZE:
+        for j, sub_text in enumerate(_SUB_SPLITTER.split_text(giris_metni)):
+            yield {
+                "metin": sub_text,
+                "madde_basligi_tahmini": f"Giriş (Bölüm {j+1})",
+                "madde_turu": None,
+                "madde_no": None,
+                "bolum": j + 1
+            }
+    else:
+        yield {
+            "metin": giris_metni,
+            "madde_basligi_tahmini": "Giriş",
+            "madde_turu": None,
+            "madde_no": None,
+            "bolum": None
+        }
+
+def _madde_chunks(madde_basligi: str, madde_icerigi: str) -> Iterator[Dict[str, Any]]:
+    madde_basligi_tahmini = madde_basligi.split('\n')[0]
+    madde_turu, madde_no = parse_madde_basligi(madde_basligi_tahmini)
+    full_length = len(madde_basligi) + 1 + len(madde_icerigi)
+
+    if full_length > CHUNK_SIZE:
+        print(f"   [!] Uzun madde bölünüyor: {madde_basligi_tahmini} ({full_length} char)")
+        for j, sub_text in enumerate(_SUB_SPLITTER.split_text(madde_icerigi)):
+            yield {
+                "metin": f"{madde_basligi}\n(Bölüm {j+1})\n{sub_text}",
+                "madde_basligi_tahmini": f"{madde_basligi_tahmini} (Bölüm {j+1})",
+                "madde_turu": madde_turu,
+                "madde_no": madde_no,
+                "bolum": j + 1
+            }
+    else:
+        yield {
+            "metin": f"{madde_basligi}\n{madde_icerigi}".strip(),
+            "madde_basligi_tahmini": madde_basligi_tahmini,
+            "madde_turu": madde_turu,
+            "madde_no": madde_no,
+            "bolum": None
+        }
+
+def _resume_position(buffer: str, search_from: int) -> int:
+    """
+    Tamponun sonuna kadar okuyup karar veremeyen (devamı gelince eşleşebilecek)
+    ilk arama başlangıcını bulur. Başlık deseni yalnızca bir satır başında ya da
+    '\n' üzerinde başlayıp boşlukları atlayarak anahtar kelimeye ulaşabildiği
+    için, son satır sonunu içeren boşluk dizisinden önceki denemeler kesindir.
+    """
+    last_newline = buffer.rfind("\n", search_from)
+    if last_newline == -1:
+        return search_from
+    while last_newline > search_from and buffer[last_newline - 1].isspace():
+        last_newline -= 1
+    return last_newline
+
+def iter_chunks(text_parts: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    'chunk_document_by_article' ile aynı chunk'ları, metni parça parça (ör.
+    PDF sayfaları) okuyarak ve madde sınırları bulundukça üretir.
+
+    Doküman metni "".join(text_parts) olarak kabul edilir; sonuç bu metnin
+    tamamı üzerinde 'chunk_document_by_article' çağrılmasıyla birebir aynıdır.
+    Bellekte yalnızca henüz kapanmamış madde (ve son okunan parça) tutulur;
+    her madde bir sonraki başlık görülünce üretilir. Başlık araması son
+    karar verilen konumdan devam ettiği için toplam iş metin boyuyla doğrusaldır.
+    """
+    buffer = ""
+    segment_start = 0   # Henüz üretilmemiş bölümün (giriş ya da bekleyen madde) tampondaki başı
+    header_end = None   # Bekleyen madde başlığının tampondaki bitişi (giriş metninde None)
+    search_from = 0
+
+    def close_segment(end: int) -> Iterator[Dict[str, Any]]:
+        if header_end is None:
+            yield from _giris_chunks(buffer[segment_start:end].strip())
+        else:
+            yield from _madde_chunks(buffer[segment_start:header_end].strip(), buffer[header_end:end].strip())
+
+    def scan(final: bool) -> Iterator[Dict[str, Any]]:
+        nonlocal segment_start, header_end, search_from
+        while True:
+            match = _MADDE_PATTERN.search(buffer, search_from)
+            # Tamponun sonuna değen eşleşme devam eden metinle değişebilir (ör. "Madde 1" + "2")
+            if match is None or (not final and match.end() >= len(buffer)):
+                search_from = match.start() if match else _resume_position(buffer, search_from)
+                return
+            yield from close_segment(match.start())
+            segment_start, header_end = match.start(), match.end()
+            search_from = header_end
+
+    for part in text_parts:
+        if not part:
+            continue
+        # Üretilmiş bölümler parça başına bir kez atılır; tampon bekleyen bölümden başlar.
+        # '^' kontrolü için önceki karakter gerekmez: arama her zaman başlığın bitişinden
+        # (ya da belgenin gerçek başından) sonra devam eder.
+        if segment_start:
+            buffer = buffer[segment_start:]
+            search_from -= segment_start
+            if header_end is not None:
+                header_end -= segment_start
+            segment_start = 0
+        buffer += part
+        yield from scan(final=False)
+    yield from scan(final=True)
+    yield from close_segment(len(buffer))
+
 def chunk_document_by_article(document_text: str) -> List[Dict[str, Any]]:
     """
     Bir doküman metnini hiyerarşik olarak chunk'lara ayırır.
@@ -12,60 +145,10 @@ def chunk_document_by_article(document_text: str) -> List[Dict[str, Any]]:
     
     Not: Bu fonksiyonun döndürdüğü 'madde_basligi_tahmini' artık KG'ye EKLENMİYOR,
     ancak bölme stratejisi (semantik ayırma) devam ediyor.
-    """
-    
-    sub_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-        separators=["\n\n", "\n", ". ", " ", ""]
-    )
-    
-    parts = re.split(MADDE_REGEX, document_text, flags=re.IGNORECASE | re.MULTILINE)
-    chunks = []
-    
-    # Giriş Metni
-    giris_metni = parts[0].strip()
-    if giris_metni:
-        if len(giris_metni) > CHUNK_SIZE:
-            sub_texts = sub_splitter.split_text(giris_metni)
-            for j, sub_text in enumerate(sub_texts):
-                chunks.append({
-                    "metin": sub_text,
-                    "madde_basligi_tahmini": f"Giriş (Bölüm {j+1})"
-                })
-        else:
-            chunks.append({
-                "metin": giris_metni,
-                "madde_basligi_tahmini": "Giriş"
-            })
-            
-    # Madde Metinleri
-    i = 1
-    while i < len(parts):
-        madde_basligi = parts[i].strip()
-        madde_icerigi = parts[i+1].strip() if (i + 1) < len(parts) else ""
-        
-        full_chunk_text = f"{madde_basligi}\n{madde_icerigi}"
-        madde_basligi_tahmini = madde_basligi.split('\n')[0]
+    Her chunk ayrıca kapsadığı maddeyi 'madde_turu' ("Madde", "Geçici Madde",
+    "Ek Madde"), 'madde_no' ve bölünmüşse 'bolum' (1'den başlar) olarak taşır;
+    giriş metninde 'madde_turu' ve 'madde_no' None'dır.
 
-        if len(full_chunk_text) > CHUNK_SIZE:
-            print(f"   [!] Uzun madde bölünüyor: {madde_basligi_tahmini} ({len(full_chunk_text)} char)")
-            
-            sub_texts = sub_splitter.split_text(madde_icerigi)
-            
-            for j, sub_text in enumerate(sub_texts):
-                prepended_text = f"{madde_basligi}\n(Bölüm {j+1})\n{sub_text}"
-                
-                chunks.append({
-                    "metin": prepended_text,
-                    "madde_basligi_tahmini": f"{madde_basligi_tahmini} (Bölüm {j+1})"
-                })
-        else:
-            chunks.append({
-                "metin": full_chunk_text.strip(),
-                "madde_basligi_tahmini": madde_basligi_tahmini
-            })
-        
-        i += 2
-        
-    return chunks
\ No newline at end of file
+    Metin parça parça geliyorsa (ör. PDF sayfaları) 'iter_chunks' kullanılabilir.
+    """
+    return list(iter_chunks((document_text,)))
@@ -5,6 +5,7 @@ load_dotenv()
 
 # Veri Yolu
 DATA_PATH = "./data"
+LOADER_WORKERS = 4  # PDF metin çıkarımı için süreç (process) sayısı
 
 # Neo4j Bağlantı Bilgileri
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -17,9 +18,120 @@ EMBEDDING_MODEL = "bge-m3"
 LLM_MODEL = "gemma3:4b"
 OLLAMA_HOST = "http://localhost:11434"
 
+# Atıf çıkarım modu:
+#   "rules"          -> Sadece kural tabanlı (regex) çıkarım, LLM hiç çağrılmaz
+#   "rules_then_llm" -> Kuralların kesin sonuç veremediği chunk'lar LLM'e gider
+#   "llm"            -> Her chunk LLM'e gider (eski davranış)
+EXTRACTION_MODE = "rules_then_llm"
+
+# Embedding toplu işleme ayarları
+EMBEDDING_BATCH_SIZE = 32        # Tek /api/embed isteğindeki metin sayısı
+EMBEDDING_MAX_CONCURRENCY = 4    # Aynı anda Ollama'ya gönderilen en fazla istek
+
+# Kalıcı önbellekler
+CACHE_DIR = "./cache"
+EMBEDDING_CACHE_PATH = os.path.join(CACHE_DIR, "embeddings.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = 200_000  # Aşılınca en uzun süredir kullanılmayanlar silinir
+EXTRACTION_CACHE_PATH = os.path.join(CACHE_DIR, "extractions.sqlite")
+INGEST_JOURNAL_PATH = os.path.join(CACHE_DIR, "ingest_journal.sqlite")  # main_ingest.py --resume
+TEXT_CACHE_PATH = os.path.join(CACHE_DIR, "pdf_texts.sqlite")  # PDF'lerden çıkarılan sayfa metinleri (zlib)
+# Son çalışmanın okuma özeti (okunan/okunamayan dosyalar); artımlı yüklemede yalnızca
+# yeni/değişmiş dosyaları listelediği için depodaki dokuman_listesi.txt'den ayrı tutulur
+DOCUMENT_REPORT_PATH = os.path.join(CACHE_DIR, "dokuman_listesi.txt")
+
 # Ana anlamsal ayıracımız: Madde başlıkları
 MADDE_REGEX = r"((?:^|\n)\s*(?:Geçici Madde \d+|Ek Madde \d+|Madde \d+)\b)"
 
+# Graf şeması sürümü: chunk'lara yazılan özellikler değiştiğinde artırılır.
+# Manifestteki sürümü farklı olan belgeler içerikleri değişmemiş olsa da yeniden işlenir.
+#   1 -> İlk şema
+#   2 -> CHUNK: sira, madde_turu, madde_no, bolum (madde indexi)
+#   3 -> Atıf hedefleri yüklemede kanonik belge isimlerine çözülür (BelgeResolver)
+#   4 -> CHUNK: kurum, tur (kurum/belge türüyle kapsamlı arama)
+#   5 -> Başlığında başka bir kanunu anan belgeler o kanunun numarasıyla eşlenmez (BelgeResolver)
+#   6 -> ATIF_YAPAR: madde_turu (madde atıfları türüyle birlikte bağlanır)
+INGEST_SCHEMA_VERSION = 6
+
+# Atıf hedefi çözümleme: numarasız ham belge adları kanonik isimlere difflib
+# benzerliğiyle eşlenir. En iyi aday eşiği geçmeli ve ikinciden bu pay kadar ayrışmalı.
+BELGE_FUZZY_THRESHOLD = 0.85
+BELGE_FUZZY_MARGIN = 0.05
+
 # Hiyerarşik chunking ayarları
 CHUNK_SIZE = 1000
-CHUNK_OVERLAP = 100
\ No newline at end of file
+CHUNK_OVERLAP = 100
+
+# Neo4j yazma ayarları: bir belgenin chunk'ları tek bir yazma transaction'ı
+# içinde, bu boyuttaki UNWIND gruplarıyla yazılır
+WRITE_BATCH_SIZE = 500
+
+# Eşzamanlı yükleme boru hattı (main_ingest.py --pipeline)
+PIPELINE_EMBED_WORKERS = 1   # Embedding aşaması iş parçacığı (her biri belge bazında toplu çalışır)
+PIPELINE_LLM_WORKERS = 4     # Atıf çıkarımı (LLM) iş parçacığı
+PIPELINE_WRITERS = 1         # Neo4j yazıcı iş parçacığı
+PIPELINE_QUEUE_SIZE = 64     # Aşamalar arası kuyrukların üst sınırı (geri basınç)
+PIPELINE_REPORT_SECONDS = 10 # Aşama bazlı hız raporu aralığı
+
+# Sorgu tarafı vektör araması:
+#   "neo4j" -> db.index.vector.queryNodes('chunk_embeddings', ...)
+#   "local" -> Süreç içi NumPy indexi (VECTOR_STORE_PATH); Neo4j yalnızca graf gezintisi için
+RETRIEVAL_BACKEND = "neo4j"
+VECTOR_STORE_PATH = os.path.join(CACHE_DIR, "vector_store")
+VECTOR_STORE_QUANTIZE = False      # True: RAM'de int8 kopya ile kaba tarama + float32 yeniden puanlama (4x az bellek)
+VECTOR_STORE_RESCORE_FACTOR = 4    # Yeniden puanlanacak aday sayısı = k * bu katsayı
+
+# Sorgu yönlendirme: "6446 sayılı Kanunun 14. maddesi" gibi açık atıflar BM25/ters
+# index üzerinden doğrudan çözülür (kesin eşleşmede embedding atlanır); diğer
+# sorgularda sözcüksel ve vektör sonuçları Reciprocal Rank Fusion ile birleştirilir
+LEXICAL_ROUTING = True
+LEXICAL_TOP_K = 10   # RRF'ye giren BM25 sonuç sayısı
+RRF_K = 60           # RRF sabiti: skor = Σ 1 / (RRF_K + sıra)
+# Sorgu sürecindeki BM25 ve yerel vektör indexleri graf nesil sayacı değişince yenilenir
+# (sayaç en fazla bu aralıkla okunur)
+INDEX_GENERATION_CHECK_SECONDS = 30
+
+# Kapsamlı arama: sorguda anılan kurum ("TEİAŞ", "TEDAŞ") ve belge türü ("Kanun",
+# "Yönetmelik", ...) öncelik olarak kullanılır: kapsamdaki vektör sonuçları tüm
+# belgelerdeki sonuçlarla RRF ile birleştirilir, kapsam dışı sonuçlar elenmez.
+# Yalnızca açık filtre (/ask kurum/tur) aramayı kesin olarak daraltır.
+QUERY_FILTER_INFERENCE = True
+
+# Cevap önbelleği (sık tekrarlanan / çok benzer sorular için)
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_SIMILARITY = 0.95             # Sorgu embedding'leri arası kosinüs benzerliği eşiği
+ANSWER_CACHE_TTL_SECONDS = 3600
+ANSWER_CACHE_MAX_ENTRIES = 512
+ANSWER_CACHE_GENERATION_CHECK_SECONDS = 30 # Graf nesil sayacının en sık kontrol aralığı
+
+# HTTP sorgu servisi (main_server.py)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+MAX_CONCURRENT_GENERATIONS = 2  # Aynı anda Ollama'da çalışan cevap üretimi üst sınırı
+SERVER_WORKER_THREADS = 16      # Embedding/Neo4j/LLM gibi bloklayan çağrılar için iş parçacığı havuzu
+SERVER_MAX_REQUEST_BYTES = 65536
+
+# LLM bağlamı: tohum ve atıf chunk'ları bu token bütçesine sığacak şekilde seçilir.
+# Tokenizer kullanılmadığında token sayısı karakter sayısından tahmin edilir.
+CONTEXT_TOKEN_BUDGET = 3000
+CONTEXT_CHARS_PER_TOKEN = 3.0   # Türkçe mevzuat metni için temkinli tahmin
+CONTEXT_DISTANCE_DECAY = 0.8    # Atıf hedeflerinin önceliği = atıf yapan tohumun skoru * bu katsayı
+
+# Atıf gezintisi:
+#   "single_hop" -> Tohumların doğrudan atıf yaptığı maddelerin tamamı bağlama girer
+#   "ppr"        -> ATIF_MADDE kenarları PPR_HOPS atlamaya kadar izlenir; adaylar tohum
+#                   skorlarıyla kişiselleştirilmiş PageRank ile puanlanır, en iyi PPR_TOP_K kalır
+RETRIEVAL_MODE = "single_hop"
+PPR_HOPS = 2
+PPR_FANOUT = (16, 8)       # Her atlamada eklenebilecek en fazla yeni chunk (son değer sonraki atlamalarda da geçerli)
+PPR_ALPHA = 0.15           # Her adımda tohumlara geri dönme (teleport) olasılığı
+PPR_ITERATIONS = 50
+PPR_TOP_K = 8              # Bağlama giren atıf chunk'ı sayısı (tohumlar hariç)
+NEIGHBOR_CACHE_MAX_ENTRIES = 50000         # Süreç içinde tutulan komşu listesi (chunk) sayısı
+NEIGHBOR_CACHE_GENERATION_CHECK_SECONDS = 30
+
+# İzleme (telemetry): aşama süreleri (span), sayaçlar ve gecikme histogramları.
+# Kapalıyken ölçüm çağrıları hiçbir iş yapmaz. GRAPHRAG_TELEMETRY=1 ile de açılabilir.
+TELEMETRY_ENABLED = os.getenv("GRAPHRAG_TELEMETRY", "0") == "1"
+TELEMETRY_DIR = "./telemetry"
+TELEMETRY_TRACE_PATH = os.path.join(TELEMETRY_DIR, "trace.jsonl")     # Span başına bir JSON satırı
+TELEMETRY_METRICS_PATH = os.path.join(TELEMETRY_DIR, "metrics.prom")  # Prometheus metin biçimi
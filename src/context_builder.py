@@ -0,0 +1,191 @@
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from .config import CONTEXT_TOKEN_BUDGET, CONTEXT_CHARS_PER_TOKEN, CONTEXT_DISTANCE_DECAY
+
+RELATIONS_HEADER = "--- İLGİLİ BAĞLANTILAR (Grafikten Alındı) ---\n"
+
+
+def estimate_tokens(text: str, chars_per_token: float = CONTEXT_CHARS_PER_TOKEN) -> int:
+    """Tokenizer yoksa karakter sayısından token tahmini (yukarı yuvarlanır)."""
+    return math.ceil(len(text) / chars_per_token) if text else 0
+
+
+@dataclass
+class ContextResult:
+    """Kurulan bağlam metni ve bütçe raporu."""
+    text: str
+    used_tokens: int
+    dropped_tokens: int
+    kept_chunks: int
+    dropped_chunks: int
+    budget: int
+    kept_chunk_ids: List[str] = field(default_factory=list)  # Bağlama yazılan chunk'lar (yazım sırasıyla)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "kullanilan_token": self.used_tokens,
+            "cikarilan_token": self.dropped_tokens,
+            "tutulan_chunk": self.kept_chunks,
+            "cikarilan_chunk": self.dropped_chunks,
+            "butce": self.budget,
+        }
+
+
+def _seed_block(number: int, chunk: dict) -> str:
+    return (
+        f"--- BAĞLAM {number} (Tohum Chunk)\n"
+        f"Kurum: {chunk['kaynak_kurum']}\n"
+        f"Kaynak Belge: {chunk['kaynak_belge']}\n"
+        f"Metin:\n{chunk['metin']}\n---\n\n"
+    )
+
+
+def _relation_header(number: int, relation: dict) -> str:
+    header = (
+        f"Bağlantı {number}: '{relation['kaynak_belge_ati_yapan']}' dokümanı, "
+        f"'{relation['hedef_belge']}' dokümanına atıf yapıyor."
+    )
+    if not relation['hedef_maddeler']:
+        return header + " (Madde belirtilmemiş).\n\n"
+    return header + f" (İlgili maddeler: {relation['hedef_maddeler']})\n"
+
+
+def _target_block(number: int, hedef_belge: str, chunk: dict) -> str:
+    return (
+        f"  --- EK BAĞLAM (Atıf Yapılan Madde Metni {number} - Kaynak: {hedef_belge}) ---\n"
+        f"  {chunk['metin']}\n"
+        f"  ---\n"
+    )
+
+
+def _missing_note(relation: dict) -> str:
+    return (f"  (Not: '{relation['hedef_belge']}' içindeki {relation['hedef_maddeler']} "
+            f"maddelerinin metni KG'de bulunamadı veya zaten bağlamda.)\n")
+
+
+class ContextBuilder:
+    """
+    Tohum chunk'lardan ve atıf yapılan madde metinlerinden token bütçeli LLM bağlamı kurar.
+
+    Chunk'lar id'ye göre tekilleştirilir (bir madde hem tohum hem EK BAĞLAM
+    olarak ya da birden çok ilişkide tekrar yer almaz). Öncelik vektör skoru ve
+    graf uzaklığıyla belirlenir: tohumlar kendi skorlarıyla, atıf hedefleri
+    atıf yapan tohumun skoru * 'distance_decay' ile sıralanır. Bütçeye sığan
+    chunk'lar orijinal düzende (tohumlar, sonra bağlantılar) yazılır; sığmayanların
+    token sayısı raporlanır. En iyi tohum bütçeyi aşsa bile bağlamda tutulur.
+
+    'count_tokens' verilirse (ör. modelin tokenizer'ı) karakter tahmini yerine o kullanılır.
+    """
+    def __init__(self, token_budget: int = CONTEXT_TOKEN_BUDGET,
+                 distance_decay: float = CONTEXT_DISTANCE_DECAY,
+                 count_tokens: Optional[Callable[[str], int]] = None):
+        self.token_budget = token_budget
+        self.distance_decay = distance_decay
+        self.count_tokens = count_tokens or estimate_tokens
+
+    def build(self, seeds: List[dict], relations: List[dict]) -> ContextResult:
+        # --- Tekilleştirme ---
+        seen = set()
+        unique_seeds = []
+        for seed in seeds:
+            if seed["chunk_id"] not in seen:
+                seen.add(seed["chunk_id"])
+                unique_seeds.append(seed)
+        seed_scores = {seed["chunk_id"]: seed.get("score") or 0.0 for seed in unique_seeds}
+        kaynak_skorlari: Dict[str, float] = {}
+        for seed in unique_seeds:
+            kaynak_skorlari.setdefault(seed["kaynak_belge"], seed_scores[seed["chunk_id"]])
+
+        targets: List[List[dict]] = []
+        for relation in relations:
+            unique_targets = []
+            for chunk in relation["hedef_chunklar"]:
+                if chunk["chunk_id"] not in seen:
+                    seen.add(chunk["chunk_id"])
+                    unique_targets.append(chunk)
+            targets.append(unique_targets)
+
+        # --- Adaylar: (öncelik, tür, indexler, maliyet) ---
+        candidates = []
+        for i, seed in enumerate(unique_seeds):
+            candidates.append((seed_scores[seed["chunk_id"]], "seed", i, None,
+                               self.count_tokens(_seed_block(i + 1, seed))))
+        for r, relation in enumerate(relations):
+            skor = relation.get("kaynak_score")
+            if skor is None:
+                skor = kaynak_skorlari.get(relation["kaynak_belge_ati_yapan"], 0.0)
+            for j, chunk in enumerate(targets[r]):
+                candidates.append((skor * self.distance_decay, "target", r, j,
+                                   self.count_tokens(_target_block(j + 1, relation["hedef_belge"], chunk))))
+        # Eşit öncelikte tohumlar ve orijinal sıra korunur (sort kararlıdır)
+        candidates.sort(key=lambda c: -c[0])
+
+        used = dropped = 0
+        kept_seeds, kept_targets, open_relations = set(), set(), set()
+        relations_header_cost = self.count_tokens(RELATIONS_HEADER)
+        dropped_chunks = 0
+
+        def relation_cost(r: int) -> int:
+            cost = self.count_tokens(_relation_header(r + 1, relations[r])) + self.count_tokens("\n")
+            return cost + (relations_header_cost if not open_relations else 0)
+
+        for priority, kind, r, j, cost in candidates:
+            total = cost
+            if kind == "target" and r not in open_relations:
+                total += relation_cost(r)
+            if used + total <= self.token_budget or (kind == "seed" and not kept_seeds):
+                used += total
+                if kind == "seed":
+                    kept_seeds.add(r)
+                else:
+                    open_relations.add(r)
+                    kept_targets.add((r, j))
+            else:
+                dropped += cost
+                dropped_chunks += 1
+
+        # Metin içermeyen bağlantılar (madde belirtilmemiş / madde metni bulunamadı) yer kalırsa eklenir
+        for r, relation in enumerate(relations):
+            if r in open_relations or targets[r]:
+                continue  # Zaten eklendi ya da madde metinleri bütçeye sığmadı
+            cost = relation_cost(r)
+            if relation["hedef_maddeler"]:
+                cost += self.count_tokens(_missing_note(relation))
+            if used + cost <= self.token_budget:
+                used += cost
+                open_relations.add(r)
+            else:
+                dropped += cost
+
+        # --- Orijinal düzende yazım ---
+        parts = []
+        kept_chunk_ids = []
+        for number, i in enumerate(sorted(kept_seeds), start=1):
+            parts.append(_seed_block(number, unique_seeds[i]))
+            kept_chunk_ids.append(unique_seeds[i]["chunk_id"])
+        if open_relations:
+            parts.append(RELATIONS_HEADER)
+            for number, r in enumerate(sorted(open_relations), start=1):
+                relation = relations[r]
+                parts.append(_relation_header(number, relation))
+                if not relation["hedef_maddeler"]:
+                    continue
+                kept = [targets[r][j] for j in range(len(targets[r])) if (r, j) in kept_targets]
+                if kept:
+                    for k, chunk in enumerate(kept, start=1):
+                        parts.append(_target_block(k, relation["hedef_belge"], chunk))
+                        kept_chunk_ids.append(chunk["chunk_id"])
+                else:
+                    parts.append(_missing_note(relation))
+                parts.append("\n")
+
+        return ContextResult(
+            text="".join(parts),
+            used_tokens=used,
+            dropped_tokens=dropped,
+            kept_chunks=len(kept_seeds) + len(kept_targets),
+            dropped_chunks=dropped_chunks,
+            budget=self.token_budget,
+            kept_chunk_ids=kept_chunk_ids,
+        )
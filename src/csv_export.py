@@ -0,0 +1,170 @@
+import os
+import csv
+import shlex
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .config import INGEST_SCHEMA_VERSION, NEO4J_DATABASE
+from .embedding_utils import setup_neo4j_vector_index
+from .graph_builder import CITATION_LINKS_VERSION, rows_complete, setup_neo4j_property_indexes
+
+# Tam yeniden kurulum için 'neo4j-admin database import full' girdisi: GraphBuilder'ın
+# transaction'lı yazma yolunun (BELGE_WRITE, CHUNK_WRITE, MANIFEST_WRITE, ATIF_MADDE
+# bağlama) kurduğu grafın aynısı başlık satırlı CSV dosyaları olarak yazılır.
+
+ARRAY_DELIMITER = ";"
+INDEX_WAIT_SECONDS = 3600  # İçe aktarımdan sonra indexlerin dolması beklenir
+
+AWAIT_INDEXES_CYPHER = "CALL db.awaitIndexes($timeout)"
+
+# Dosya adı -> başlık satırı (neo4j-admin import başlık sözdizimi)
+NODE_FILES = {
+    "kurum.csv": ["isim:ID(KURUM)", ":LABEL"],
+    "belge.csv": ["isim:ID(BELGE)", "tur", "kurum", "icerik_hash", "sema_surumu:long", "eksik:boolean", ":LABEL"],
+    "chunk.csv": [":ID(CHUNK)", "metin", "kaynak_belge", "kurum", "tur", "embedding:double[]", "sira:long",
+                  "madde_turu", "madde_no:long", "bolum:long", ":LABEL"],
+    "meta.csv": ["ad", "nesil:long", "atif_madde_surumu:long", ":LABEL"],
+}
+RELATIONSHIP_FILES = {
+    "yayinladi.csv": [":START_ID(KURUM)", ":END_ID(BELGE)", ":TYPE"],
+    "icerir.csv": [":START_ID(BELGE)", ":END_ID(CHUNK)", ":TYPE"],
+    "atif_yapar.csv": [":START_ID(CHUNK)", ":END_ID(BELGE)", "madde:long[]", "madde_turu:string[]", ":TYPE"],
+    "atif_madde.csv": [":START_ID(CHUNK)", ":END_ID(CHUNK)", ":TYPE"],
+}
+
+
+def _array(values) -> Optional[str]:
+    return ARRAY_DELIMITER.join(value if isinstance(value, str) else repr(value) for value in values) if values else None
+
+
+class CsvGraphExporter:
+    """
+    Belgeleri Neo4j'ye yazmak yerine 'neo4j-admin database import' için CSV'ye yazar.
+
+    'add_document' GraphBuilder.write_document ile aynı imzaya sahiptir; sıralı
+    yüklemede ya da boru hattının 'write' aşaması olarak kullanılabilir
+    (iş parçacığı güvenlidir). Chunk'lar (embedding'leriyle) geldikçe diske
+    yazılır, bellekte yalnızca madde indexi ve atıf listeleri tutulur.
+    'finish' kalan nod/ilişki dosyalarını yazar: ATIF_MADDE kenarları yükleme
+    yolundaki LINK_OUTGOING sorgusuyla aynı kuralla (hedef belgede madde_no
+    atıf listesinde olan chunk'lar) çözülür, META nodu bağlanmış olarak işaretlenir.
+
+    Fark: boş madde listeli atıflarda 'madde' özelliği boş liste yerine hiç
+    yazılmaz (CSV boş diziyi ayırt edemez); sorgular her ikisini de aynı işler.
+    """
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._files = {}
+        self._writers = {}
+        for name in ("chunk.csv", "icerir.csv", "atif_yapar.csv"):
+            header = NODE_FILES.get(name) or RELATIONSHIP_FILES[name]
+            self._files[name] = open(os.path.join(out_dir, name), "w", encoding="utf-8", newline="")
+            self._writers[name] = csv.writer(self._files[name])
+            self._writers[name].writerow(header)
+        self.kurumlar: Set[str] = set()
+        self.belgeler: Dict[str, Dict[str, Any]] = {}     # yüklenen belgeler -> özellikler
+        self.atif_hedefleri: Set[str] = set()             # atıf yapılan (yüklenmemiş olabilir) belgeler
+        self._madde_index: Dict[Tuple[str, str, int], List[int]] = {}  # (belge, madde_turu, madde_no)
+        self._atiflar: List[Tuple[int, str, List[Tuple[str, int]]]] = []  # (chunk, hedef belge, maddeler)
+        self._next_id = 0
+        self.chunk_count = 0
+        self.citation_count = 0
+        self.link_count = 0
+
+    def add_document(self, doc: 'Document', rows: List[Dict[str, Any]]):
+        """Belgeyi, chunk'larını ve atıflarını CSV'ye ekler (aynı isim ikinci kez gelirse atlanır)."""
+        with self._lock:
+            if doc.isim in self.belgeler:
+                print(f"[!] '{doc.isim}' isimli belge zaten yazıldı, ikinci kopya atlanıyor: {doc.kaynak_yol}")
+                return
+            self.kurumlar.add(doc.kurum)
+            self.belgeler[doc.isim] = {
+                "tur": doc.tur, "kurum": doc.kurum,
+                "icerik_hash": doc.icerik_hash or None,
+                "sema_surumu": INGEST_SCHEMA_VERSION if doc.icerik_hash else None,
+                # MANIFEST_WRITE gibi: eksik belge sonraki normal yüklemede yeniden işlenir
+                "eksik": "true" if doc.icerik_hash and not rows_complete(rows) else None,
+            }
+            atif_sayisi = 0
+            for row in rows:
+                chunk_id = self._next_id
+                self._next_id += 1
+                self._writers["chunk.csv"].writerow([
+                    chunk_id, row["metin"], doc.isim, doc.kurum, doc.tur, _array(row["embedding"]), row["sira"],
+                    row["madde_turu"], row["madde_no"], row["bolum"], "CHUNK"
+                ])
+                self._writers["icerir.csv"].writerow([doc.isim, chunk_id, "ICERIR"])
+                if row["madde_no"] is not None:
+                    self._madde_index.setdefault((doc.isim, row["madde_turu"], row["madde_no"]), []).append(chunk_id)
+                # CHUNK_WRITE_CYPHER'daki MERGE gibi: aynı hedefe tek ilişki, son madde listesi geçerli
+                hedefler = {atif["hedef_belge_isim"]: atif for atif in row["atiflar"]}
+                for hedef_belge, atif in hedefler.items():
+                    maddeler = atif["madde_listesi"] or []
+                    turler = atif.get("madde_turleri") or ["Madde"] * len(maddeler)
+                    self.atif_hedefleri.add(hedef_belge)
+                    self._writers["atif_yapar.csv"].writerow([chunk_id, hedef_belge, _array(maddeler),
+                                                              _array(turler), "ATIF_YAPAR"])
+                    self._atiflar.append((chunk_id, hedef_belge, list(zip(turler, maddeler))))
+                atif_sayisi += len(hedefler)
+            self.chunk_count += len(rows)
+            self.citation_count += atif_sayisi
+        print(f"   [+] {len(rows)} chunk CSV'ye yazıldı (İşlenen Atıf Sayısı: {atif_sayisi})")
+
+    def _write(self, name: str, header: List[str], rows):
+        with open(os.path.join(self.out_dir, name), "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    def finish(self) -> str:
+        """Kalan dosyaları yazar ve çalıştırılacak 'neo4j-admin' komutunu döndürür."""
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._write("kurum.csv", NODE_FILES["kurum.csv"], ([isim, "KURUM"] for isim in sorted(self.kurumlar)))
+            belge_rows = []
+            for isim in sorted(self.belgeler.keys() | self.atif_hedefleri):
+                props = self.belgeler.get(isim, {})
+                belge_rows.append([isim, props.get("tur"), props.get("kurum"), props.get("icerik_hash"),
+                                   props.get("sema_surumu"), props.get("eksik"), "BELGE"])
+            self._write("belge.csv", NODE_FILES["belge.csv"], belge_rows)
+            self._write("yayinladi.csv", RELATIONSHIP_FILES["yayinladi.csv"],
+                        ([props["kurum"], isim, "YAYINLADI"] for isim, props in sorted(self.belgeler.items())))
+
+            kenarlar = set()
+            for chunk_id, hedef_belge, maddeler in self._atiflar:
+                for madde_turu, madde_no in maddeler:
+                    for hedef_chunk in self._madde_index.get((hedef_belge, madde_turu, madde_no), ()):
+                        kenarlar.add((chunk_id, hedef_chunk))
+            self.link_count = len(kenarlar)
+            self._write("atif_madde.csv", RELATIONSHIP_FILES["atif_madde.csv"],
+                        ([kaynak, hedef, "ATIF_MADDE"] for kaynak, hedef in sorted(kenarlar)))
+            self._write("meta.csv", NODE_FILES["meta.csv"], [["graphrag", 1, CITATION_LINKS_VERSION, "META"]])
+        return self.import_command()
+
+    def import_command(self, database: str = NEO4J_DATABASE) -> str:
+        def path(name: str) -> str:
+            return shlex.quote(os.path.abspath(os.path.join(self.out_dir, name)))
+        parts = ["neo4j-admin database import full", "--overwrite-destination",
+                 f"--array-delimiter={shlex.quote(ARRAY_DELIMITER)}", "--multiline-fields=true"]
+        parts += [f"--nodes={path(name)}" for name in NODE_FILES]
+        parts += [f"--relationships={path(name)}" for name in RELATIONSHIP_FILES]
+        parts.append(database)
+        return " \\\n    ".join(parts)
+
+    def stats(self) -> str:
+        return (f"CSV dışa aktarımı: {len(self.belgeler)} belge, {self.chunk_count} chunk, "
+                f"{self.citation_count} atıf, {self.link_count} madde atıf kenarı -> '{self.out_dir}'")
+
+
+def finalize_import(driver, timeout: int = INDEX_WAIT_SECONDS):
+    """
+    'neo4j-admin' ile içe aktarılmış veritabanında indexleri (chunk_embeddings
+    vektör indexi, belge_isim, chunk_madde, chunk_kurum, chunk_tur) oluşturur ve dolmalarını bekler.
+    """
+    setup_neo4j_vector_index(driver)
+    setup_neo4j_property_indexes(driver)
+    with driver.session(database=NEO4J_DATABASE) as session:
+        session.run(AWAIT_INDEXES_CYPHER, timeout=timeout).consume()
+    print("Indexler çevrimiçi: vektör araması ve madde gezintisi kullanılabilir.")
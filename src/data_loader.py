@@ -1,8 +1,13 @@
 import os
+import time
+import hashlib
 import fitz  # PyMuPDF
 from pathlib import Path
-from dataclasses import dataclass
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import List, Dict, Iterator, Optional, Set, Tuple
+from .config import LOADER_WORKERS
+from .cache import TextCache
 
 # Klasör isimlerini düzgün Türkçe karşılıklarına eşleyelim.
 KURUM_MAP = {
@@ -24,43 +29,244 @@ class Document:
     tur: str
     metin: str
     kaynak_yol: str
+    icerik_hash: str = ""  # PDF dosyasının SHA-256 özeti (yükleme manifesti için)
 
-def load_documents_from_path(data_path: str) -> List[Document]:
+def compute_file_hash(path) -> str:
+    """Dosya içeriğinin SHA-256 özetini parça parça okuyarak hesaplar."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def list_document_names(data_path: str) -> Set[str]:
+    """'data' klasöründeki tüm PDF'lerin belge isimlerini (uzantısız) döndürür."""
+    return {pdf_path.stem for pdf_path in Path(data_path).rglob("*.pdf")}
+
+@dataclass
+class LoadReport:
+    """Bir yükleme çalışmasının dosya bazında yapılandırılmış özeti."""
+    loaded: List[str] = field(default_factory=list)
+    empty: List[str] = field(default_factory=list)
+    failed: List[Tuple[str, str]] = field(default_factory=list)  # (dosya, hata)
+    unchanged: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)  # dosya -> okuma süresi (sn)
+
+    def write(self, path: str):
+        """Özeti 'dokuman_listesi.txt' biçiminde yazar."""
+        unreadable = self.empty + [f"{dosya}  (Hata: {hata})" for dosya, hata in self.failed]
+        line = "-" * 50
+        lines = [
+            f"Başarıyla Okunabilen Toplam Doküman Sayısı: {len(self.loaded)}",
+            f"Okunamayan/Boş Doküman Sayısı: {len(unreadable)}",
+        ]
+        if self.unchanged:
+            lines.append(f"Değişmediği İçin Atlanan Doküman Sayısı: {len(self.unchanged)}")
+        lines += [line, "BAŞARIYLA OKUNAN DOSYALARIN LİSTESİ:", line, ""]
+        lines += sorted(self.loaded)
+        lines += ["", "", line, "OKUNAMAYAN VEYA BOŞ DOSYALARIN LİSTESİ:", line, ""]
+        lines += sorted(unreadable)
+        if self.timings:
+            lines += ["", "", line, "DOSYA BAŞINA OKUMA SÜRELERİ (sn):", line, ""]
+            lines += [
+                f"{sure:8.3f}  {dosya}"
+                for dosya, sure in sorted(self.timings.items(), key=lambda item: -item[1])
+            ]
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+def iter_pdf_pages(pdf_path: str) -> Iterator[str]:
     """
-    Verilen 'data' klasörünü tarar, PDF'leri okur ve meta verileri çıkarır.
-    PDF okuma için PyMuPDF (fitz) kullanır.
+    PDF'in sayfa metinlerini sırayla, her birinin sonuna '\n' ekleyerek üretir.
+    Parçaların birleşimi 'extract_pdf_text' metniyle aynıdır; 'chunker.iter_chunks'
+    ile birlikte kullanılırsa belge metninin tamamı bellekte tutulmaz.
+    """
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            yield page.get_text() + "\n"
+
+def extract_pdf_pages(pdf_path: str) -> Tuple[List[str], float]:
+    """
+    PDF'in sayfa metinlerini (her birinin sonunda '\n') ve okuma süresini döndürür.
+    Süreç havuzunda çalışabilmesi için modül seviyesinde tanımlıdır.
+    """
+    start = time.perf_counter()
+    pages = list(iter_pdf_pages(pdf_path))
+    return pages, time.perf_counter() - start
+
+def extract_pdf_text(pdf_path: str) -> Tuple[str, float]:
+    """
+    PDF'in tüm sayfa metinlerini birleştirir ve okuma süresini döndürür.
+    Süreç havuzunda çalışabilmesi için modül seviyesinde tanımlıdır.
+    """
+    start = time.perf_counter()
+    # Sayfa parçaları tek seferde birleştirilir
+    metin = "".join(iter_pdf_pages(pdf_path))
+    return metin, time.perf_counter() - start
+
+def iter_documents_from_path(data_path: str,
+                             known_hashes: Optional[Dict[str, str]] = None,
+                             workers: int = LOADER_WORKERS,
+                             report: Optional[LoadReport] = None,
+                             text_cache: Optional[TextCache] = None,
+                             reparse: bool = False) -> Iterator[Document]:
+    """
+    Verilen 'data' klasörünü tarar, PDF metinlerini bir süreç havuzunda çıkarır
+    ve her 'Document'ı hazır olur olmaz (tamamlanma sırasıyla) üretir.
+    Bellekte aynı anda en fazla 'workers * 2' belge metni bekler.
     Belge 'isim'leri .pdf uzantısı olmadan (.stem) alınır.
+    'known_hashes' ({isim: icerik_hash}) verilirse, içeriği değişmemiş PDF'ler
+    hiç ayrıştırılmadan atlanır. Dosya bazında sonuçlar ve süreler 'report'a yazılır.
+
+    'text_cache' verilirse boyutu ve mtime'ı (ya da içeriği) değişmemiş PDF'lerin
+    metni ayrıştırılmadan önbellekten okunur; daha önce metin çıkmamış ya da
+    ayrıştırılamamış dosyalar yeniden denenmez. 'reparse' ise önbellek
+    kullanılmaz, tüm PDF'ler ayrıştırılıp önbellek yenilenir.
     """
-    documents = []
+    if report is None:
+        report = LoadReport()
     root_path = Path(data_path)
 
-    for pdf_path in root_path.rglob("*.pdf"):
-        try:
-            parts = pdf_path.parts
-            kurum_key = parts[-3]
-            tur_key = parts[-2]
-            
-            # .stem kullanarak dosya adını .pdf uzantısı olmadan al
-            isim = pdf_path.stem 
-            
-            kurum_adi = KURUM_MAP.get(kurum_key, kurum_key.capitalize())
-            tur_adi = TUR_MAP.get(tur_key, tur_key.capitalize())
-
-            metin = ""
-            with fitz.open(pdf_path) as doc:
-                for page in doc:
-                    metin += page.get_text() + "\n"
-            
-            if metin.strip():
-                documents.append(Document(
-                    isim=isim, # Uzantısız isim
-                    kurum=kurum_adi,
-                    tur=tur_adi,
-                    metin=metin,
-                    kaynak_yol=str(pdf_path)
-                ))
-            print(f"[+] Yüklendi: {isim} (Kurum: {kurum_adi}, Tür: {tur_adi})")
-        except Exception as e:
-            print(f"[!] Hata (atlandı): {pdf_path} - {e}")
-            
-    return documents
\ No newline at end of file
+    def pending_files():
+        """(rel_path, meta, önbellek anahtarı, önbellek kaydı) üretir; kayıt yoksa PDF ayrıştırılır."""
+        for pdf_path in root_path.rglob("*.pdf"):
+            rel_path = os.path.relpath(pdf_path, root_path)
+            cache_key, cached = None, None
+            try:
+                parts = pdf_path.parts
+                kurum_key = parts[-3]
+                tur_key = parts[-2]
+
+                # .stem kullanarak dosya adını .pdf uzantısı olmadan al
+                isim = pdf_path.stem
+
+                kurum_adi = KURUM_MAP.get(kurum_key, kurum_key.capitalize())
+                tur_adi = TUR_MAP.get(tur_key, tur_key.capitalize())
+
+                # Boyut ve mtime önbellekle aynıysa dosya özet için bile okunmaz
+                if text_cache is not None:
+                    stat = pdf_path.stat()
+                    cache_key = (str(pdf_path.resolve()), stat.st_size, stat.st_mtime_ns)
+                    cached = text_cache.lookup(*cache_key)
+                if cached is not None:
+                    icerik_hash = cached.icerik_hash
+                else:
+                    icerik_hash = compute_file_hash(pdf_path)
+                    if text_cache is not None:
+                        cached = text_cache.lookup_by_hash(cache_key[0], icerik_hash, *cache_key[1:])
+            except Exception as e:
+                print(f"[!] Hata (atlandı): {pdf_path} - {e}")
+                report.failed.append((rel_path, str(e)))
+                continue
+
+            if known_hashes and known_hashes.get(isim) == icerik_hash:
+                print(f"[=] Değişmemiş, atlandı: {isim}")
+                report.unchanged.append(rel_path)
+                continue
+
+            meta = Document(
+                isim=isim,  # Uzantısız isim
+                kurum=kurum_adi,
+                tur=tur_adi,
+                metin="",
+                kaynak_yol=str(pdf_path),
+                icerik_hash=icerik_hash
+            )
+            yield rel_path, meta, cache_key, None if reparse else cached
+
+    def finish(rel_path: str, meta: Document, metin: str, sure: float, kaynak: str = "") -> Optional[Document]:
+        report.timings[rel_path] = sure
+        if not metin.strip():
+            print(f"[!] Boş veya okunamayan belge: {meta.isim}{kaynak}")
+            report.empty.append(rel_path)
+            return None
+        report.loaded.append(rel_path)
+        print(f"[+] Yüklendi: {meta.isim} (Kurum: {meta.kurum}, Tür: {meta.tur}, {sure:.2f} sn){kaynak}")
+        meta.metin = metin
+        return meta
+
+    def parsed(rel_path: str, meta: Document, cache_key, pages: List[str], sure: float) -> Optional[Document]:
+        if text_cache is not None:
+            text_cache.put(*cache_key, meta.icerik_hash, pages=pages)
+        return finish(rel_path, meta, "".join(pages), sure)
+
+    def parse_failed(rel_path: str, meta: Document, cache_key, error: Exception):
+        print(f"[!] Hata (atlandı): {meta.kaynak_yol} - {error}")
+        report.failed.append((rel_path, str(error)))
+        if text_cache is not None:
+            text_cache.put(*cache_key, meta.icerik_hash, hata=str(error))
+
+    def from_cache(rel_path: str, meta: Document, cache_key, cached) -> Optional[Document]:
+        if cached.hata is not None:
+            print(f"[!] Daha önce ayrıştırılamamış, atlandı: {meta.kaynak_yol} - {cached.hata}")
+            report.failed.append((rel_path, cached.hata))
+            return None
+        start = time.perf_counter()
+        metin = "" if cached.bos else "".join(text_cache.read_pages(cache_key[0]))
+        return finish(rel_path, meta, metin, time.perf_counter() - start, " [önbellek]")
+
+    if workers <= 1:
+        for rel_path, meta, cache_key, cached in pending_files():
+            if cached is not None:
+                doc = from_cache(rel_path, meta, cache_key, cached)
+            else:
+                try:
+                    pages, sure = extract_pdf_pages(meta.kaynak_yol)
+                except Exception as e:
+                    parse_failed(rel_path, meta, cache_key, e)
+                    continue
+                doc = parsed(rel_path, meta, cache_key, pages, sure)
+            if doc is not None:
+                yield doc
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        files = pending_files()
+        in_flight = {}
+        ready = []  # Önbellekten okunacaklar: havuza gönderilmez
+
+        def submit_next() -> bool:
+            for rel_path, meta, cache_key, cached in files:
+                if cached is not None:
+                    ready.append((rel_path, meta, cache_key, cached))
+                    continue
+                in_flight[executor.submit(extract_pdf_pages, meta.kaynak_yol)] = (rel_path, meta, cache_key)
+                return True
+            return False
+
+        # Havuzu doldur, sonra her tamamlanan iş için bir yenisini gönder
+        while len(in_flight) < workers * 2 and submit_next():
+            pass
+        while in_flight or ready:
+            while ready:
+                doc = from_cache(*ready.pop(0))
+                if doc is not None:
+                    yield doc
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                rel_path, meta, cache_key = in_flight.pop(future)
+                submit_next()
+                try:
+                    pages, sure = future.result()
+                except Exception as e:
+                    parse_failed(rel_path, meta, cache_key, e)
+                    continue
+                doc = parsed(rel_path, meta, cache_key, pages, sure)
+                if doc is not None:
+                    yield doc
+
+def load_documents_from_path(data_path: str,
+                             known_hashes: Optional[Dict[str, str]] = None,
+                             workers: int = LOADER_WORKERS,
+                             report: Optional[LoadReport] = None,
+                             text_cache: Optional[TextCache] = None,
+                             reparse: bool = False) -> List[Document]:
+    """
+    'iter_documents_from_path'in tüm belgeleri liste olarak döndüren sürümü.
+    PDF okuma için PyMuPDF (fitz) kullanır.
+    """
+    return list(iter_documents_from_path(data_path, known_hashes, workers, report, text_cache, reparse))
@@ -1,23 +1,136 @@
 import ollama
 import re  # 're not defined' hatası için
-from .config import EMBEDDING_MODEL, OLLAMA_HOST, NEO4J_DATABASE
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from .config import (
+    EMBEDDING_MODEL, OLLAMA_HOST, NEO4J_DATABASE,
+    EMBEDDING_BATCH_SIZE, EMBEDDING_MAX_CONCURRENCY
+)
+from .cache import EmbeddingCache
+from . import telemetry
 from neo4j import GraphDatabase
 
+
+def normalize_text(text: str) -> str:
+    """Embedding öncesi metindeki tüm boşluk dizilerini tek boşluğa indirger."""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
 class EmbeddingGenerator:
-    def __init__(self):
-        self.client = ollama.Client(host=OLLAMA_HOST)
+    def __init__(self, host: str = OLLAMA_HOST,
+                 batch_size: int = EMBEDDING_BATCH_SIZE,
+                 max_concurrency: int = EMBEDDING_MAX_CONCURRENCY,
+                 cache: Optional[EmbeddingCache] = None):
+        self.client = ollama.Client(host=host)
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = cache
         print(f"Embedding modeli '{EMBEDDING_MODEL}' başlatıldı.")
+        if cache is not None:
+            print(f"Embedding önbelleği kullanılıyor: {cache.path}")
 
-    def get_embedding(self, text: str):
+    def _cache_key(self, normalized_text: str) -> str:
+        return EmbeddingCache.make_key(EMBEDDING_MODEL, normalized_text)
+
+    def _embed_single(self, text: str):
         try:
-            # Metni normalleştir
-            text = re.sub(r'\s+', ' ', text).strip()
             response = self.client.embeddings(model=EMBEDDING_MODEL, prompt=text)
             return response["embedding"]
         except Exception as e:
             print(f"Embedding alınırken hata: {e}")
             return None
 
+    def get_embedding(self, text: str):
+        with telemetry.span("embedding") as span:
+            # Metni normalleştir
+            text = normalize_text(text)
+            if self.cache is not None:
+                key = self._cache_key(text)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    telemetry.inc("embedding_cache_hits_total")
+                    span.set(onbellek=True)
+                    return cached
+                telemetry.inc("embedding_cache_misses_total")
+            embedding = self._embed_single(text)
+            if embedding and self.cache is not None:
+                self.cache.put(key, embedding)
+            return embedding
+
+    def _embed_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Bir metin grubunu tek bir /api/embed isteğiyle gönderir.
+        İstek başarısız olursa grup tek tek denenir; böylece hatalı bir metin
+        tüm grubu düşürmez, yalnızca kendi yerine None döner.
+        """
+        try:
+            with telemetry.span("embedding_request", metin_sayisi=len(texts)):
+                response = self.client.embed(model=EMBEDDING_MODEL, input=texts)
+            embeddings = list(response["embeddings"])
+            if len(embeddings) != len(texts):
+                raise ValueError(f"{len(texts)} metin için {len(embeddings)} embedding döndü")
+            return embeddings
+        except Exception as e:
+            print(f"Toplu embedding alınırken hata ({len(texts)} metin), tek tek deneniyor: {e}")
+            return [self._embed_single(text) for text in texts]
+
+    def get_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Birden çok metnin embedding'ini toplu ve eşzamanlı olarak üretir.
+        Metinler 'batch_size'lık gruplara bölünür, en fazla 'max_concurrency'
+        grup aynı anda Ollama'ya gönderilir. Sonuçlar girdi sırasıyla döner;
+        embedding'i alınamayan metinlerin yerinde None bulunur.
+        Önbellek tanımlıysa yalnızca önbellekte olmayan metinler gönderilir.
+        """
+        if not texts:
+            return []
+        with telemetry.span("embedding_batch", metin_sayisi=len(texts)) as span:
+            results = self._get_embeddings(texts, span)
+        return results
+
+    def _get_embeddings(self, texts: List[str], span) -> List[Optional[List[float]]]:
+        normalized = [normalize_text(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(normalized)
+
+        # Önbellekte bulunanları doldur, yalnızca eksikleri Ollama'ya gönder
+        if self.cache is not None:
+            keys = [self._cache_key(text) for text in normalized]
+            cached = self.cache.get_many(keys)
+            for i, key in enumerate(keys):
+                results[i] = cached.get(key)
+        pending = [i for i, result in enumerate(results) if result is None]
+        if self.cache is not None:
+            telemetry.inc("embedding_cache_hits_total", len(normalized) - len(pending))
+            telemetry.inc("embedding_cache_misses_total", len(pending))
+        span.set(onbellekten=len(normalized) - len(pending))
+
+        batches = [
+            pending[i:i + self.batch_size]
+            for i in range(0, len(pending), self.batch_size)
+        ]
+
+        def embed_indices(indices: List[int]):
+            return self._embed_batch([normalized[i] for i in indices])
+
+        if len(batches) <= 1 or self.max_concurrency == 1:
+            batch_results = [embed_indices(batch) for batch in batches]
+        else:
+            workers = min(self.max_concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # map() sonuçları gönderim sırasıyla döndürür
+                batch_results = list(executor.map(embed_indices, batches))
+
+        new_entries = {}
+        for indices, embeddings in zip(batches, batch_results):
+            for i, embedding in zip(indices, embeddings):
+                results[i] = embedding
+                if embedding and self.cache is not None:
+                    new_entries[self._cache_key(normalized[i])] = embedding
+        if new_entries:
+            self.cache.put_many(new_entries)
+
+        return results
+
 def setup_neo4j_vector_index(driver):
     """
     Neo4j'de 'CHUNK' nodeları için vektör indexi oluşturur.
@@ -1,37 +1,35 @@
 import ollama
 import json
 import re  # _clean_madde_list için
+import time
+import hashlib
+import threading
 from neo4j import GraphDatabase
-from .config import LLM_MODEL, OLLAMA_HOST, NEO4J_DATABASE
+from .config import (
+    LLM_MODEL, OLLAMA_HOST, NEO4J_DATABASE, EXTRACTION_MODE, WRITE_BATCH_SIZE,
+    INGEST_SCHEMA_VERSION
+)
+from . import telemetry
 from .embedding_utils import EmbeddingGenerator
-from typing import List, Dict, Any
-from .chunker import chunk_document_by_article
+from .cache import ExtractionCache
+from .ingest_journal import IngestJournal
+from .belge_resolver import BelgeResolver
+from typing import List, Dict, Any, Optional, Tuple
+from .chunker import iter_chunks
 
-class GraphBuilder:
-    def __init__(self, driver: GraphDatabase.driver, embedder: EmbeddingGenerator):
-        self.driver = driver
-        self.embedder = embedder
-        self.client = ollama.Client(host=OLLAMA_HOST)
-        print(f"GraphBuilder, LLM '{LLM_MODEL}' ile başlatıldı.")
-
-    def _get_json_from_llm(self, chunk_text: str, doc_name: str) -> Dict[str, Any]:
-        """
-        Gemma'yı kullanarak chunk metninden atıf yapılan belge adlarını VE madde numaralarını çıkarır.
-        """
-        
-        system_prompt = f"""
+EXTRACTION_SYSTEM_PROMPT = """
 Sen bir hukuk metni analistisin. Görevin, sana verilen metin parçasını (chunk) analiz etmek ve 
 aşağıdaki JSON formatında yapılandırılmış veri çıkarmaktır.
 
 JSON ŞEMASI:
-{{
+{
   "atiflar_raw": [
-    {{
+    {
       "belge_adi_raw": "string (Metinde geçtiği gibi, örn: '6446 sayılı kanun' veya 'bu kanun')",
-      "madde_referanslari": [int]
-    }}
+      "madde_referanslari": [int | "geçici N" | "ek N"]
+    }
   ]
-}}
+}
 
 TALİMATLAR:
 1. Sadece ve sadece JSON formatında çıktı ver. Başka hiçbir açıklama ekleme.
@@ -39,35 +37,454 @@ TALİMATLAR:
    a. Metin içinde atıf yapılan belgeleri bul (mevcut belge dahil).
    b. 'belge_adi_raw' alanına, atıf yapılan belgenin adını metinde tam olarak nasıl geçiyorsa o şekilde yaz.
    c. 'madde_referanslari' alanına, atıf yapılan tamsayı madde numaralarını ekle (Alt fıkra numaralarını (1), (2) EKLEME).
+      Geçici ve ek maddeleri numarayla birlikte metin olarak yaz: "geçici 3", "ek 2".
    d. Atıf yoksa, "atiflar_raw" listesini boş `[]` olarak döndür.
 """
-        user_prompt = f"Aşağıdaki metni analiz et:\n\nMETIN:\n\"\"\"\n{chunk_text}\n\"\"\""
+
+EXTRACTION_USER_PROMPT = "Aşağıdaki metni analiz et:\n\nMETIN:\n\"\"\"\n{chunk_text}\n\"\"\""
+
+# Prompt değiştiğinde atıf çıkarım önbelleği otomatik olarak geçersiz olur
+EXTRACTION_PROMPT_HASH = hashlib.sha256(
+    (EXTRACTION_SYSTEM_PROMPT + EXTRACTION_USER_PROMPT).encode("utf-8")
+).hexdigest()[:16]
+
+# --- Kural tabanlı (regex) atıf çıkarımı ---
+# Desenler Türkçe küçük harfe çevrilmiş metin üzerinde çalışır (bkz. _tr_lower).
+_SIRA_EKI = r"(?:\s*['’]?\s*(?:[ıiuü]?nc[ıiuü]|\.))?"
+_MADDE_NO = rf"(?:(?:geçici|ek)\s+)?\d+{_SIRA_EKI}"
+_MADDE_LISTESI_PATTERN = re.compile(
+    # Belge adının eki ("Kanun'un") madde türü önekini ("ek 2 nci") yutmamalı
+    rf"\s*['’]?(?!(?:ek|geçici)\s)\w{{0,4}}\s+(?P<liste>{_MADDE_NO}(?:\s*(?:,|ve|ile|veya)\s*{_MADDE_NO})*)\s*madde\w*"
+)
+_SAYILI_BELGE_PATTERN = re.compile(
+    r"\b(?P<belge>\d+\s+sayılı\s+(?:[^\W\d_]+\s+){0,12}?"
+    r"(?:kanun hükmünde kararname|cumhurbaşkanlığı kararnamesi|kanun|khk|kararname))\w*"
+)
+_BU_BELGE_PATTERN = re.compile(
+    r"\bbu\s+(?:kanun hükmünde kararname|kanun|khk|yönetmelik|yönerge|usul ve esaslar|esaslar|kararname)\w*"
+)
+# Maddenin kendisine yapılan göndermeler ('bu maddede') atıf değildir
+_BU_MADDE_PATTERN = re.compile(r"\b(?:bu|işbu)\s+madde\w*")
+_CHUNK_BASLIGI_PATTERN = re.compile(
+    r"^\s*(?:geçici madde|ek madde|madde)\s+\d+\b(?:\s*\(bölüm \d+\))?"
+)
+# Maskelenmemiş metinde bunlardan biri kalırsa kurallar kesin sonuç veremez
+_ATIF_IPUCU_PATTERN = re.compile(
+    r"sayılı|kanun|kararname|khk|yönetmeli|yönerge|tebliğ|genelge|usul ve esas|madde"
+)
+_TR_LOWER = str.maketrans("Iİ", "ıi")
+# Tek bir madde atfı: "5", "geçici 3", "ek madde 2" -> (madde_turu, madde_no)
+_MADDE_REFERANSI_PATTERN = re.compile(r"(?:\b(?P<tur>geçici|ek)\s*(?:madde\w*\s*)?)?(?P<no>\d+)")
+_MADDE_TURU_ONEKLERI = {"geçici": "Geçici Madde", "ek": "Ek Madde"}
+
+
+def _tr_lower(text: str) -> str:
+    """Türkçe 'I/İ' harflerini doğru küçülten, uzunluğu koruyan lower()."""
+    return text.translate(_TR_LOWER).lower()
+
+
+def parse_madde_referanslari(text: str) -> List[Tuple[str, int]]:
+    """Metindeki madde atıflarını chunk'larla aynı adlandırmayla (madde_turu, madde_no) olarak okur."""
+    return [
+        (_MADDE_TURU_ONEKLERI.get(match.group("tur"), "Madde"), int(match.group("no")))
+        for match in _MADDE_REFERANSI_PATTERN.finditer(_tr_lower(text))
+    ]
+
+
+def _madde_sirasi(madde: Tuple[str, int]) -> tuple:
+    """Asıl maddeler önce, sonra geçici/ek maddeler; her grupta numara sırası."""
+    return madde[0] != "Madde", madde[0], madde[1]
+
+
+def format_madde_referansi(madde: Tuple[str, int]):
+    """(madde_turu, madde_no) -> 'madde_referanslari' biçimi: asıl madde int, diğerleri "geçici 3"."""
+    madde_turu, madde_no = madde
+    if madde_turu == "Madde":
+        return madde_no
+    return f"{madde_turu.split()[0].lower()} {madde_no}"
+
+
+def extract_citations_by_rules(chunk_text: str, doc_name: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Düzenli atıfları ('6446 sayılı Kanunun 5 inci maddesi', 'bu Kanunun 12 nci
+    maddesi') regex ile çıkarır ve LLM ile aynı 'atiflar_raw' yapısını üretir.
+    'bu Kanun/Yönetmelik...' gibi öz atıflar 'doc_name'e bağlanır.
+
+    Dönüş: (atiflar_raw, kesin_mi). Metinde kuralların açıklayamadığı bir
+    atıf ipucu (ör. numarasız bir kanun adı, belgesiz bir madde atfı) kalırsa
+    'kesin_mi' False olur ve chunk LLM'e bırakılmalıdır.
+    """
+    lowered = _tr_lower(chunk_text)
+    if len(lowered) != len(chunk_text):
+        # Uzunluğu değişen nadir Unicode dönüşümlerinde konumlar kayar; LLM'e bırak
+        return [], False
+
+    maske = list(lowered)
+
+    def maskele(start: int, end: int):
+        maske[start:end] = " " * (end - start)
+
+    baslik = _CHUNK_BASLIGI_PATTERN.match(lowered)
+    if baslik:
+        maskele(baslik.start(), baslik.end())
+
+    for match in _BU_MADDE_PATTERN.finditer(lowered):
+        maskele(match.start(), match.end())
+
+    atiflar: Dict[str, List[Tuple[str, int]]] = {}
+
+    def madde_listesi_oku(pos: int):
+        liste_match = _MADDE_LISTESI_PATTERN.match(lowered, pos)
+        if not liste_match:
+            return [], pos
+        return parse_madde_referanslari(liste_match.group("liste")), liste_match.end()
+
+    for match in _SAYILI_BELGE_PATTERN.finditer(lowered):
+        belge_adi = chunk_text[match.start("belge"):match.end("belge")]
+        belge_adi = re.sub(r"\s+", " ", belge_adi)
+        maddeler, end = madde_listesi_oku(match.end())
+        atiflar.setdefault(belge_adi, []).extend(maddeler)
+        maskele(match.start(), end)
+
+    for match in _BU_BELGE_PATTERN.finditer(lowered):
+        maddeler, end = madde_listesi_oku(match.end())
+        if maddeler:
+            atiflar.setdefault(doc_name, []).extend(maddeler)
+        maskele(match.start(), end)
+
+    kesin = _ATIF_IPUCU_PATTERN.search("".join(maske)) is None
+    atiflar_raw = [
+        {"belge_adi_raw": belge_adi,
+         "madde_referanslari": [format_madde_referansi(m) for m in sorted(set(maddeler), key=_madde_sirasi)]}
+        for belge_adi, maddeler in atiflar.items()
+    ]
+    return atiflar_raw, kesin
+
+# --- Neo4j yazma sorguları ---
+BELGE_WRITE_CYPHER = """
+MERGE (k:KURUM {isim: $kurum_isim})
+MERGE (b:BELGE {isim: $belge_isim})
+SET b.tur = $belge_tur, b.kurum = $kurum_isim
+MERGE (k)-[:YAYINLADI]->(b)
+"""
+
+# Belgenin eski chunk'larını ve bu chunk'ların giden atıflarını siler
+CHUNK_DELETE_CYPHER = """
+MATCH (b:BELGE {isim: $belge_isim})-[:ICERIR]->(c:CHUNK)
+DETACH DELETE c
+"""
+
+# Manifest: içerik özeti ve şema sürümü, chunk'lar yazıldıktan sonra aynı transaction'da işaretlenir.
+# Eksik yazılan belge (embedding'i alınamayan ya da atıf çıkarımı hata veren chunk'lar)
+# 'eksik' ile işaretlenir; tam yazımda işaret kaldırılır.
+MANIFEST_WRITE_CYPHER = """
+MATCH (b:BELGE {isim: $belge_isim})
+SET b.icerik_hash = $icerik_hash, b.sema_surumu = $sema_surumu,
+    b.eksik = CASE WHEN $eksik THEN true END
+"""
+
+# Eski şema sürümüyle ya da eksik yazılmış belgelerin özeti boş döner, böylece yeniden işlenirler
+MANIFEST_READ_CYPHER = """
+MATCH (b:BELGE) WHERE b.icerik_hash IS NOT NULL
+RETURN b.isim AS isim,
+       CASE WHEN b.sema_surumu = $sema_surumu AND b.eksik IS NULL THEN b.icerik_hash ELSE '' END AS icerik_hash
+"""
+
+# 'data/' klasöründen kaldırılan belge: chunk'ları silinir. Başka belgeler hâlâ
+# atıf yapıyorsa BELGE nodu atıf hedefi olarak kalır, yoksa tamamen silinir.
+BELGE_REMOVE_CYPHER = """
+MATCH (b:BELGE {isim: $belge_isim})
+OPTIONAL MATCH (b)-[:ICERIR]->(c:CHUNK)
+DETACH DELETE c
+WITH DISTINCT b
+OPTIONAL MATCH (:KURUM)-[y:YAYINLADI]->(b)
+DELETE y
+WITH DISTINCT b
+REMOVE b.icerik_hash, b.sema_surumu, b.eksik, b.tur, b.kurum
+WITH b
+WHERE NOT (()-[:ATIF_YAPAR]->(b))
+DETACH DELETE b
+"""
+
+# Bir grup chunk'ı ve atıflarını tek sorguda yazar.
+# Hedef belgeler 'MERGE' edilir. Ham isimler ("6446 sayılı kanun") yazmadan önce
+# BelgeResolver ile kanonik isimlere çevrilir; çözülemeyenler Faz 2'de temizlenir.
+CHUNK_WRITE_CYPHER = """
+MATCH (b:BELGE {isim: $belge_isim})
+UNWIND $rows AS row
+CREATE (c:CHUNK {
+    metin: row.metin,
+    kaynak_belge: $belge_isim,
+    kurum: $kurum_isim,
+    tur: $belge_tur,
+    embedding: row.embedding,
+    sira: row.sira,
+    madde_turu: row.madde_turu,
+    madde_no: row.madde_no,
+    bolum: row.bolum
+})
+CREATE (b)-[:ICERIR]->(c)
+WITH c, row
+UNWIND row.atiflar AS atif
+MERGE (b_hedef:BELGE {isim: atif.hedef_belge_isim})
+MERGE (c)-[r:ATIF_YAPAR]->(b_hedef)
+SET r.madde = atif.madde_listesi, r.madde_turu = atif.madde_turleri
+"""
+
+# Atıfların madde düzeyinde somutlaştırılması: (CHUNK)-[:ATIF_YAPAR {madde}]->(BELGE)
+# atfı, atıf yapılan maddelerin chunk'larına doğrudan (CHUNK)-[:ATIF_MADDE]->(CHUNK)
+# kenarları olarak bağlanır; sorgu tarafı derin gezintiyi tek atlamayla yapar.
+# Artımlıdır: bir belge yazıldığında yalnızca ona dokunan kenarlar çözülür.
+#   giden: belgenin chunk'larından atıf yaptıkları maddelere
+#   gelen: başka belgelerin bu belgeye yaptığı atıflardan bu belgenin (yeni) chunk'larına
+# Madde (madde_turu, madde_no) ikilisiyle eşlenir: r.madde ve r.madde_turu paralel
+# listelerdir, "geçici 3 üncü madde" yalnızca Geçici Madde 3'e bağlanır.
+LINK_OUTGOING_CYPHER = """
+MATCH (:BELGE {isim: $belge_isim})-[:ICERIR]->(c:CHUNK)-[r:ATIF_YAPAR]->(h:BELGE)
+UNWIND range(0, size(coalesce(r.madde, [])) - 1) AS i
+MATCH (t:CHUNK) WHERE t.kaynak_belge = h.isim AND t.madde_no = r.madde[i]
+  AND t.madde_turu = coalesce(r.madde_turu[i], 'Madde')
+MERGE (c)-[:ATIF_MADDE]->(t)
+RETURN count(*) AS kenar
+"""
+
+LINK_INCOMING_CYPHER = """
+MATCH (c:CHUNK)-[r:ATIF_YAPAR]->(:BELGE {isim: $belge_isim})
+WHERE c.kaynak_belge <> $belge_isim
+UNWIND range(0, size(coalesce(r.madde, [])) - 1) AS i
+MATCH (t:CHUNK) WHERE t.kaynak_belge = $belge_isim AND t.madde_no = r.madde[i]
+  AND t.madde_turu = coalesce(r.madde_turu[i], 'Madde')
+MERGE (c)-[:ATIF_MADDE]->(t)
+RETURN count(*) AS kenar
+"""
+
+# Tüm graf bir kez baştan bağlandığında META noduna işaret konur (eski graflar için)
+LINKS_READY_CYPHER = """
+OPTIONAL MATCH (m:META {ad: 'graphrag'})
+RETURN coalesce(m.atif_madde_surumu, 0) AS surum
+"""
+
+LINKS_MARK_CYPHER = """
+MERGE (m:META {ad: 'graphrag'})
+SET m.atif_madde_surumu = $surum
+"""
+
+# Madde atıflarının kaçının bir hedef chunk'a bağlandığı, kaçının sarktığı
+# (hedef belge yüklenmemiş ya da atıf yapılan madde belgede yok)
+CITATION_LINK_STATS_CYPHER = """
+MATCH (c:CHUNK)-[r:ATIF_YAPAR]->(h:BELGE)
+UNWIND range(0, size(coalesce(r.madde, [])) - 1) AS i
+CALL {
+    WITH c, h, r, i
+    OPTIONAL MATCH (c)-[:ATIF_MADDE]->(t:CHUNK)
+    WHERE t.kaynak_belge = h.isim AND t.madde_no = r.madde[i]
+      AND t.madde_turu = coalesce(r.madde_turu[i], 'Madde')
+    RETURN count(t) > 0 AS bagli
+}
+RETURN count(*) AS madde_atfi,
+       sum(CASE WHEN bagli THEN 1 ELSE 0 END) AS bagli,
+       sum(CASE WHEN NOT bagli AND h.icerik_hash IS NULL THEN 1 ELSE 0 END) AS yuklenmemis_belge,
+       sum(CASE WHEN NOT bagli AND h.icerik_hash IS NOT NULL THEN 1 ELSE 0 END) AS eksik_madde
+"""
+
+CITATION_LINKS_VERSION = 1
+
+# Graf nesil sayacı: grafı değiştiren her yazma transaction'ı (yükleme, silme,
+# kürasyon) sayacı artırır. Sorgu tarafı önbellekleri bu sayaç değişince boşaltılır.
+GENERATION_BUMP_CYPHER = """
+MERGE (m:META {ad: 'graphrag'})
+SET m.nesil = coalesce(m.nesil, 0) + 1
+"""
+
+GENERATION_READ_CYPHER = """
+OPTIONAL MATCH (m:META {ad: 'graphrag'})
+RETURN coalesce(m.nesil, 0) AS nesil
+"""
+
+
+def read_graph_generation(driver) -> int:
+    """Grafın güncel nesil sayacını okur (hiç yazma yapılmadıysa 0)."""
+    with driver.session(database=NEO4J_DATABASE) as session:
+        return session.run(GENERATION_READ_CYPHER).single()["nesil"]
+
+
+def rows_complete(rows: List[Dict[str, Any]]) -> bool:
+    """
+    Satırlar belgenin tamamını taşıyor mu: embedding'i alınamadığı için atlanan
+    chunk yok ve hiçbir chunk'ın atıf çıkarımı hata vermedi. Hiç satır yoksa
+    belge tam sayılmaz.
+    """
+    return bool(rows) and all(
+        row.get("belge_chunk_sayisi", len(rows)) == len(rows) and not row.get("cikarim_hatasi")
+        for row in rows
+    )
+
+
+def link_document_citations_tx(tx, belge_isim: str) -> int:
+    """Belgeye dokunan ATIF_MADDE kenarlarını (giden ve gelen) çözer; kenar sayısını döndürür."""
+    giden = tx.run(LINK_OUTGOING_CYPHER, belge_isim=belge_isim).single()["kenar"]
+    gelen = tx.run(LINK_INCOMING_CYPHER, belge_isim=belge_isim).single()["kenar"]
+    return giden + gelen
+
+
+def citation_links_ready(driver) -> bool:
+    """Graf bu sürümün ATIF_MADDE kenarlarıyla baştan bağlanmış mı?"""
+    with driver.session(database=NEO4J_DATABASE) as session:
+        return session.run(LINKS_READY_CYPHER).single()["surum"] >= CITATION_LINKS_VERSION
+
+
+def _link_outgoing_tx(tx, belge_isim: str) -> int:
+    return tx.run(LINK_OUTGOING_CYPHER, belge_isim=belge_isim).single()["kenar"]
+
+
+def _mark_links_tx(tx):
+    tx.run(LINKS_MARK_CYPHER, surum=CITATION_LINKS_VERSION)
+    tx.run(GENERATION_BUMP_CYPHER)
+
+
+def materialize_citation_links(driver, belge_isimleri) -> int:
+    """
+    Verilen belgelerin tüm giden atıflarını ATIF_MADDE kenarlarına çevirir
+    (belge başına bir transaction). Tüm yüklenmiş belgeler verildiğinde graf
+    baştan bağlanmış olur; bu, kenarlar eklenmeden önce kurulmuş graflar için
+    bir kerelik bir adımdır, sonraki yüklemeler kenarları artımlı olarak yazar.
+    """
+    toplam = 0
+    with driver.session(database=NEO4J_DATABASE) as session:
+        for belge_isim in belge_isimleri:
+            toplam += session.execute_write(_link_outgoing_tx, belge_isim)
+        session.execute_write(_mark_links_tx)
+    return toplam
+
+
+def citation_link_stats(driver) -> Dict[str, int]:
+    """Madde atıflarının bağlı/sarkan dağılımını döndürür."""
+    with driver.session(database=NEO4J_DATABASE) as session:
+        return session.run(CITATION_LINK_STATS_CYPHER).single().data()
+
+
+def format_citation_link_stats(stats: Dict[str, int]) -> str:
+    sarkan = stats["yuklenmemis_belge"] + stats["eksik_madde"]
+    return (f"Madde atıfları: {stats['madde_atfi']} atıf, {stats['bagli']} tanesi hedef chunk'a bağlı, "
+            f"{sarkan} sarkan ({stats['yuklenmemis_belge']} yüklenmemiş belgeye, "
+            f"{stats['eksik_madde']} belgede bulunmayan maddeye)")
+
+
+def setup_neo4j_property_indexes(driver):
+    """
+    Yükleme ve derin gezinti sorgularının kullandığı özellik indexlerini oluşturur:
+    BELGE.isim (MERGE için), CHUNK(kaynak_belge, madde_no) (madde araması için),
+    CHUNK.kurum ve CHUNK.tur (kapsamlı aramada filtrelenen chunk'ları bulmak için).
+    """
+    index_queries = [
+        "CREATE INDEX belge_isim IF NOT EXISTS FOR (b:BELGE) ON (b.isim)",
+        "CREATE INDEX chunk_madde IF NOT EXISTS FOR (c:CHUNK) ON (c.kaynak_belge, c.madde_no)",
+        "CREATE INDEX chunk_kurum IF NOT EXISTS FOR (c:CHUNK) ON (c.kurum)",
+        "CREATE INDEX chunk_tur IF NOT EXISTS FOR (c:CHUNK) ON (c.tur)",
+    ]
+    with driver.session(database=NEO4J_DATABASE) as session:
+        for index_query in index_queries:
+            try:
+                session.run(index_query)
+            except Exception as e:
+                print(f"Neo4j indexi oluşturulamadı: {e}")
+    print(f"Neo4j özellik indexleri (belge_isim, chunk_madde, chunk_kurum, chunk_tur) '{NEO4J_DATABASE}' veritabanında hazır.")
+
+class GraphBuilder:
+    def __init__(self, driver: GraphDatabase.driver, embedder: EmbeddingGenerator,
+                 extraction_cache: Optional[ExtractionCache] = None,
+                 extraction_mode: str = EXTRACTION_MODE, host: str = OLLAMA_HOST,
+                 resolver: Optional[BelgeResolver] = None, journal: Optional[IngestJournal] = None):
+        self.driver = driver
+        self.embedder = embedder
+        self.client = ollama.Client(host=host)
+        self.extraction_cache = extraction_cache
+        self.extraction_mode = extraction_mode
+        self.resolver = resolver  # None ise atıf hedefleri ham adlarıyla yazılır
+        self.journal = journal    # Çalışma içi belge durumlarının kalıcı günlüğü (--resume)
+        self.llm_seconds = 0.0  # Bu çalışmada LLM'e harcanan toplam süre
+        self.rule_extractions = 0  # LLM'e gitmeden kurallarla çözülen chunk sayısı
+        self.llm_extractions = 0
+        self._stats_lock = threading.Lock()  # Sayaçlar boru hattında iş parçacıklarınca güncellenir
+        print(f"GraphBuilder, LLM '{LLM_MODEL}' ile başlatıldı (atıf çıkarım modu: {extraction_mode}).")
+        if extraction_cache is not None:
+            removed = extraction_cache.purge_stale(LLM_MODEL, EXTRACTION_PROMPT_HASH)
+            if removed:
+                print(f"Atıf çıkarım önbelleğinden eski prompt/modele ait {removed} kayıt silindi.")
+
+    def _get_json_from_llm(self, chunk_text: str, doc_name: str) -> Dict[str, Any]:
+        """
+        Gemma'yı kullanarak chunk metninden atıf yapılan belge adlarını VE madde numaralarını çıkarır.
+        Önbellek tanımlıysa aynı chunk/model/prompt için önceki sonuç yeniden kullanılır.
+        """
+        if self.extraction_cache is not None:
+            cached = self.extraction_cache.get(chunk_text, LLM_MODEL, EXTRACTION_PROMPT_HASH)
+            if cached is not None:
+                telemetry.inc("extraction_cache_hits_total")
+                return cached
+
+        user_prompt = EXTRACTION_USER_PROMPT.format(chunk_text=chunk_text)
 
         try:
-            response = self.client.chat(
-                model=LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                format="json"
-                options={'temperature': 0.3}
-            )
+            start = time.perf_counter()
+            with telemetry.span("llm_extraction", belge=doc_name):
+                response = self.client.chat(
+                    model=LLM_MODEL,
+                    messages=[
+                        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    format="json",
+                    options={'temperature': 0.3}
+                )
             json_output = json.loads(response['message']['content'])
+            llm_seconds = time.perf_counter() - start
+            with self._stats_lock:
+                self.llm_seconds += llm_seconds
             
             if "atiflar_raw" not in json_output:
                 json_output["atiflar_raw"] = []
+
+            # Sadece başarılı çıkarımlar önbelleğe yazılır
+            if self.extraction_cache is not None:
+                self.extraction_cache.put(
+                    chunk_text, LLM_MODEL, EXTRACTION_PROMPT_HASH, json_output, llm_seconds
+                )
                 
             return json_output
             
         except Exception as e:
             print(f"LLM'den JSON alınırken hata: {e}")
-            return {"atiflar_raw": []}
+            return {"atiflar_raw": [], "hata": True}
 
     
-    def _clean_madde_list(self, raw_list: List[Any]) -> List[int]:
+    def _extract_citations(self, chunk_text: str, doc_name: str) -> Dict[str, Any]:
         """
-        LLM'den gelen (atıflar için) ham madde listesini temizler ve tamsayı listesine çevirir.
+        'extraction_mode'a göre atıfları önce kurallarla, gerekirse LLM ile çıkarır.
+        """
+        if self.extraction_mode != "llm":
+            atiflar_raw, kesin = extract_citations_by_rules(chunk_text, doc_name)
+            if kesin or self.extraction_mode == "rules":
+                with self._stats_lock:
+                    self.rule_extractions += 1
+                telemetry.inc("extractions_total", yontem="kural")
+                return {"atiflar_raw": atiflar_raw}
+
+        with self._stats_lock:
+            self.llm_extractions += 1
+        telemetry.inc("extractions_total", yontem="llm")
+        return self._get_json_from_llm(chunk_text, doc_name)
+
+    def extraction_stats(self) -> str:
+        total = self.rule_extractions + self.llm_extractions
+        rate = (100.0 * self.rule_extractions / total) if total else 0.0
+        return (f"Atıf çıkarımı: {total} chunk, {self.rule_extractions} tanesi LLM'siz "
+                f"kurallarla çözüldü (%{rate:.1f}), {self.llm_extractions} tanesi LLM'e gitti")
+
+    def _clean_madde_list(self, raw_list: List[Any]) -> List[Tuple[str, int]]:
+        """
+        LLM'den gelen (atıflar için) ham madde listesini temizler ve
+        (madde_turu, madde_no) listesine çevirir ("geçici 3" -> ("Geçici Madde", 3)).
         """
         cleaned_list = []
         if not isinstance(raw_list, list):
@@ -76,100 +493,179 @@ TALİMATLAR:
         for item in raw_list:
             try:
                 # Doğrudan int'e çevirmeyi dene (5 veya "5" için)
-                cleaned_list.append(int(item))
+                cleaned_list.append(("Madde", int(item)))
             except (ValueError, TypeError):
-                # Hata verirse (örn: "Madde 5", "15. madde"), regex ile sayıyı ara
-                match = re.search(r'\d+', str(item))
-                if match:
-                    cleaned_list.append(int(match.group(0)))
+                # Hata verirse (örn: "Madde 5", "15. madde", "geçici 3"), türü ve ilk sayıyı ara
+                maddeler = parse_madde_referanslari(str(item))
+                if maddeler:
+                    cleaned_list.append(maddeler[0])
         
-        return list(set(cleaned_list))
+        return sorted(set(cleaned_list), key=_madde_sirasi)
 
 
-    def process_document(self, doc: 'Document'):
+    # --- Boru hattı aşamaları ---
+    # Her aşama bağımsız olarak çağrılabilir; 'prepare_chunks' bunları sırayla,
+    # 'src/pipeline.py' ise eşzamanlı olarak çalıştırır.
+
+    def chunk_stage(self, doc: 'Document') -> List[Dict[str, Any]]:
+        """Dokümanı madde bazlı (semantik) chunk'lara ayırır ve yazma satırlarını başlatır."""
+        if self.journal is not None and doc.icerik_hash:
+            self.journal.begin_document(doc.isim, doc.icerik_hash)
+        with telemetry.span("chunking", belge=doc.isim) as span:
+            # Akış chunker'ı: satırlar madde sınırları bulundukça kurulur, ara chunk listesi tutulmaz
+            rows = [
+                {
+                    "sira": i,
+                    "metin": chunk_data["metin"],
+                    "madde_turu": chunk_data["madde_turu"],
+                    "madde_no": chunk_data["madde_no"],
+                    "bolum": chunk_data["bolum"],
+                }
+                for i, chunk_data in enumerate(iter_chunks((doc.metin,)))
+            ]
+            for row in rows:
+                row["belge_chunk_sayisi"] = len(rows)  # Atlanan chunk'ları yazarken fark etmek için
+            span.set(chunk=len(rows))
+        return rows
+
+    def embed_stage(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Tek bir dökümanı işler.
-        LLM'den gelen TÜM atıfları 'MERGE' kullanarak [:ATIF_YAPAR] ilişkisine dönüştürür.
-        Chunk'lara madde bilgisi (madde_listesi vs.) EKLEMEZ.
+        Tüm satırların embedding'lerini toplu olarak (sırası korunarak) alır.
+        Embedding'i alınamayan chunk'lar atlanır; belge eksik yazılır ('rows_complete').
         """
-        print(f"İşleniyor: {doc.isim}")
-        
-        # 'data/' klasöründen gelen belgeleri yükle
-        with self.driver.session(database=NEO4J_DATABASE) as session:
-            session.run(
-                """
-                MERGE (k:KURUM {isim: $kurum_isim})
-                MERGE (b:BELGE {isim: $belge_isim})
-                SET b.tur = $belge_tur, b.kurum = $kurum_isim
-                MERGE (k)-[:YAYINLADI]->(b)
-                """,
-                kurum_isim=doc.kurum,
-                belge_isim=doc.isim,
-                belge_tur=doc.tur
-            )
-            
-        # Dokümanı madde bazlı (semantik) chunk'lara ayır
-        chunks = chunk_document_by_article(doc.metin)
-        
-        for i, chunk_data in enumerate(chunks):
-            chunk_text = chunk_data["metin"]
-            
-            embedding = self.embedder.get_embedding(chunk_text)
+        embeddings = self.embedder.get_embeddings([row["metin"] for row in rows])
+        embedded = []
+        for row, embedding in zip(rows, embeddings):
             if not embedding:
-                print(f"   [!] Chunk {i} için embedding alınamadı, atlanıyor.")
+                print(f"   [!] Chunk {row['sira']} için embedding alınamadı, atlanıyor.")
+                telemetry.inc("embedding_failures_total")
                 continue
+            row["embedding"] = embedding
+            embedded.append(row)
+        return embedded
 
-            # LLM'den sadece atıf verilerini al
-            llm_json_data = self._get_json_from_llm(chunk_text, doc.isim)
-            raw_references_list = llm_json_data.get("atiflar_raw", [])
-            
+    def extract_stage(self, doc_name: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Tek bir chunk'ın atıflarını çıkarır ve temizlenmiş halde satıra ekler."""
+        # Atıf verilerini al (kurallar ve/veya LLM)
+        with telemetry.span("citation_extraction", belge=doc_name, sira=row["sira"]):
+            llm_json_data = self._extract_citations(row["metin"], doc_name)
+        raw_references_list = llm_json_data.get("atiflar_raw", [])
+
+        hedefler: Dict[str, List[Tuple[str, int]]] = {}
+        for atif in raw_references_list:
+            llm_belge_ismi = atif.get("belge_adi_raw")
+            if not llm_belge_ismi:
+                continue
+
+            # LLM'in atıf için bulduğu madde listesini temizle
+            atif_madde_listesi = self._clean_madde_list(
+                atif.get("madde_referanslari", [])
+            )
+            # Ham adı kanonik belgeye çöz; çözülemezse ham ad yazılır (Faz 2'de temizlenir)
+            hedef_belge = llm_belge_ismi
+            if self.resolver is not None:
+                kanonik = self.resolver.resolve(llm_belge_ismi, doc_name)
+                telemetry.inc("belge_resolutions_total", sonuc="kanonik" if kanonik else "ham")
+                hedef_belge = kanonik or llm_belge_ismi
+            madde_etiketleri = [format_madde_referansi(madde) for madde in atif_madde_listesi]
+            if hedef_belge != llm_belge_ismi:
+                print(f"      [~] Atıf İLİŞKİSİ (MERGE): '{llm_belge_ismi}' -> '{hedef_belge}' Maddeler: {madde_etiketleri}")
+            else:
+                print(f"      [~] Atıf İLİŞKİSİ (MERGE): '{llm_belge_ismi}' Maddeler: {madde_etiketleri}")
+            # Aynı belgeye çözülen farklı yazımlar tek ilişkide birleşir (MERGE madde listesini ezmesin)
+            maddeler = hedefler.setdefault(hedef_belge, [])
+            maddeler.extend(madde for madde in atif_madde_listesi if madde not in maddeler)
+
+        # Madde numaraları ve türleri ATIF_YAPAR'da paralel listeler olarak saklanır
+        row["atiflar"] = [
+            {"hedef_belge_isim": hedef_belge, "madde_listesi": [madde_no for _, madde_no in maddeler],
+             "madde_turleri": [madde_turu for madde_turu, _ in maddeler]}
+            for hedef_belge, maddeler in hedefler.items()
+        ]
+        if llm_json_data.get("hata"):
+            # Atıfsız yazılır ama belge eksik sayılır: sonraki yüklemede yeniden işlenir
+            row["cikarim_hatasi"] = True
+        return row
+
+    def prepare_chunks(self, doc: 'Document') -> List[Dict[str, Any]]:
+        """
+        Dokümanı chunk'lara ayırır, embedding'leri ve atıfları çıkarır.
+        Neo4j'ye yazılmaya hazır satırları ('rows') döndürür; veritabanına dokunmaz.
+        """
+        rows = self.embed_stage(self.chunk_stage(doc))
+        return [self.extract_stage(doc.isim, row) for row in rows]
+
+    def _write_document_tx(self, tx, doc: 'Document', rows: List[Dict[str, Any]], batch_size: int,
+                           eksik: bool):
+        # Yeniden yüklemede eski chunk'lar aynı transaction içinde değiştirilir
+        tx.run(CHUNK_DELETE_CYPHER, belge_isim=doc.isim)
+        tx.run(
+            BELGE_WRITE_CYPHER,
+            kurum_isim=doc.kurum,
+            belge_isim=doc.isim,
+            belge_tur=doc.tur
+        )
+        for start in range(0, len(rows), batch_size):
+            tx.run(CHUNK_WRITE_CYPHER, belge_isim=doc.isim, kurum_isim=doc.kurum, belge_tur=doc.tur,
+                   rows=rows[start:start + batch_size])
+        link_document_citations_tx(tx, doc.isim)
+        if doc.icerik_hash:
+            tx.run(MANIFEST_WRITE_CYPHER, belge_isim=doc.isim, icerik_hash=doc.icerik_hash,
+                   sema_surumu=INGEST_SCHEMA_VERSION, eksik=eksik)
+        tx.run(GENERATION_BUMP_CYPHER)
+
+    def get_manifest(self) -> Dict[str, str]:
+        """Daha önce yüklenmiş belgelerin {isim: icerik_hash} manifestini Neo4j'den okur."""
+        with self.driver.session(database=NEO4J_DATABASE) as session:
+            return {
+                record["isim"]: record["icerik_hash"]
+                for record in session.run(MANIFEST_READ_CYPHER, sema_surumu=INGEST_SCHEMA_VERSION)
+            }
+
+    @staticmethod
+    def _remove_document_tx(tx, belge_isim: str):
+        tx.run(BELGE_REMOVE_CYPHER, belge_isim=belge_isim).consume()
+        tx.run(GENERATION_BUMP_CYPHER)
+
+    def remove_document(self, belge_isim: str):
+        """'data/' klasöründen silinmiş bir belgeyi ve chunk'larını graftan kaldırır."""
+        with self.driver.session(database=NEO4J_DATABASE) as session:
+            session.execute_write(self._remove_document_tx, belge_isim)
+        print(f"[-] Kaldırıldı: {belge_isim}")
+
+    def write_document(self, doc: 'Document', rows: List[Dict[str, Any]],
+                       batch_size: int = WRITE_BATCH_SIZE):
+        """
+        Belgeyi, chunk'larını ve atıflarını tek bir açık yazma transaction'ında yazar.
+        Belgenin önceki chunk'ları (ve giden atıfları) aynı transaction'da silinir,
+        böylece yeniden yükleme chunk'ları çoğaltmaz. Chunk'lar 'batch_size'lık
+        UNWIND grupları halinde gönderilir; hata olursa hiçbir değişiklik kalmaz.
+        Satırlar eksikse ('rows_complete') manifest belgeyi eski olarak işaretler.
+        """
+        atif_sayisi = sum(len(row["atiflar"]) for row in rows)
+        eksik = not rows_complete(rows)
+        with telemetry.span("neo4j_write", belge=doc.isim, chunk=len(rows), atif=atif_sayisi):
             with self.driver.session(database=NEO4J_DATABASE) as session:
-                
-                # 1. CHUNK nodunu oluştur (madde bilgisi olmadan)
-                result = session.run(
-                    """
-                    MATCH (b:BELGE {isim: $belge_isim})
-                    CREATE (c:CHUNK {
-                        metin: $metin,
-                        kaynak_belge: $belge_isim,
-                        embedding: $embedding
-                    })
-                    CREATE (b)-[:ICERIR]->(c)
-                    RETURN elementId(c) AS chunk_id
-                    """,
-                    belge_isim=doc.isim,
-                    metin=chunk_text,
-                    embedding=embedding
-                )
-                chunk_node_id = result.single()["chunk_id"]
-
-                # 2. Atıfları işle (MERGE mantığı)
-                for atif in raw_references_list:
-                    llm_belge_ismi = atif.get("belge_adi_raw")
-                    if not llm_belge_ismi:
-                        continue
-                    
-                    # LLM'in atıf için bulduğu madde listesini temizle
-                    atif_madde_listesi = self._clean_madde_list(
-                        atif.get("madde_referanslari", [])
-                    )
-                    
-                    print(f"      [~] Atıf İLİŞKİSİ (MERGE): '{llm_belge_ismi}' Maddeler: {atif_madde_listesi}")
-                    session.run(
-                        """
-                        MATCH (c:CHUNK) WHERE elementId(c) = $chunk_id
-                        
-                        // Hedef belgeyi MERGE et (yoksa oluştur, varsa eşleştir)
-                        // Bu, "6446 sayılı kanun" gibi hatalı/yeni nodelar oluşturacak (Faz 2'de temizlenecek)
-                        MERGE (b_hedef:BELGE {isim: $hedef_belge_isim})
-                        
-                        // İlişkiyi MERGE et ve madde özelliğini ayarla
-                        MERGE (c)-[r:ATIF_YAPAR]->(b_hedef)
-                        SET r.madde = $madde_listesi
-                        """,
-                        chunk_id=chunk_node_id,
-                        hedef_belge_isim=llm_belge_ismi, # LLM'in ham çıktısı
-                        madde_listesi=atif_madde_listesi 
-                    )
-
-            print(f"   [+] Chunk {i} eklendi (İşlenen Atıf Sayısı: {len(raw_references_list)})")
\ No newline at end of file
+                session.execute_write(self._write_document_tx, doc, rows, max(1, batch_size), eksik)
+        if eksik:
+            telemetry.inc("documents_incomplete_total")
+            print(f"   [!] {doc.isim} eksik yazıldı (atlanan chunk ya da atıf çıkarımı hatası), "
+                  f"sonraki yüklemede yeniden işlenecek.")
+        elif self.journal is not None and doc.icerik_hash:
+            self.journal.document_written(doc.isim, doc.icerik_hash)
+        telemetry.inc("documents_written_total")
+        telemetry.inc("chunks_written_total", len(rows))
+        telemetry.inc("citations_written_total", atif_sayisi)
+        print(f"   [+] {len(rows)} chunk yazıldı (İşlenen Atıf Sayısı: {atif_sayisi})")
+
+    def process_document(self, doc: 'Document'):
+        """
+        Tek bir dökümanı işler.
+        LLM'den gelen TÜM atıfları 'MERGE' kullanarak [:ATIF_YAPAR] ilişkisine dönüştürür
+        (atıf yapılan maddeler ilişkide 'madde' / 'madde_turu' listeleri olarak tutulur).
+        Her chunk kapsadığı maddeyi 'madde_turu', 'madde_no' ve 'bolum' özellikleriyle taşır.
+        """
+        print(f"İşleniyor: {doc.isim}")
+        with telemetry.span("ingest_document", belge=doc.isim):
+            rows = self.prepare_chunks(doc)
+            self.write_document(doc, rows)
@@ -0,0 +1,108 @@
+import time
+import threading
+from typing import Dict, Optional
+from .cache import _open_sqlite
+from .config import INGEST_JOURNAL_PATH
+
+
+class IngestJournal:
+    """
+    Yükleme çalışmalarının kalıcı günlüğü (SQLite). Süreç ya da Ollama yarıda
+    kesildiğinde 'main_ingest.py --resume' kaldığı yerden devam eder.
+
+    Yalnızca manifestin bilemediği çalışma içi durum kaydedilir:
+      - çalışmalar: başlangıç/bitiş zamanı (bitişi olmayan çalışma yarıda kalmıştır)
+      - belgeler: çalışma içinde her belgenin durumu ('basladi' / 'yazildi')
+
+    Tamamlanmış belgeler zaten Neo4j manifestindedir; günlük bunları '--force'
+    ile başlatılmış bir çalışmaya devam edilirken (manifest yok sayılırken)
+    yeniden işlenmekten korur. Yarım kalan belgenin tamamlanmış LLM çıkarımları
+    ise atıf çıkarım önbelleğinden (ExtractionCache) gelir; Neo4j yazması
+    belge başına tek transaction olduğundan grafta yarım kayıt kalmaz.
+    """
+    def __init__(self, path: str = INGEST_JOURNAL_PATH):
+        self.path = path
+        self.run_id: Optional[int] = None
+        self._lock = threading.Lock()
+        self._conn = _open_sqlite(path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS calismalar (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                baslangic REAL NOT NULL,
+                bitis REAL
+            );
+            CREATE TABLE IF NOT EXISTS belgeler (
+                calisma_id INTEGER NOT NULL,
+                belge_isim TEXT NOT NULL,
+                icerik_hash TEXT NOT NULL,
+                durum TEXT NOT NULL,
+                PRIMARY KEY (calisma_id, belge_isim)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def start_run(self, resume: bool = False) -> Optional[int]:
+        """
+        Yeni bir çalışma başlatır. 'resume' ise son çalışma yeniden açılır ve
+        önceki çalışmanın id'si döndürülür (yoksa None); değilse önceki
+        çalışmaların kayıtları silinir.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT id, bitis FROM calismalar ORDER BY id DESC LIMIT 1").fetchone()
+            if resume and row is not None:
+                self.run_id = row[0]
+                self._conn.execute("UPDATE calismalar SET bitis = NULL WHERE id = ?", (self.run_id,))
+                self._conn.commit()
+                return self.run_id
+            self._conn.execute("DELETE FROM belgeler")
+            self._conn.execute("DELETE FROM calismalar")
+            cursor = self._conn.execute("INSERT INTO calismalar (baslangic) VALUES (?)", (time.time(),))
+            self.run_id = cursor.lastrowid
+            self._conn.commit()
+        return None
+
+    def finish_run(self):
+        with self._lock:
+            self._conn.execute("UPDATE calismalar SET bitis = ? WHERE id = ?", (time.time(), self.run_id))
+            self._conn.commit()
+
+    def _documents(self, durum: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT belge_isim, icerik_hash FROM belgeler WHERE calisma_id = ? AND durum = ?",
+                (self.run_id, durum)
+            ).fetchall()
+        return dict(rows)
+
+    def completed_documents(self) -> Dict[str, str]:
+        """Bu çalışmada yazması tamamlanmış belgeler: {isim: icerik_hash}."""
+        return self._documents("yazildi")
+
+    def interrupted_documents(self) -> Dict[str, str]:
+        """Bu çalışmada işlenmeye başlanmış ama yazılamamış belgeler: {isim: icerik_hash}."""
+        return self._documents("basladi")
+
+    def begin_document(self, belge_isim: str, icerik_hash: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO belgeler (calisma_id, belge_isim, icerik_hash, durum) "
+                "VALUES (?, ?, ?, 'basladi')",
+                (self.run_id, belge_isim, icerik_hash)
+            )
+            self._conn.commit()
+
+    def document_written(self, belge_isim: str, icerik_hash: str):
+        """Belge grafa eksiksiz yazıldı: devam edilirken yeniden işlenmez."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO belgeler (calisma_id, belge_isim, icerik_hash, durum) "
+                "VALUES (?, ?, ?, 'yazildi')",
+                (self.run_id, belge_isim, icerik_hash)
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,184 @@
+import re
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from .config import NEO4J_DATABASE
+from .belge_resolver import extract_belge_numarasi
+from .retrieval_filter import RetrievalFilter
+
+LEXICAL_CHUNKS_CYPHER = """
+MATCH (b:BELGE)-[:ICERIR]->(c:CHUNK)
+RETURN elementId(c) AS chunk_id, c.metin AS metin, b.isim AS kaynak_belge,
+       c.kurum AS kurum, c.tur AS tur, c.madde_no AS madde_no, c.madde_turu AS madde_turu, c.sira AS sira
+"""
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_TR_LOWER = str.maketrans("Iİ", "ıi")
+
+# Sorgudaki belge numarası: "6446 sayılı", "KHK 399", "399 nolu KHK", "5346 numaralı kanun"
+_BELGE_NO_PATTERNS = [
+    re.compile(r"\b(\d{3,5})\s*(?:sayılı|nolu|no'lu|numaralı)"),
+    re.compile(r"\b(?:khk|kanun|kararname)\s*(?:no\.?|numarası)?\s*:?\s*(\d{3,5})\b"),
+]
+# Sorgudaki madde numarası ve türü: "14. maddesi", "14 üncü madde", "madde 14",
+# "geçici madde 3", "geçici 3 üncü maddesi", "ek 2 nci madde"
+_MADDE_NO_PATTERNS = [
+    re.compile(r"(?:\b(?P<tur>geçici|ek)\s+)?(?<![\d.])\b(?P<no>\d{1,3})\s*"
+               r"(?:\.|['’]?\s*(?:[ıiuü]?nc[ıiuü]))?\s*madde"),
+    re.compile(r"(?:\b(?P<tur>geçici|ek)\s+)?\bmadde\s*(?P<no>\d{1,3})\b"),
+]
+# Bir madde numarasına bağlanamayan tür öneki ("geçici maddelerdeki 3 üncü madde")
+_MADDE_TURU_ONEKI_PATTERN = re.compile(r"\b(?:geçici|ek)\s+(?:madde|\d)")
+# CHUNK.madde_turu değerleri (graph_builder._MADDE_TURU_ONEKLERI ile aynı adlandırma)
+_MADDE_TURLERI = {"geçici": "Geçici Madde", "ek": "Ek Madde"}
+
+
+def tokenize(text: str) -> List[str]:
+    """Türkçe 'I/İ' harflerini doğru küçülterek metni kelimelere ayırır."""
+    return _TOKEN_PATTERN.findall(text.translate(_TR_LOWER).lower())
+
+
+@dataclass
+class QueryReference:
+    """Sorguda açıkça geçen belge ve madde atıfları."""
+    belge_numaralari: List[str] = field(default_factory=list)
+    belgeler: List[str] = field(default_factory=list)  # Numaradan çözülen BELGE isimleri
+    maddeler: List[Tuple[str, int]] = field(default_factory=list)  # (madde_turu, madde_no)
+    madde_turu_belirsiz: bool = False  # Sorguda bir numaraya bağlanamayan "geçici"/"ek" öneki var
+
+    def describe(self) -> str:
+        """Numaraların sırasız okunur hali ("belge no: 6446; madde: 14, geçici 3"); atıf yoksa boş."""
+        parts = []
+        if self.belge_numaralari:
+            parts.append("belge no: " + ", ".join(sorted(self.belge_numaralari, key=int)))
+        if self.maddeler:
+            parts.append("madde: " + ", ".join(
+                str(madde_no) if madde_turu == "Madde" else f"{madde_turu.split()[0].lower()} {madde_no}"
+                for madde_turu, madde_no in sorted(self.maddeler, key=lambda m: (m[0] != "Madde", m[0], m[1]))
+            ))
+        return "; ".join(parts)
+
+
+def parse_reference(query: str) -> QueryReference:
+    """
+    Sorgudaki açık belge numaralarını ve (madde_turu, madde_no) atıflarını bulur
+    (belge ismine çözmez). Türü belirtilmeyen madde asıl maddedir ("Madde").
+    """
+    lowered = query.translate(_TR_LOWER).lower()
+    reference = QueryReference()
+    for pattern in _BELGE_NO_PATTERNS:
+        for number in pattern.findall(lowered):
+            if number not in reference.belge_numaralari:
+                reference.belge_numaralari.append(number)
+    turlu = set()
+    for pattern in _MADDE_NO_PATTERNS:
+        for match in pattern.finditer(lowered):
+            if match.group("no") in reference.belge_numaralari:
+                continue
+            if match.group("tur"):
+                turlu.add(match.start("tur"))
+            madde = (_MADDE_TURLERI.get(match.group("tur"), "Madde"), int(match.group("no")))
+            if madde not in reference.maddeler:
+                reference.maddeler.append(madde)
+    reference.madde_turu_belirsiz = any(match.start() not in turlu
+                                        for match in _MADDE_TURU_ONEKI_PATTERN.finditer(lowered))
+    return reference
+
+
+class LexicalIndex:
+    """
+    CHUNK metinleri (ve ait oldukları BELGE isimleri) üzerinde BM25 ters indexi.
+
+    Ayrıca sorgudaki "6446 sayılı Kanunun 14. maddesi" gibi açık atıfları
+    tanır ve bunları doğrudan (embedding'e gerek kalmadan) ilgili madde
+    chunk'larına çözer.
+    """
+    def __init__(self, chunks: List[Dict], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+        self.belge_isimleri = sorted({chunk["kaynak_belge"] for chunk in chunks})
+        # Belgenin kendi kanun/KHK numarası; başlıkta yalnızca anılan numaralar sayılmaz
+        self._belge_numaralari = {isim: extract_belge_numarasi(isim) for isim in self.belge_isimleri}
+        self._madde_chunklari: Dict[Tuple[str, str, int], List[Dict]] = defaultdict(list)
+
+        for doc_idx, chunk in enumerate(chunks):
+            # Belge adı da indexlenir; böylece "İstatistik Kanunu" gibi sorgular ilgili belgeye yönelir
+            tokens = tokenize(chunk["metin"]) + tokenize(chunk["kaynak_belge"])
+            self.doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((doc_idx, tf))
+            if chunk.get("madde_no") is not None:
+                madde_turu = chunk.get("madde_turu") or "Madde"
+                self._madde_chunklari[(chunk["kaynak_belge"], madde_turu, chunk["madde_no"])].append(chunk)
+
+        for parts in self._madde_chunklari.values():
+            parts.sort(key=lambda c: c.get("sira") or 0)
+        self.avg_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+
+    @classmethod
+    def build_from_neo4j(cls, driver) -> "LexicalIndex":
+        with driver.session(database=NEO4J_DATABASE) as session:
+            chunks = [record.data() for record in session.run(LEXICAL_CHUNKS_CYPHER)]
+        index = cls(chunks)
+        print(f"Sözcüksel (BM25) index oluşturuldu: {len(chunks)} chunk, {len(index.belge_isimleri)} belge.")
+        return index
+
+    def search(self, query: str, k: int, filters: Optional[RetrievalFilter] = None) -> List[Tuple[str, float]]:
+        """
+        BM25 skoruna göre en iyi 'k' chunk'ı [(chunk_id, skor)] olarak döndürür.
+        'filters' verilirse yalnızca kurumu/türü filtreye uyan chunk'lar puanlanır.
+        """
+        if not self.chunks:
+            return []
+        n_docs = len(self.chunks)
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_idx, tf in postings:
+                if filters and not filters.matches(self.chunks[doc_idx].get("kurum"), self.chunks[doc_idx].get("tur")):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_idx] / self.avg_length)
+                scores[doc_idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: -item[1])[:k]
+        return [(self.chunks[doc_idx]["chunk_id"], score) for doc_idx, score in best]
+
+    def detect_reference(self, query: str) -> QueryReference:
+        """
+        Sorgudaki açık belge numarası ve madde atıflarını bulur, belge numarasını
+        kendi numarası o olan BELGE ismine çözer ('extract_belge_numarasi').
+        """
+        reference = parse_reference(query)
+        reference.belgeler = [
+            isim for isim in self.belge_isimleri
+            if self._belge_numaralari[isim] in reference.belge_numaralari
+        ]
+        return reference
+
+    def article_chunks(self, belge_isim: str, maddeler: List[Tuple[str, int]]) -> Optional[List[Dict]]:
+        """
+        Belgenin istenen (madde_turu, madde_no) maddelerinin chunk'larını döndürür.
+        Maddelerden biri bile bulunamazsa None döner (sonuç kesin değildir).
+        """
+        found = []
+        for madde_turu, madde_no in maddeler:
+            parts = self._madde_chunklari.get((belge_isim, madde_turu, madde_no))
+            if not parts:
+                return None
+            found.extend(parts)
+        return found
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Birden çok sıralamayı RRF ile birleştirir: skor = Σ 1 / (k + sıra)."""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            scores[chunk_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
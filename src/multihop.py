@@ -0,0 +1,234 @@
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from .config import (
+    NEIGHBOR_CACHE_MAX_ENTRIES, NEIGHBOR_CACHE_GENERATION_CHECK_SECONDS, PPR_ALPHA, PPR_ITERATIONS
+)
+
+# Çok atlamalı atıf gezintisi: tohum chunk'lardan (CHUNK)-[:ATIF_MADDE]->(CHUNK)
+# kenarları atlama başına yayılma bütçesiyle izlenir, bulunan alt graf tohum
+# skorlarıyla kişiselleştirilmiş PageRank (PPR) ile puanlanır.
+
+NeighborLookup = Callable[[List[str]], Dict[str, Tuple[dict, ...]]]
+
+
+def select_article_neighbors(komsular: Iterable[dict]) -> Tuple[dict, ...]:
+    """
+    Bir chunk'ın atıf yaptığı madde chunk'larından gönderilecekleri seçer.
+    ATIF_MADDE kenarları yüklemede madde türü ve numarasıyla eşlendiği için
+    ("geçici 3" yalnızca Geçici Madde 3'e bağlanır) tüm komşular alınır;
+    aynı chunk birden çok kez gelirse bir kez tutulur.
+    """
+    secilenler = {}
+    for komsu in komsular:
+        secilenler.setdefault(komsu["chunk_id"], komsu)
+    return tuple(secilenler.values())
+
+
+class NeighborCache:
+    """
+    Chunk başına atıf komşu listelerinin (ATIF_MADDE hedefleri ve metinleri)
+    süreç içi önbelleği. Çok atlamalı gezintide aynı chunk'ların komşuları her
+    soruda graftan tekrar okunmaz; 'max_entries' aşılınca en uzun süredir
+    kullanılmayan liste atılır.
+
+    'generation_reader' verilirse graf nesil sayacı en fazla
+    'generation_check_seconds' aralıkla okunur; sayaç değişmişse (yeni yükleme,
+    belge silme, kürasyon) tüm önbellek boşaltılır.
+    """
+    def __init__(self, max_entries: int = NEIGHBOR_CACHE_MAX_ENTRIES,
+                 generation_reader: Optional[Callable[[], int]] = None,
+                 generation_check_seconds: float = NEIGHBOR_CACHE_GENERATION_CHECK_SECONDS):
+        self.max_entries = max(1, max_entries)
+        self.generation_reader = generation_reader
+        self.generation_check_seconds = generation_check_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[dict, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._generation_checked = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _refresh_generation(self):
+        if self.generation_reader is None:
+            return
+        now = time.monotonic()
+        if now - self._generation_checked < self.generation_check_seconds:
+            return
+        self._generation_checked = now
+        try:
+            generation = self.generation_reader()
+        except Exception as e:
+            print(f"[!] Graf nesil sayacı okunamadı, komşu önbelleği boşaltılıyor: {e}")
+            generation = None
+        if generation != self._generation or generation is None:
+            with self._lock:
+                self._entries.clear()
+        self._generation = generation
+
+    def get_many(self, chunk_ids: Sequence[str]) -> Tuple[Dict[str, Tuple[dict, ...]], List[str]]:
+        """Önbellekteki komşu listelerini ve önbellekte olmayan chunk id'lerini döndürür."""
+        self._refresh_generation()
+        found, missing = {}, []
+        with self._lock:
+            for chunk_id in chunk_ids:
+                komsular = self._entries.get(chunk_id)
+                if komsular is None:
+                    missing.append(chunk_id)
+                    continue
+                self._entries.move_to_end(chunk_id)
+                found[chunk_id] = komsular
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put(self, chunk_id: str, komsular: Iterable[dict]) -> Tuple[dict, ...]:
+        """
+        Chunk'ın komşu listesini saklar ve döndürür. Komşular ATIF_MADDE kenarlarıyla
+        (madde_turu, madde_no) eşleşmesinden gelir; yalnızca tekrarlanan chunk'lar atılır.
+        """
+        secilenler = select_article_neighbors(komsular)
+        with self._lock:
+            self._entries[chunk_id] = secilenler
+            self._entries.move_to_end(chunk_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return secilenler
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        oran = (self.hits / total * 100) if total else 0.0
+        return (f"Komşu önbelleği: {len(self._entries)} chunk, {self.hits} isabet / "
+                f"{self.misses} ıskalama (%{oran:.1f} isabet)")
+
+
+@dataclass
+class CitationExpansion:
+    """Tohumlardan atlama atlama bulunan atıf alt grafı."""
+    adjacency: Dict[str, List[str]] = field(default_factory=dict)  # chunk -> alt graftaki atıf hedefleri
+    hops: Dict[str, int] = field(default_factory=dict)             # chunk -> tohumlara uzaklık (tohum: 0)
+    parents: Dict[str, str] = field(default_factory=dict)          # chunk -> onu ilk bulan (en iyi) chunk
+    nodes: Dict[str, dict] = field(default_factory=dict)           # chunk -> {chunk_id, metin, kaynak_belge, ...}
+
+
+def expand_citations(seed_scores: Dict[str, float], neighbor_lookup: NeighborLookup,
+                     hops: int, fanout: Sequence[int]) -> CitationExpansion:
+    """
+    Tohumlardan başlayarak atıf kenarlarını 'hops' atlamaya kadar izler.
+
+    Her atlamada komşu listeleri tek seferde istenir (önbellekte olmayanlar için
+    tek graf sorgusu). Eklenebilecek yeni chunk sayısı 'fanout' ile sınırlıdır;
+    bütçe öncü (frontier) chunk'lar arasında skor sırasıyla dönüşümlü (round-robin)
+    paylaştırılır, böylece çok atıf yapan tek bir chunk bütçeyi tüketemez.
+    Son atlamada bulunan chunk'ların komşuları okunmaz.
+    """
+    expansion = CitationExpansion(hops={chunk_id: 0 for chunk_id in seed_scores})
+    frontier = sorted(seed_scores, key=lambda chunk_id: -seed_scores[chunk_id])
+    for hop in range(1, hops + 1):
+        if not frontier:
+            break
+        neighbor_lists = neighbor_lookup(frontier)
+        for chunk_id in frontier:
+            komsular = neighbor_lists.get(chunk_id, ())
+            expansion.adjacency[chunk_id] = [komsu["chunk_id"] for komsu in komsular]
+            for komsu in komsular:
+                expansion.nodes.setdefault(komsu["chunk_id"], komsu)
+
+        budget = fanout[min(hop - 1, len(fanout) - 1)] if fanout else 0
+        queues = [list(expansion.adjacency[chunk_id]) for chunk_id in frontier]
+        next_frontier = []
+        while budget > 0 and any(queues):
+            for parent, queue in zip(frontier, queues):
+                while queue and queue[0] in expansion.hops:
+                    queue.pop(0)
+                if not queue or budget <= 0:
+                    continue
+                chunk_id = queue.pop(0)
+                expansion.hops[chunk_id] = hop
+                expansion.parents[chunk_id] = parent
+                next_frontier.append(chunk_id)
+                budget -= 1
+        frontier = next_frontier
+
+    # Bütçe dışında kalan hedeflere giden kenarlar alt graftan çıkarılır
+    for chunk_id, targets in expansion.adjacency.items():
+        expansion.adjacency[chunk_id] = [t for t in targets if t in expansion.hops]
+    return expansion
+
+
+def personalized_pagerank(adjacency: Dict[str, List[str]], personalization: Dict[str, float],
+                          alpha: float = PPR_ALPHA, iterations: int = PPR_ITERATIONS,
+                          tolerance: float = 1e-9) -> Dict[str, float]:
+    """
+    Kuvvet yinelemesiyle kişiselleştirilmiş PageRank. Her adımda olasılığın
+    'alpha' kadarı 'personalization' dağılımına geri döner; çıkış kenarı
+    olmayan (ya da komşuları okunmamış) chunk'ların olasılığı da oraya dağıtılır.
+    """
+    nodes = set(personalization)
+    for source, targets in adjacency.items():
+        nodes.add(source)
+        nodes.update(targets)
+    total = sum(max(value, 0.0) for value in personalization.values())
+    if total <= 0:
+        teleport = {node: 1.0 / len(personalization) for node in personalization} if personalization else {}
+    else:
+        teleport = {node: max(value, 0.0) / total for node, value in personalization.items()}
+
+    ranks = {node: teleport.get(node, 0.0) for node in nodes}
+    for _ in range(iterations):
+        dangling = 0.0
+        spread = dict.fromkeys(nodes, 0.0)
+        for node, rank in ranks.items():
+            targets = adjacency.get(node)
+            if targets:
+                share = rank / len(targets)
+                for target in targets:
+                    spread[target] += share
+            else:
+                dangling += rank
+        new_ranks = {
+            node: alpha * teleport.get(node, 0.0)
+                  + (1.0 - alpha) * (spread[node] + dangling * teleport.get(node, 0.0))
+            for node in nodes
+        }
+        delta = sum(abs(new_ranks[node] - ranks[node]) for node in nodes)
+        ranks = new_ranks
+        if delta < tolerance:
+            break
+    return ranks
+
+
+def rank_citations(expansion: CitationExpansion, seed_scores: Dict[str, float], top_k: int,
+                   alpha: float = PPR_ALPHA, iterations: int = PPR_ITERATIONS) -> List[str]:
+    """
+    Alt grafı tohum skorlarıyla kişiselleştirilmiş PageRank ile puanlar ve en
+    iyi 'top_k' tohum olmayan chunk'ı PPR sırasıyla döndürür. Bir chunk
+    seçildiğinde atıf zincirinin kopmaması için tohuma kadar olan ataları da
+    (bütçeye sayılarak, chunk'tan önce) seçilir.
+    """
+    ranks = personalized_pagerank(expansion.adjacency, seed_scores, alpha, iterations)
+    candidates = sorted((chunk_id for chunk_id, hop in expansion.hops.items() if hop > 0),
+                        key=lambda chunk_id: (-ranks.get(chunk_id, 0.0), expansion.hops[chunk_id]))
+    selected: List[str] = []
+    chosen = set()
+    for chunk_id in candidates:
+        if len(selected) >= top_k:
+            break
+        chain = []
+        node = chunk_id
+        while expansion.hops.get(node, 0) > 0 and node not in chosen:
+            chain.append(node)
+            node = expansion.parents[node]
+        if chain and len(selected) + len(chain) <= top_k:
+            selected.extend(reversed(chain))
+            chosen.update(chain)
+    return selected
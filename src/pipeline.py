@@ -0,0 +1,224 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from .config import (
+    PIPELINE_EMBED_WORKERS, PIPELINE_LLM_WORKERS, PIPELINE_WRITERS,
+    PIPELINE_QUEUE_SIZE, PIPELINE_REPORT_SECONDS
+)
+from .graph_builder import GraphBuilder
+
+_STOP = object()  # Kuyruk kapatma işareti
+
+
+@dataclass
+class StageStats:
+    """Bir aşamanın işlediği öğe sayısı, hata sayısı ve meşgul kaldığı süre."""
+    name: str
+    unit: str
+    items: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, items: int, seconds: float, errors: int = 0):
+        with self._lock:
+            self.items += items
+            self.busy_seconds += seconds
+            self.errors += errors
+
+    def summary(self, wall_seconds: float) -> str:
+        rate = self.items / wall_seconds if wall_seconds > 0 else 0.0
+        return (f"{self.name}: {self.items} {self.unit} ({rate:.2f} {self.unit}/sn, "
+                f"meşgul {self.busy_seconds:.1f} sn, hata {self.errors})")
+
+
+@dataclass
+class DocumentJob:
+    """Boru hattında ilerleyen bir belge; LLM aşaması bitince yazıcıya geçer."""
+    doc: Any
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    remaining: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class IngestionPipeline:
+    """
+    Yükleme aşamalarını (chunk -> embedding -> atıf çıkarımı -> Neo4j yazma)
+    eşzamanlı iş parçacıklarında çalıştırır.
+
+    Aşamalar sınırlı kuyruklarla bağlanır; yavaş bir aşama (ör. LLM) önündeki
+    aşamaları bekletir ve bellek kullanımı sınırlı kalır. Atıf çıkarımı chunk
+    bazında, yazma ise belge bazında (tek transaction) yapılır. Bir chunk'taki
+    hata yalnızca o chunk'ı, bir belgedeki yazma hatası yalnızca o belgeyi etkiler.
+    """
+    def __init__(self, builder: GraphBuilder,
+                 embed_workers: int = PIPELINE_EMBED_WORKERS,
+                 llm_workers: int = PIPELINE_LLM_WORKERS,
+                 writers: int = PIPELINE_WRITERS,
+                 queue_size: int = PIPELINE_QUEUE_SIZE,
+                 report_seconds: float = PIPELINE_REPORT_SECONDS):
+        self.builder = builder
+        self.embed_workers = max(1, embed_workers)
+        self.llm_workers = max(1, llm_workers)
+        self.writers = max(1, writers)
+        self.report_seconds = report_seconds
+
+        self.embed_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.extract_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.write_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+
+        self.stats = {
+            "chunk": StageStats("Chunk", "chunk"),
+            "embed": StageStats("Embedding", "chunk"),
+            "extract": StageStats("Atıf çıkarımı", "chunk"),
+            "write": StageStats("Neo4j yazma", "belge"),
+        }
+        self.failed_documents: List[str] = []
+        self._failed_lock = threading.Lock()
+        self._done = threading.Event()
+
+    # --- Aşama işçileri ---
+
+    def _fail_document(self, job: DocumentJob, stage: str, error: Exception):
+        print(f"[!!!] {job.doc.isim} {stage} aşamasında hata: {error}")
+        with self._failed_lock:
+            self.failed_documents.append(job.doc.isim)
+
+    def _chunk_worker(self, documents: Iterable[Any]):
+        try:
+            for doc in documents:
+                print(f"İşleniyor: {doc.isim}")
+                start = time.perf_counter()
+                job = DocumentJob(doc=doc)
+                try:
+                    job.rows = self.builder.chunk_stage(doc)
+                except Exception as e:
+                    self.stats["chunk"].record(0, time.perf_counter() - start, errors=1)
+                    self._fail_document(job, "chunk", e)
+                    continue
+                self.stats["chunk"].record(len(job.rows), time.perf_counter() - start)
+                self.embed_queue.put(job)
+        except Exception as e:
+            print(f"[!!!] Belge kaynağı okunurken hata, yeni belge alınmıyor: {e}")
+        finally:
+            for _ in range(self.embed_workers):
+                self.embed_queue.put(_STOP)
+
+    def _embed_worker(self):
+        while True:
+            job = self.embed_queue.get()
+            if job is _STOP:
+                return
+            start = time.perf_counter()
+            try:
+                total = len(job.rows)
+                job.rows = self.builder.embed_stage(job.rows)
+                self.stats["embed"].record(len(job.rows), time.perf_counter() - start,
+                                           errors=total - len(job.rows))
+            except Exception as e:
+                self.stats["embed"].record(0, time.perf_counter() - start, errors=1)
+                self._fail_document(job, "embedding", e)
+                continue
+
+            job.remaining = len(job.rows)
+            if not job.rows:
+                self.write_queue.put(job)
+                continue
+            for row in job.rows:
+                self.extract_queue.put((job, row))
+
+    def _extract_worker(self):
+        while True:
+            item = self.extract_queue.get()
+            if item is _STOP:
+                return
+            job, row = item
+            start = time.perf_counter()
+            try:
+                self.builder.extract_stage(job.doc.isim, row)
+                self.stats["extract"].record(1, time.perf_counter() - start)
+            except Exception as e:
+                # Hata sadece bu chunk'ı etkiler: chunk atıfsız olarak yazılır
+                print(f"   [!] {job.doc.isim} / chunk {row['sira']} atıf çıkarımı hatası: {e}")
+                row["atiflar"] = []
+                row["cikarim_hatasi"] = True
+                self.stats["extract"].record(1, time.perf_counter() - start, errors=1)
+
+            with job.lock:
+                job.remaining -= 1
+                finished = job.remaining == 0
+            if finished:
+                self.write_queue.put(job)
+
+    def _write_worker(self, write: Callable[[Any, List[Dict[str, Any]]], None]):
+        while True:
+            job = self.write_queue.get()
+            if job is _STOP:
+                return
+            start = time.perf_counter()
+            try:
+                write(job.doc, job.rows)
+                self.stats["write"].record(1, time.perf_counter() - start)
+            except Exception as e:
+                self.stats["write"].record(0, time.perf_counter() - start, errors=1)
+                self._fail_document(job, "yazma", e)
+
+    def _reporter(self, start: float):
+        while not self._done.wait(self.report_seconds):
+            elapsed = time.perf_counter() - start
+            rates = " | ".join(
+                f"{stats.name}: {stats.items / elapsed:.2f}/sn" for stats in self.stats.values()
+            )
+            print(f"[boru hattı {elapsed:.0f} sn] {rates} | kuyruklar: "
+                  f"embed={self.embed_queue.qsize()} llm={self.extract_queue.qsize()} "
+                  f"yazma={self.write_queue.qsize()}")
+
+    # --- Çalıştırma ---
+
+    def run(self, documents: Iterable[Any],
+            write: Optional[Callable[[Any, List[Dict[str, Any]]], None]] = None) -> float:
+        """
+        Belgeleri boru hattından geçirir ve toplam süreyi (sn) döndürür.
+        'write' verilmezse 'GraphBuilder.write_document' kullanılır.
+        """
+        write = write or self.builder.write_document
+        start = time.perf_counter()
+        self._done.clear()
+
+        def start_threads(target, count, *args):
+            threads = [threading.Thread(target=target, args=args, daemon=True) for _ in range(count)]
+            for thread in threads:
+                thread.start()
+            return threads
+
+        reporter = start_threads(self._reporter, 1, start) if self.report_seconds > 0 else []
+        chunkers = start_threads(self._chunk_worker, 1, documents)
+        embedders = start_threads(self._embed_worker, self.embed_workers)
+        extractors = start_threads(self._extract_worker, self.llm_workers)
+        writers = start_threads(self._write_worker, self.writers, write)
+
+        # Her aşama bittikten sonra bir sonrakinin kuyruğu kapatılır
+        for thread in chunkers + embedders:
+            thread.join()
+        for _ in extractors:
+            self.extract_queue.put(_STOP)
+        for thread in extractors:
+            thread.join()
+        for _ in writers:
+            self.write_queue.put(_STOP)
+        for thread in writers:
+            thread.join()
+
+        self._done.set()
+        for thread in reporter:
+            thread.join()
+
+        elapsed = time.perf_counter() - start
+        print(f"--- Boru hattı özeti ({elapsed:.1f} sn) ---")
+        for stats in self.stats.values():
+            print("  " + stats.summary(elapsed))
+        if self.failed_documents:
+            print(f"  Hatalı belgeler: {', '.join(self.failed_documents)}")
+        return elapsed
@@ -0,0 +1,102 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+# Sorgu kapsamı: aramayı tek bir kuruma ya da belge türüne daraltan filtre.
+# Değerler CHUNK nodlarındaki 'kurum' / 'tur' özellikleriyle (data_loader.KURUM_MAP /
+# TUR_MAP karşılıkları) aynıdır; filtre vektör aramasından önce uygulanır.
+
+_TR_LOWER = str.maketrans("Iİ", "ıi")
+_ASCII_FOLD = str.maketrans("çğıöşü", "cgiosu")
+
+# Sorguda kurumun açıkça anıldığı kalıplar (Türkçe küçük harfe çevrilmiş metinde)
+_KURUM_PATTERNS = {
+    "TEİAŞ": re.compile(r"\bte[iı]a[sş]|\btürkiye elektrik iletim\b"),
+    "TEDAŞ": re.compile(r"\bteda[sş]|\btürkiye elektrik dağıtım\b"),
+}
+# Sorguda belge türünün anıldığı kalıplar ("kanunun", "yönetmeliğe", "usul ve esaslarda")
+_TUR_PATTERNS = {
+    "Kanun": re.compile(r"\bkanun(?!i\b|en\b)"),
+    "Yönetmelik": re.compile(r"\byönetmeli[kğ]"),
+    "Yönerge": re.compile(r"\byönerge"),
+    "Usul ve Esaslar": re.compile(r"\busul ve esas"),
+}
+
+
+def _tr_lower(text: str) -> str:
+    return text.translate(_TR_LOWER).lower()
+
+
+def _fold(text: str) -> str:
+    """Karşılaştırma anahtarı: Türkçe küçük harf, aksansız ("TEİAŞ" -> "teias")."""
+    return _tr_lower(text).translate(_ASCII_FOLD).strip()
+
+
+_KNOWN_VALUES: Dict[str, str] = {_fold(value): value for value in (*_KURUM_PATTERNS, *_TUR_PATTERNS)}
+# data/ klasör adları da kabul edilir (data_loader.TUR_MAP anahtarları)
+_KNOWN_VALUES.update({"usul-esaslar": "Usul ve Esaslar", "kanunlar": "Kanun"})
+
+
+@dataclass(frozen=True)
+class RetrievalFilter:
+    """
+    Aramanın kapsamı: izin verilen kurumlar ve belge türleri. Boş demet o
+    boyutta kısıt olmadığı anlamına gelir; iki boyut birlikte verilirse ikisi
+    de sağlanmalıdır (kurum VE tür).
+    """
+    kurumlar: Tuple[str, ...] = ()
+    turler: Tuple[str, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.kurumlar or self.turler)
+
+    def matches(self, kurum: Optional[str], tur: Optional[str]) -> bool:
+        return ((not self.kurumlar or kurum in self.kurumlar)
+                and (not self.turler or tur in self.turler))
+
+    def describe(self) -> str:
+        parts = []
+        if self.kurumlar:
+            parts.append("kurum: " + ", ".join(self.kurumlar))
+        if self.turler:
+            parts.append("tür: " + ", ".join(self.turler))
+        return "; ".join(parts)
+
+    def to_dict(self) -> dict:
+        return {"kurum": list(self.kurumlar), "tur": list(self.turler)}
+
+
+def _canonical(values: Union[None, str, Iterable[str]]) -> Tuple[str, ...]:
+    if values is None:
+        return ()
+    if isinstance(values, str):
+        values = [values]
+    found = []
+    for value in values:
+        value = str(value).strip()
+        if not value:
+            continue
+        # Bilinen kurum/tür adları yazımdan bağımsız eşlenir ("teias" -> "TEİAŞ"); diğerleri
+        # data_loader'ın haritada olmayan klasör adlarına yaptığı gibi büyük harfle başlatılır
+        value = _KNOWN_VALUES.get(_fold(value)) or value.capitalize()
+        if value not in found:
+            found.append(value)
+    return tuple(found)
+
+
+def make_filter(kurum: Union[None, str, Iterable[str]] = None,
+                tur: Union[None, str, Iterable[str]] = None) -> RetrievalFilter:
+    """Açıkça verilen kurum/tür değerlerinden (tekil ya da liste) filtre oluşturur."""
+    return RetrievalFilter(_canonical(kurum), _canonical(tur))
+
+
+def infer_filter(query: str) -> RetrievalFilter:
+    """
+    Sorguda açıkça anılan kurum ("TEİAŞ", "TEDAŞ") ve belge türlerini
+    ("Kanun", "Yönetmelik", ...) bulur. Hiçbiri anılmamışsa filtre boştur.
+    """
+    lowered = _tr_lower(query)
+    return RetrievalFilter(
+        tuple(kurum for kurum, pattern in _KURUM_PATTERNS.items() if pattern.search(lowered)),
+        tuple(tur for tur, pattern in _TUR_PATTERNS.items() if pattern.search(lowered)),
+    )
@@ -1,154 +1,130 @@
 import ollama
-import re  # Madde aramak için Python'un Regex kütüphanesini import ediyoruz
+import threading
+import time
+from dataclasses import dataclass, field
 from neo4j import GraphDatabase
-from .config import EMBEDDING_MODEL, LLM_MODEL, OLLAMA_HOST, NEO4J_DATABASE
+from typing import Iterator, Optional
+from .config import (
+    EMBEDDING_MODEL, LLM_MODEL, OLLAMA_HOST, NEO4J_DATABASE, RETRIEVAL_BACKEND,
+    LEXICAL_ROUTING, LEXICAL_TOP_K, RRF_K, ANSWER_CACHE_ENABLED, RETRIEVAL_MODE, PPR_HOPS, PPR_FANOUT,
+    PPR_ALPHA, PPR_ITERATIONS, PPR_TOP_K, QUERY_FILTER_INFERENCE, INDEX_GENERATION_CHECK_SECONDS
+)
+from . import telemetry
+from .answer_cache import AnswerCache
+from .context_builder import ContextBuilder, ContextResult
 from .embedding_utils import EmbeddingGenerator
+from .graph_builder import read_graph_generation
+from .lexical_index import LexicalIndex, parse_reference, reciprocal_rank_fusion
+from .multihop import NeighborCache, expand_citations, rank_citations
+from .retrieval_filter import RetrievalFilter, infer_filter
+from .vector_store import LocalVectorIndex
 
-class ChatRetriever:
-    def __init__(self, driver: GraphDatabase.driver, embedder: EmbeddingGenerator):
-        self.driver = driver
-        self.embedder = embedder
-        self.client = ollama.Client(host=OLLAMA_HOST)
+# Tohum araması (Neo4j vektör indexi)
+SEED_VECTOR_INDEX_CYPHER = """
+CALL db.index.vector.queryNodes('chunk_embeddings', $k, $embedding)
+YIELD node AS chunk, score
+"""
 
-    def _find_chunks_for_articles(self, session, hedef_belge_isim: str, hedef_maddeler: list[int]) -> list[str]:
-        """
-        Yardımcı fonksiyon: Bir belgenin TÜM chunk'larını çeker ve
-        Python Regex kullanarak belirli maddeleri içerenleri arar.
-        """
-        if not hedef_maddeler:
-            return []
+# Yalnızca vektör tohumları (sözcüksel sonuçlarla RRF birleştirmesi için)
+SEED_VECTOR_IDS_CYPHER = SEED_VECTOR_INDEX_CYPHER + """
+RETURN elementId(chunk) AS chunk_id, score
+"""
 
-        # 1. Hedef belgenin TÜM chunk'larını Neo4j'den çek
-        query_all_chunks = """
-        MATCH (b:BELGE {isim: $belge_isim})-[:ICERIR]->(c:CHUNK)
-        RETURN c.metin AS metin
-        """
-        records = session.run(query_all_chunks, belge_isim=hedef_belge_isim)
-        all_chunk_texts = [record["metin"] for record in records]
-        
-        if not all_chunk_texts:
-            print(f"      [!] '{hedef_belge_isim}' için chunk bulunamadı (Bu bir kanonik belge olmayabilir).")
-            return []
+# Kapsamlı tohum araması (kurum/tür filtresi): yalnızca filtreye uyan chunk'lar
+# (CHUNK.kurum / CHUNK.tur indexleriyle bulunur) tam kosinüs benzerliğiyle puanlanır;
+# skor ölçeği vektör indexiyle aynıdır ((1 + kosinüs) / 2). Planlayıcının index
+# kullanabilmesi için filtrelenen boyutlara göre ayrı sorgu: (kurum var mı, tür var mı).
+_SCOPE_CONDITIONS = {
+    (True, False): "chunk.kurum IN $kurumlar",
+    (False, True): "chunk.tur IN $turler",
+    (True, True): "chunk.kurum IN $kurumlar AND chunk.tur IN $turler",
+}
+SEED_SCOPED_CYPHER = {
+    scope: f"""
+MATCH (chunk:CHUNK)
+WHERE {condition} AND chunk.embedding IS NOT NULL
+WITH chunk, vector.similarity.cosine(chunk.embedding, $embedding) AS score
+ORDER BY score DESC
+LIMIT $k
+"""
+    for scope, condition in _SCOPE_CONDITIONS.items()
+}
+SEED_SCOPED_IDS_CYPHER = {
+    scope: query + """
+RETURN elementId(chunk) AS chunk_id, score
+"""
+    for scope, query in SEED_SCOPED_CYPHER.items()
+}
 
-        # 2. Python Regex ile bu chunk'lar içinde maddeleri ara
-        found_chunk_texts = []
-        for madde_no in hedef_maddeler:
-            # "Madde 5", "Ek Madde 5", "Geçici Madde 5" kalıplarını (büyük/küçük harf duyarsız) arar
-            madde_regex = re.compile(rf'(?i)(?:Madde|Ek Madde|Geçici Madde)\s+{madde_no}\b')
-            
-            for chunk_text in all_chunk_texts:
-                if madde_regex.search(chunk_text):
-                    print(f"      [~] Derin Gezinti BAŞARILI: '{hedef_belge_isim}' içinden Madde {madde_no} bulundu.")
-                    found_chunk_texts.append(chunk_text)
-                    break # Bu madde için chunk'ı bulduk, sonraki maddeye geç
-        
-        return found_chunk_texts
+# Tohumlar süreç içinde bulunduysa (RETRIEVAL_BACKEND = "local", sözcüksel yönlendirme
+# veya RRF birleştirmesi) chunk'lar id ile bulunur
+SEED_BY_ID_CYPHER = """
+UNWIND $seeds AS seed
+MATCH (chunk:CHUNK) WHERE elementId(chunk) = seed.chunk_id
+WITH chunk, seed.score AS score
+"""
 
+# Tohumlardan sonra: kaynak belge/kurum + 1. seviye atıflar + atıf yapılan maddelerin chunk'ları.
+# Derin gezinti yüklemede somutlaştırılan (CHUNK)-[:ATIF_MADDE]->(CHUNK) kenarlarıyla tek atlamadır.
+EXPAND_CONTEXT_CYPHER = """
+// Kaynak belgeyi ve Kurumunu bul
+MATCH (b_kaynak:BELGE)-[:ICERIR]->(chunk)
+MATCH (k_kaynak:KURUM)-[:YAYINLADI]->(b_kaynak)
+WITH chunk, score, b_kaynak, k_kaynak
+ORDER BY score DESC
+LIMIT $k
 
-    def get_response(self, user_query: str):
-        print(f"Sorgu alindi: {user_query}")
+// 1. seviye atıflar ve atıf yapılan maddelerin metinleri
+CALL {
+    WITH chunk
+    MATCH (chunk)-[r:ATIF_YAPAR]->(b_hedef:BELGE)
+    CALL {
+        WITH chunk, b_hedef
+        OPTIONAL MATCH (chunk)-[:ATIF_MADDE]->(t:CHUNK)
+        WHERE t.kaynak_belge = b_hedef.isim
+        WITH t ORDER BY t.sira
+        RETURN [x IN collect(t) | {
+            chunk_id: elementId(x), metin: x.metin,
+            madde_no: x.madde_no, madde_turu: x.madde_turu
+        }] AS hedef_chunklar
+    }
+    RETURN collect({
+        hedef_belge: b_hedef.isim,
+        hedef_maddeler: r.madde,
+        hedef_madde_turleri: r.madde_turu,
+        hedef_chunklar: hedef_chunklar
+    }) AS atiflar
+}
 
-        query_embedding = self.embedder.get_embedding(user_query)
-        if not query_embedding:
-            return "Sorgunuz için embedding oluşturulamadı."
+RETURN elementId(chunk) AS chunk_id,
+       chunk.metin AS metin,
+       b_kaynak.isim AS kaynak_belge,
+       k_kaynak.isim AS kaynak_kurum,
+       score,
+       atiflar
+ORDER BY score DESC
+"""
 
-        # --- 1. Adım: Vektör Arama (Tohumlama, k=5 ve Kurum Bilgisi) ---
-        k_seed = 5 # Alınacak tohum chunk sayısı
-        
-        with self.driver.session(database=NEO4J_DATABASE) as session:
-            vector_search_result = session.run(
-                """
-                CALL db.index.vector.queryNodes('chunk_embeddings', $k, $embedding)
-                YIELD node AS chunk, score
-                
-                // Kaynak belgeyi ve Kurumunu bul
-                MATCH (b_kaynak:BELGE)-[:ICERIR]->(chunk)
-                MATCH (k_kaynak:KURUM)-[:YAYINLADI]->(b_kaynak)
-                
-                RETURN elementId(chunk) AS chunk_id, 
-                       chunk.metin AS metin, 
-                       b_kaynak.isim AS kaynak_belge,
-                       k_kaynak.isim AS kaynak_kurum, // Kurum bilgisi eklendi
-                       score
-                ORDER BY score DESC
-                LIMIT $k
-                """,
-                k=k_seed,
-                embedding=query_embedding
-            )
-            retrieved_chunks = [record.data() for record in vector_search_result]
-        
-        if not retrieved_chunks:
-            return "İlgili bilgi bulunamadı."
-
-        seed_chunk_ids = [chunk['chunk_id'] for chunk in retrieved_chunks]
-        context_str = ""
-        
-        # --- 2. Adım: Bağlam 1 (Tohum Chunk'lar) ---
-        for i, chunk in enumerate(retrieved_chunks):
-            context_str += (
-                f"--- BAĞLAM {i+1} (Tohum Chunk)\n"
-                f"Kurum: {chunk['kaynak_kurum']}\n"
-                f"Kaynak Belge: {chunk['kaynak_belge']}\n"
-                f"Metin:\n{chunk['metin']}\n---\n\n"
-            )
-            
-        # --- 3. Adım: Grafik Gezintisi (1. Seviye Atıflar) ---
-        with self.driver.session(database=NEO4J_DATABASE) as session:
-            graph_relations_result = session.run(
-                """
-                MATCH (c:CHUNK)-[r:ATIF_YAPAR]->(b_hedef:BELGE)
-                WHERE elementId(c) IN $chunk_ids
-                RETURN c.kaynak_belge AS kaynak_belge_ati_yapan, 
-                       b_hedef.isim AS hedef_belge, 
-                       r.madde AS hedef_maddeler
-                """,
-                chunk_ids=seed_chunk_ids
-            )
-            graph_relations = [record.data() for record in graph_relations_result]
+# Tek sorguda tohum araması + genişletme
+RETRIEVE_CONTEXT_CYPHER = SEED_VECTOR_INDEX_CYPHER + EXPAND_CONTEXT_CYPHER
+RETRIEVE_CONTEXT_BY_IDS_CYPHER = SEED_BY_ID_CYPHER + EXPAND_CONTEXT_CYPHER
+RETRIEVE_CONTEXT_SCOPED_CYPHER = {
+    scope: query + EXPAND_CONTEXT_CYPHER for scope, query in SEED_SCOPED_CYPHER.items()
+}
 
-        # --- 4. Adım: Bağlam 2 (İlişkiler ve Derin Gezinti) ---
-        if graph_relations:
-            context_str += "--- İLGİLİ BAĞLANTILAR (Grafikten Alındı) ---\n"
-            
-            with self.driver.session(database=NEO4J_DATABASE) as session_for_deep_traversal:
-                for i, relation in enumerate(graph_relations):
-                    hedef_belge = relation['hedef_belge']
-                    hedef_maddeler = relation['hedef_maddeler']
-                    
-                    context_str += (
-                        f"Bağlantı {i+1}: '{relation['kaynak_belge_ati_yapan']}' dokümanı, "
-                        f"'{hedef_belge}' dokümanına atıf yapıyor."
-                    )
-                    
-                    if not hedef_maddeler:
-                        context_str += " (Madde belirtilmemiş).\n\n"
-                        continue # Derin gezintiye gerek yok
-                    
-                    # --- 4b. Adım: Derin Gezinti (2. Seviye) ---
-                    context_str += f" (İlgili maddeler: {hedef_maddeler})\n"
-                    
-                    # Python'da Regex ile ilgili maddelerin metinlerini bul
-                    found_article_texts = self._find_chunks_for_articles(
-                        session_for_deep_traversal, 
-                        hedef_belge, 
-                        hedef_maddeler
-                    )
-                    
-                    if found_article_texts:
-                        for j, text in enumerate(found_article_texts):
-                            context_str += (
-                                f"  --- EK BAĞLAM (Atıf Yapılan Madde Metni {j+1} - Kaynak: {hedef_belge}) ---\n"
-                                f"  {text}\n"
-                                f"  ---\n"
-                            )
-                    else:
-                        context_str += f"  (Not: '{hedef_belge}' içindeki {hedef_maddeler} maddelerinin metni KG'de bulunamadı.)\n"
-                    
-                    context_str += "\n"
-        
-        # --- 5. Adım: LLM'e Gönderme ---
-        system_prompt = """
+# Çok atlamalı gezinti: önbellekte olmayan chunk'ların atıf yaptığı madde chunk'ları (tek sorgu)
+NEIGHBORS_CYPHER = """
+UNWIND $chunk_ids AS chunk_id
+MATCH (c:CHUNK) WHERE elementId(c) = chunk_id
+OPTIONAL MATCH (c)-[:ATIF_MADDE]->(t:CHUNK)
+WITH chunk_id, t ORDER BY t.kaynak_belge, t.sira
+RETURN chunk_id, [x IN collect(t) | {
+    chunk_id: elementId(x), metin: x.metin, kaynak_belge: x.kaynak_belge,
+    madde_no: x.madde_no, madde_turu: x.madde_turu
+}] AS komsular
+"""
+
+ANSWER_SYSTEM_PROMPT = """
 Sen Türkiye enerji mevzuatı konusunda uzman bir yapay zeka asistanısın.
 Sana iki tür bilgi sağlanacak:
 1. 'BAĞLAM (Tohum Chunk)': Kullanıcının sorusuyla doğrudan ilgili metin parçaları (Kurum ve Kaynak Belge bilgisiyle).
@@ -159,26 +135,557 @@ Cevabını SADECE sağlanan bu bilgilere dayandır.
 Eğer cevap bağlamda yoksa, 'Sağlanan belgelerde bu bilgiye ulaşamadım.' de.
 Cevaplarını açık, net ve Türkçe ver.
         """
-        
-        final_prompt = f"BAĞLAM:\n{context_str}\n\nSORU: {user_query}"
-        
+
+
+@dataclass
+class PreparedQuery:
+    """
+    Bir sorunun LLM'e gönderilmeye hazır hali: önbellek sonucu ya da bulunan
+    bağlam. 'hata' doluysa cevap üretilmez, kullanıcıya bu mesaj gösterilir.
+    """
+    soru: str
+    timings: dict = field(default_factory=dict)
+    cached_answer: Optional[str] = None
+    similarity: float = 0.0
+    dogrudan_atif: Optional[str] = None  # Sözcüksel yönlendirmeyle doğrudan çözülen atıf
+    filtre: Optional[RetrievalFilter] = None  # Tohum aramasına uygulanan (açık) kurum/tür filtresi
+    acik_filtre: bool = False          # Filtre çağıran tarafından verildi
+    kapsam: str = ""                   # Filtrenin ve sorgudaki belge/madde numaralarının okunur hali (cevap önbelleği anahtarı)
+    kapsam_onceligi: Optional[RetrievalFilter] = None  # Sorgudan çıkarılan kapsam: yalnızca sıralamada öne çıkarır
+    query_embedding: Optional[list] = None
+    seeds: list = field(default_factory=list)
+    relations: list = field(default_factory=list)
+    context: str = ""
+    context_stats: dict = field(default_factory=dict)  # Bağlam token bütçesi raporu
+    context_chunk_ids: Optional[set] = None  # Bağlama giren chunk'lar (bütçeye sığmayanlar hariç)
+    hata: Optional[str] = None
+
+    def _in_context(self, chunk_id: str) -> bool:
+        return self.context_chunk_ids is None or chunk_id in self.context_chunk_ids
+
+    def sources(self) -> list[dict]:
+        """
+        Cevabın dayandığı chunk'lar (tohumlar ve atıf yapılan madde metinleri).
+        Bağlam kurulduysa yalnızca LLM'e gönderilenler döner; token bütçesi
+        nedeniyle çıkarılan chunk'lar kaynak olarak listelenmez.
+        """
+        kaynaklar = [
+            {"tur": "tohum", "chunk_id": seed["chunk_id"], "kaynak_belge": seed["kaynak_belge"],
+             "kaynak_kurum": seed["kaynak_kurum"], "score": seed["score"]}
+            for seed in self.seeds if self._in_context(seed["chunk_id"])
+        ]
+        for relation in self.relations:
+            for chunk in relation["hedef_chunklar"]:
+                if not self._in_context(chunk["chunk_id"]):
+                    continue
+                kaynaklar.append({
+                    "tur": "atif", "chunk_id": chunk["chunk_id"], "kaynak_belge": relation["hedef_belge"],
+                    "atif_yapan": relation["kaynak_belge_ati_yapan"], "madde_no": chunk["madde_no"]
+                })
+        return kaynaklar
+
+
+class ChatRetriever:
+    def __init__(self, driver: GraphDatabase.driver, embedder: EmbeddingGenerator,
+                 backend: str = RETRIEVAL_BACKEND, vector_index: Optional[LocalVectorIndex] = None,
+                 lexical_index: Optional[LexicalIndex] = None, lexical_routing: bool = LEXICAL_ROUTING,
+                 answer_cache: Optional[AnswerCache] = None, use_answer_cache: bool = ANSWER_CACHE_ENABLED,
+                 context_builder: Optional[ContextBuilder] = None, retrieval_mode: str = RETRIEVAL_MODE,
+                 neighbor_cache: Optional[NeighborCache] = None, infer_filters: bool = QUERY_FILTER_INFERENCE,
+                 index_check_seconds: float = INDEX_GENERATION_CHECK_SECONDS, host: str = OLLAMA_HOST):
+        self.driver = driver
+        self.embedder = embedder
+        self.client = ollama.Client(host=host)
+        self.backend = backend
+        # Burada kurulan indexler graf nesil sayacıyla yenilenir ('_refresh_indexes');
+        # dışarıdan verilen indexlerin güncelliği çağıranın sorumluluğundadır
+        self._owns_vector_index = backend == "local" and vector_index is None
+        self._owns_lexical_index = lexical_routing and lexical_index is None
+        self.index_check_seconds = index_check_seconds
+        self._index_lock = threading.Lock()
+        self._index_checked = time.monotonic()
+        self._lexical_generation: Optional[int] = None
+        self._vector_warned_generation: Optional[int] = None
+        self.vector_index = vector_index
+        if self._owns_vector_index:
+            self.vector_index = LocalVectorIndex.load()
+            print(f"Yerel vektör indexi yüklendi: {len(self.vector_index)} chunk.")
+        self.lexical_index = lexical_index
+        if self._owns_lexical_index:
+            self._lexical_generation = self._read_generation()
+            self.lexical_index = LexicalIndex.build_from_neo4j(driver)
+        self.answer_cache = answer_cache
+        if use_answer_cache and answer_cache is None:
+            self.answer_cache = AnswerCache(generation_reader=lambda: read_graph_generation(driver))
+        self.context_builder = context_builder or ContextBuilder()
+        self.retrieval_mode = retrieval_mode
+        self.infer_filters = infer_filters
+        self.neighbor_cache = neighbor_cache
+        if retrieval_mode == "ppr" and neighbor_cache is None:
+            self.neighbor_cache = NeighborCache(generation_reader=lambda: read_graph_generation(driver))
+        self.last_timings = {}  # Son sorgunun aşama süreleri (sn): routing, embedding, retrieval, generation
+
+    def _read_generation(self) -> Optional[int]:
         try:
-            response_stream = self.client.chat(
-                model=LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": final_prompt}
-                ],
-                stream=True
+            return read_graph_generation(self.driver)
+        except Exception as e:
+            print(f"[!] Graf nesil sayacı okunamadı, indexler yenilenemiyor: {e}")
+            return None
+
+    def _refresh_indexes(self):
+        """
+        Graf nesil sayacı değiştiyse (yeni yükleme, belge silme, kürasyon) süreç içi
+        indexleri yeniler: BM25 indexi graftan yeniden kurulur, yerel vektör indexi
+        diskte yeniden yazıldıysa yüklenir. Sayaç en fazla 'index_check_seconds'
+        aralıkla okunur; yenileme sürerken gelen sorgular eski indexle devam eder.
+        """
+        if not (self._owns_lexical_index or self._owns_vector_index):
+            return
+        now = time.monotonic()
+        if now - self._index_checked < self.index_check_seconds or not self._index_lock.acquire(blocking=False):
+            return
+        try:
+            self._index_checked = now
+            generation = self._read_generation()
+            if generation is None:
+                return
+            if self._owns_lexical_index and generation != self._lexical_generation:
+                print(f"[~] Graf değişti (nesil {self._lexical_generation} -> {generation}), "
+                      f"sözcüksel index yeniden kuruluyor.")
+                self.lexical_index = LexicalIndex.build_from_neo4j(self.driver)
+                self._lexical_generation = generation
+            if self._owns_vector_index and generation != self.vector_index.generation:
+                if self.vector_index.changed_on_disk():
+                    self.vector_index = LocalVectorIndex.load(self.vector_index.path)
+                    print(f"[~] Yerel vektör indexi yeniden yüklendi: {len(self.vector_index)} chunk "
+                          f"(nesil {self.vector_index.generation}).")
+                if generation not in (self.vector_index.generation, self._vector_warned_generation):
+                    self._vector_warned_generation = generation
+                    print(f"[!] Yerel vektör indexi graftan eski (index nesli {self.vector_index.generation}, "
+                          f"graf nesli {generation}); export_vectors.py ile yenileyin.")
+        finally:
+            self._index_lock.release()
+
+    @staticmethod
+    def _select_article_chunks(hedef_maddeler: list[int], hedef_chunklar: list[dict],
+                               hedef_madde_turleri: Optional[list[str]] = None) -> list[dict]:
+        """
+        Atıf yapılan her madde için gönderilecek chunk'ları atıf sırasıyla seçer.
+        Madde türü ve numarasıyla eşlenir ("geçici 3" yalnızca Geçici Madde 3);
+        türü kayıtlı olmayan atıflar asıl maddeyi gösterir. Bölünmüş maddelerin
+        tüm bölümleri sırasıyla döner.
+        """
+        madde_chunklari = {}
+        for chunk in hedef_chunklar:
+            madde_chunklari.setdefault((chunk["madde_turu"], chunk["madde_no"]), []).append(chunk)
+
+        turler = hedef_madde_turleri or ["Madde"] * len(hedef_maddeler)
+        secilenler = []
+        for madde_turu, madde_no in zip(turler, hedef_maddeler):
+            secilenler.extend(madde_chunklari.get((madde_turu or "Madde", madde_no), []))
+        return secilenler
+
+    def route_query(self, user_query: str, filters: Optional[RetrievalFilter] = None):
+        """
+        Sorguyu sözcüksel indexe göre yönlendirir. 'filters' yalnızca BM25
+        sıralamasına uygulanır; açıkça anılan belge maddeleri filtreden bağımsızdır.
+
+        Dönüş: (kesin_tohumlar, sözcüksel_idler, açıklama)
+          kesin_tohumlar: Sorgu tek bir belgenin belirli maddelerini açıkça
+                          soruyorsa ("6446 sayılı Kanunun 14. maddesi") o maddelerin
+                          chunk'ları; bu durumda embedding/vektör araması gerekmez.
+          sözcüksel_idler: Aksi halde vektör sonuçlarıyla RRF ile birleştirilecek
+                           BM25 sıralaması.
+          açıklama: Doğrudan çözülen atıfın okunur hali (yoksa None).
+        """
+        if self.lexical_index is None:
+            return None, [], None
+        reference = self.lexical_index.detect_reference(user_query)
+        # Madde türü belirsizse ("geçici maddelerde 3 üncü madde") doğrudan çözülmez
+        if len(reference.belgeler) == 1 and reference.maddeler and not reference.madde_turu_belirsiz:
+            chunks = self.lexical_index.article_chunks(reference.belgeler[0], reference.maddeler)
+            if chunks:
+                seeds = [{"chunk_id": chunk["chunk_id"], "score": 1.0} for chunk in chunks]
+                maddeler = ", ".join(f"{madde_turu} {madde_no}" for madde_turu, madde_no in reference.maddeler)
+                return seeds, [], f"'{reference.belgeler[0]}' maddeler [{maddeler}]"
+        lexical = self.lexical_index.search(user_query, LEXICAL_TOP_K, filters)
+        return None, [chunk_id for chunk_id, _ in lexical], None
+
+    @staticmethod
+    def _scope(filters: RetrievalFilter) -> tuple:
+        return bool(filters.kurumlar), bool(filters.turler)
+
+    def _vector_seeds(self, tx, query_embedding: list, k: int,
+                      filters: Optional[RetrievalFilter] = None) -> list[dict]:
+        if self.backend == "local":
+            mask = self.vector_index.filter_mask(filters) if filters else None
+            return [
+                {"chunk_id": chunk_id, "score": score}
+                for chunk_id, score in self.vector_index.search(query_embedding, k, mask)
+            ]
+        if filters:
+            return [record.data() for record in tx.run(
+                SEED_SCOPED_IDS_CYPHER[self._scope(filters)], k=k, embedding=query_embedding,
+                kurumlar=list(filters.kurumlar), turler=list(filters.turler)
+            )]
+        return [record.data() for record in tx.run(SEED_VECTOR_IDS_CYPHER, k=k, embedding=query_embedding)]
+
+    def _read_context(self, tx, query_embedding: Optional[list], k: int,
+                      seeds: Optional[list[dict]] = None, lexical_ids: Optional[list[str]] = None,
+                      filters: Optional[RetrievalFilter] = None,
+                      scope_boost: Optional[RetrievalFilter] = None) -> list[dict]:
+        filtered = bool(filters)
+        if seeds is None and (lexical_ids or scope_boost):
+            with telemetry.span("vector_search", backend=self.backend, k=k, filtre=filtered,
+                                kapsam_onceligi=bool(scope_boost)):
+                rankings = [[seed["chunk_id"] for seed in self._vector_seeds(tx, query_embedding, k, filters)]]
+                if scope_boost:
+                    # Kapsamdaki en yakın chunk'lar ayrı bir sıralama olarak eklenir: her iki
+                    # listede olanlar öne çıkar, kapsam dışındaki güçlü sonuçlar da kalır
+                    rankings.append([seed["chunk_id"]
+                                     for seed in self._vector_seeds(tx, query_embedding, k, scope_boost)])
+            if lexical_ids:
+                rankings.append(lexical_ids)
+            fused = reciprocal_rank_fusion(rankings, k=RRF_K)[:k]
+            seeds = [{"chunk_id": chunk_id, "score": score} for chunk_id, score in fused]
+        elif seeds is None and self.backend == "local":
+            with telemetry.span("vector_search", backend=self.backend, k=k, filtre=filtered):
+                seeds = self._vector_seeds(tx, query_embedding, k, filters)
+
+        if seeds is not None:
+            with telemetry.span("graph_traversal", tohum=len(seeds)):
+                return [record.data() for record in tx.run(RETRIEVE_CONTEXT_BY_IDS_CYPHER, k=k, seeds=seeds)]
+        # Vektör araması ve gezinti tek sorguda: ayrı ölçülemez
+        with telemetry.span("vector_search_traversal", backend=self.backend, k=k, filtre=filtered):
+            if filtered:
+                return [record.data() for record in tx.run(
+                    RETRIEVE_CONTEXT_SCOPED_CYPHER[self._scope(filters)], k=k, embedding=query_embedding,
+                    kurumlar=list(filters.kurumlar), turler=list(filters.turler)
+                )]
+            return [record.data() for record in tx.run(RETRIEVE_CONTEXT_CYPHER, k=k, embedding=query_embedding)]
+
+    def retrieve(self, query_embedding: Optional[list], k_seed: int = 5,
+                 seeds: Optional[list[dict]] = None, lexical_ids: Optional[list[str]] = None,
+                 filters: Optional[RetrievalFilter] = None, scope_boost: Optional[RetrievalFilter] = None):
+        """
+        Tohum chunk'ları, 1. seviye atıfları ve atıf yapılan madde metinlerini
+        tek bir okuma transaction'ında (tek gidiş-dönüş) getirir. 'local'
+        arka uçta tohumlar süreç içi vektör indexinden bulunur.
+
+        'seeds' verilirse (sözcüksel kesin eşleşme) vektör araması yapılmaz.
+        'lexical_ids' verilirse vektör tohumları bu BM25 sıralamasıyla RRF ile
+        birleştirilir (Neo4j arka ucunda aynı transaction'da iki sorgu).
+        'filters' verilirse vektör tohumları yalnızca filtreye uyan chunk'lar
+        arasında aranır (Neo4j'de index ile daraltılmış tam arama, 'local'
+        arka uçta maske); atıf gezintisi kapsam dışındaki belgelere de gider.
+        'scope_boost' verilirse kapsam filtre değil önceliktir: kapsamdaki ve
+        tüm belgelerdeki vektör sonuçları RRF ile birleştirilir.
+
+        Dönüş: (tohumlar, ilişkiler)
+          tohumlar:  [{chunk_id, metin, kaynak_belge, kaynak_kurum, score}]
+          ilişkiler: [{kaynak_belge_ati_yapan, kaynak_chunk_id, kaynak_score,
+                       hedef_belge, hedef_maddeler, hedef_chunklar}]
+        Her chunk bağlamda yalnızca bir kez yer alır: bir tohum chunk'ı atıf hedefi
+        olarak tekrar eklenmez, aynı hedef chunk birden çok ilişkide tekrar etmez.
+        Her hedef chunk hangi ilişkiden geldiğini ('hedef_belge') korur.
+        """
+        with self.driver.session(database=NEO4J_DATABASE) as session:
+            k = max(k_seed, len(seeds)) if seeds else k_seed
+            records = session.execute_read(self._read_context, query_embedding, k, seeds, lexical_ids,
+                                           filters, scope_boost)
+
+        seeds = []
+        relations = []
+        seen_chunk_ids = set()
+        for record in records:
+            seeds.append({key: record[key] for key in ("chunk_id", "metin", "kaynak_belge", "kaynak_kurum", "score")})
+            seen_chunk_ids.add(record["chunk_id"])
+            if self.neighbor_cache is not None:
+                # Tohumların komşuları zaten okundu: çok atlamalı gezintinin ilk atlaması sorgusuz
+                self.neighbor_cache.put(record["chunk_id"], [
+                    dict(chunk, kaynak_belge=atif["hedef_belge"])
+                    for atif in record["atiflar"] for chunk in atif["hedef_chunklar"]
+                ])
+
+        for record in records:
+            for atif in record["atiflar"]:
+                hedef_maddeler = atif["hedef_maddeler"] or []
+                hedef_chunklar = []
+                for chunk in self._select_article_chunks(hedef_maddeler, atif["hedef_chunklar"],
+                                                         atif.get("hedef_madde_turleri")):
+                    if chunk["chunk_id"] in seen_chunk_ids:
+                        continue
+                    seen_chunk_ids.add(chunk["chunk_id"])
+                    hedef_chunklar.append(chunk)
+                relations.append({
+                    "kaynak_belge_ati_yapan": record["kaynak_belge"],
+                    "kaynak_chunk_id": record["chunk_id"],
+                    "kaynak_score": record["score"],
+                    "hedef_belge": atif["hedef_belge"],
+                    "hedef_maddeler": hedef_maddeler,
+                    "hedef_chunklar": hedef_chunklar
+                })
+        telemetry.inc("retrieved_chunks_total", len(seeds), tur="tohum")
+        telemetry.inc("retrieved_chunks_total", sum(len(r["hedef_chunklar"]) for r in relations), tur="atif")
+        telemetry.inc("citations_followed_total", len(relations))
+        return seeds, relations
+
+    @staticmethod
+    def _read_neighbors(tx, chunk_ids: list[str]) -> list[dict]:
+        return [record.data() for record in tx.run(NEIGHBORS_CYPHER, chunk_ids=chunk_ids)]
+
+    def neighbor_lists(self, chunk_ids: list[str]) -> dict:
+        """Chunk'ların atıf komşu listeleri; önbellekte olmayanlar tek sorguda okunup saklanır."""
+        found, missing = self.neighbor_cache.get_many(chunk_ids)
+        telemetry.inc("neighbor_cache_hits_total", len(found))
+        if missing:
+            telemetry.inc("neighbor_cache_misses_total", len(missing))
+            with self.driver.session(database=NEO4J_DATABASE) as session:
+                records = session.execute_read(self._read_neighbors, missing)
+            fetched = {record["chunk_id"]: record["komsular"] for record in records}
+            for chunk_id in missing:
+                # Silinmiş chunk'lar boş listeyle saklanır (nesil değişince önbellek zaten boşalır)
+                found[chunk_id] = self.neighbor_cache.put(chunk_id, fetched.get(chunk_id, []))
+        return found
+
+    def expand_multihop(self, seeds: list[dict], relations: list[dict], hops: int = PPR_HOPS,
+                        fanout=PPR_FANOUT, top_k: int = PPR_TOP_K) -> list[dict]:
+        """
+        Tohumlardan atıf kenarlarını 'hops' atlamaya kadar (atlama başına 'fanout'
+        bütçesiyle) izler, adayları tohum skorlarıyla kişiselleştirilmiş PageRank
+        ile puanlar ve en iyi 'top_k' atıf chunk'ını bağlama alır.
+
+        1. seviye ilişkiler korunur, yalnızca seçilen chunk'ları kalır. Daha derin
+        chunk'lar atıf yapan chunk ve hedef belgeye göre gruplanıp yeni ilişkiler
+        olarak eklenir; öncelikleri (kaynak_score) kökteki tohumun skoru ve atlama
+        sayısıyla azalır.
+        """
+        seed_scores = {seed["chunk_id"]: seed["score"] or 0.0 for seed in seeds}
+        expansion = expand_citations(seed_scores, self.neighbor_lists, hops, fanout)
+        selected = rank_citations(expansion, seed_scores, top_k, PPR_ALPHA, PPR_ITERATIONS)
+        order = {chunk_id: i for i, chunk_id in enumerate(selected)}
+
+        multihop_relations = []
+        placed = set()
+        for relation in relations:
+            kept = sorted((chunk for chunk in relation["hedef_chunklar"] if chunk["chunk_id"] in order),
+                          key=lambda chunk: order[chunk["chunk_id"]])
+            placed.update(chunk["chunk_id"] for chunk in kept)
+            multihop_relations.append(dict(relation, hedef_chunklar=kept))
+
+        seed_docs = {seed["chunk_id"]: seed["kaynak_belge"] for seed in seeds}
+
+        def root_score(chunk_id: str) -> float:
+            while chunk_id in expansion.parents:
+                chunk_id = expansion.parents[chunk_id]
+            return seed_scores.get(chunk_id, 0.0)
+
+        groups = {}
+        for chunk_id in selected:
+            if chunk_id in placed:
+                continue
+            parent = expansion.parents[chunk_id]
+            chunk = expansion.nodes[chunk_id]
+            key = (parent, chunk["kaynak_belge"])
+            if key not in groups:
+                groups[key] = {
+                    "kaynak_belge_ati_yapan": seed_docs.get(parent) or expansion.nodes[parent]["kaynak_belge"],
+                    "kaynak_chunk_id": parent,
+                    "kaynak_score": root_score(parent) * self.context_builder.distance_decay ** expansion.hops[parent],
+                    "hedef_belge": chunk["kaynak_belge"],
+                    "hedef_maddeler": [],
+                    "hedef_chunklar": [],
+                }
+                multihop_relations.append(groups[key])
+            relation = groups[key]
+            if chunk["madde_no"] is not None and chunk["madde_no"] not in relation["hedef_maddeler"]:
+                relation["hedef_maddeler"].append(chunk["madde_no"])
+            relation["hedef_chunklar"].append(chunk)
+        telemetry.inc("multihop_chunks_total", len(selected))
+        return multihop_relations
+
+    def _build_context(self, retrieved_chunks: list[dict], graph_relations: list[dict]) -> ContextResult:
+        """Tekilleştirilmiş, önceliklendirilmiş ve token bütçesine sığdırılmış bağlamı kurar."""
+        return self.context_builder.build(retrieved_chunks, graph_relations)
+
+    def _cached_answer(self, prepared: PreparedQuery, query_embedding: Optional[list], start: float) -> bool:
+        """Önbellekte soruya (birebir ya da anlamca) karşılık gelen bir cevap varsa 'prepared'a işler."""
+        if self.answer_cache is None:
+            return False
+        if query_embedding is None:
+            answer, similarity = self.answer_cache.lookup_text(prepared.soru, prepared.kapsam), 1.0
+        else:
+            hit = self.answer_cache.lookup(query_embedding, prepared.kapsam)
+            answer, similarity = hit if hit else (None, 0.0)
+        if answer is None:
+            return False
+        telemetry.inc("answer_cache_hits_total", tur="birebir" if query_embedding is None else "anlamsal")
+        prepared.cached_answer, prepared.similarity = answer, similarity
+        prepared.timings["answer_cache"] = time.perf_counter() - start
+        return True
+
+    def prepare(self, user_query: str, filters: Optional[RetrievalFilter] = None) -> PreparedQuery:
+        """
+        Soruyu cevap üretimine hazırlar (ekrana bir şey yazmaz): önbellek,
+        sözcüksel yönlendirme, embedding ve graf gezintisi. LLM çağrılmaz;
+        cevap 'stream_answer' ile üretilir.
+
+        Açık 'filters' (boş da olsa) tohum aramasına olduğu gibi uygulanır.
+        Verilmezse sorguda anılan kurum/tür ('infer_filters') filtre olarak
+        değil öncelik olarak kullanılır: kapsamdaki sonuçlar tüm belgelerdeki
+        sonuçlarla birleştirilip öne çıkarılır, kapsam dışı sonuçlar kaybolmaz.
+        Cevap önbelleği yalnızca aynı kapsamdaki ve aynı belge/madde
+        numaralarını anan sorular arasında paylaşılır ("14. madde" ile
+        "15. madde" sorusu ne kadar benzer olsa da ayrı cevaplardır).
+        """
+        with telemetry.span("query_prepare") as span:
+            prepared = self._prepare(user_query, filters)
+            span.set(onbellek=prepared.cached_answer is not None, hata=prepared.hata,
+                     tohum=len(prepared.seeds), iliski=len(prepared.relations),
+                     filtre=prepared.filtre.describe() if prepared.filtre else None)
+        if self.answer_cache is not None and prepared.cached_answer is None:
+            telemetry.inc("answer_cache_misses_total")
+        return prepared
+
+    def _prepare(self, user_query: str, filters: Optional[RetrievalFilter] = None) -> PreparedQuery:
+        self._refresh_indexes()
+        prepared = PreparedQuery(soru=user_query, acik_filtre=filters is not None)
+        timings = prepared.timings
+        inferred = infer_filter(user_query) if filters is None and self.infer_filters else None
+        kapsam = filters or inferred
+        prepared.kapsam = "; ".join(part for part in (kapsam.describe() if kapsam else "",
+                                                      parse_reference(user_query).describe()) if part)
+
+        request_start = time.perf_counter()
+        if self._cached_answer(prepared, None, request_start):
+            return prepared
+
+        # --- 0. Adım: Sözcüksel yönlendirme (açık belge/madde atıfları) ---
+        start = time.perf_counter()
+        with telemetry.span("routing") as span:
+            seeds, lexical_ids, prepared.dogrudan_atif = self.route_query(user_query, filters)
+            span.set(dogrudan_atif=seeds is not None, sozcuksel=len(lexical_ids))
+        timings["routing"] = time.perf_counter() - start
+        # Açıkça anılan maddeler doğrudan çözüldüyse filtre gereksizdir
+        prepared.filtre = filters if filters and seeds is None else None
+        prepared.kapsam_onceligi = inferred if inferred and seeds is None else None
+        if prepared.filtre or prepared.kapsam_onceligi:
+            telemetry.inc("scoped_queries_total", kaynak="acik" if prepared.filtre else "cikarim")
+
+        if seeds is None:
+            start = time.perf_counter()
+            prepared.query_embedding = self.embedder.get_embedding(user_query)
+            timings["embedding"] = time.perf_counter() - start
+            if not prepared.query_embedding:
+                prepared.hata = "Sorgunuz için embedding oluşturulamadı."
+                return prepared
+            if self._cached_answer(prepared, prepared.query_embedding, request_start):
+                return prepared
+
+        # --- 1-4. Adımlar: Vektör Arama + Grafik Gezintisi + Derin Gezinti (tek sorgu) ---
+        start = time.perf_counter()
+        with telemetry.span("retrieval"):
+            prepared.seeds, prepared.relations = self.retrieve(
+                prepared.query_embedding, k_seed=5, seeds=seeds, lexical_ids=lexical_ids,
+                filters=prepared.filtre, scope_boost=prepared.kapsam_onceligi
             )
-            
+        timings["retrieval"] = time.perf_counter() - start
+
+        if not prepared.seeds:
+            prepared.hata = "İlgili bilgi bulunamadı."
+            return prepared
+
+        if self.retrieval_mode == "ppr":
+            start = time.perf_counter()
+            with telemetry.span("multihop") as span:
+                prepared.relations = self.expand_multihop(prepared.seeds, prepared.relations)
+                span.set(iliski=len(prepared.relations),
+                         chunk=sum(len(r["hedef_chunklar"]) for r in prepared.relations))
+            timings["multihop"] = time.perf_counter() - start
+
+        with telemetry.span("context_build") as span:
+            context = self._build_context(prepared.seeds, prepared.relations)
+            span.set(**context.summary())
+        prepared.context, prepared.context_stats = context.text, context.summary()
+        prepared.context_chunk_ids = set(context.kept_chunk_ids)
+        return prepared
+
+    def stream_answer(self, prepared: PreparedQuery) -> Iterator[str]:
+        """
+        Hazırlanmış bağlamla LLM cevabını parça parça (token) üretir.
+        Akış tamamlanınca süre 'prepared.timings'e yazılır ve cevap önbelleğe alınır.
+        LLM hataları çağırana iletilir.
+        """
+        if prepared.cached_answer is not None:
+            yield prepared.cached_answer
+            return
+
+        # --- 5. Adım: LLM'e Gönderme ---
+        final_prompt = f"BAĞLAM:\n{prepared.context}\n\nSORU: {prepared.soru}"
+        start = time.perf_counter()
+        response_stream = self.client.chat(
+            model=LLM_MODEL,
+            messages=[
+                {"role": "system", "content": ANSWER_SYSTEM_PROMPT},
+                {"role": "user", "content": final_prompt}
+            ],
+            stream=True
+        )
+        full_response = ""
+        token_count = 0
+        for chunk in response_stream:
+            content = chunk['message']['content']
+            if token_count == 0:
+                telemetry.observe("llm_ttft_seconds", time.perf_counter() - start)
+            token_count += 1
+            full_response += content
+            yield content
+        prepared.timings["generation"] = time.perf_counter() - start
+        telemetry.inc("llm_tokens_total", token_count)
+        telemetry.record_span("llm_generation", prepared.timings["generation"], token=token_count)
+        if self.answer_cache is not None and full_response.strip():
+            self.answer_cache.put(prepared.soru, prepared.query_embedding, full_response, prepared.kapsam)
+
+    def get_response(self, user_query: str, filters: Optional[RetrievalFilter] = None):
+        print(f"Sorgu alindi: {user_query}")
+        prepared = self.prepare(user_query, filters)
+        self.last_timings = prepared.timings
+
+        if prepared.cached_answer is not None:
+            print(f"[Önbellek] Cevap önbellekten döndü (benzerlik {prepared.similarity:.3f}, "
+                  f"{prepared.timings['answer_cache'] * 1000:.1f} ms)")
+            print("\n--- Cevap ---")
+            print(prepared.cached_answer)
+            print("-----------")
+            return prepared.cached_answer
+        if prepared.hata:
+            return prepared.hata
+
+        if prepared.dogrudan_atif:
+            print(f"   [~] Doğrudan atıf: {prepared.dogrudan_atif}")
+        if prepared.filtre:
+            print(f"   [~] Kapsam: {prepared.filtre.describe()}")
+        elif prepared.kapsam_onceligi:
+            print(f"   [~] Öncelikli kapsam: {prepared.kapsam_onceligi.describe()}")
+        for relation in prepared.relations:
+            if relation['hedef_maddeler'] and relation['hedef_chunklar']:
+                print(f"      [~] Derin Gezinti BAŞARILI: '{relation['hedef_belge']}' içinden "
+                      f"{len(relation['hedef_chunklar'])} chunk bulundu.")
+
+        stats = prepared.context_stats
+        print(f"   [~] Bağlam: {stats['kullanilan_token']}/{stats['butce']} token, "
+              f"{stats['tutulan_chunk']} chunk"
+              + (f" ({stats['cikarilan_chunk']} chunk / ~{stats['cikarilan_token']} token bütçe nedeniyle çıkarıldı)"
+                 if stats['cikarilan_chunk'] else ""))
+
+        try:
             print("\n--- Cevap ---")
             full_response = ""
-            for chunk in response_stream:
-                content = chunk['message']['content']
+            for content in self.stream_answer(prepared):
                 print(content, end="", flush=True)
                 full_response += content
             print("\n-----------")
+            print("[Süreler] " + ", ".join(f"{name}: {sec * 1000:.0f} ms" for name, sec in prepared.timings.items()))
             return full_response
             
         except Exception as e:
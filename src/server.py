@@ -0,0 +1,288 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from .config import (
+    NEO4J_DATABASE, SERVER_HOST, SERVER_PORT, MAX_CONCURRENT_GENERATIONS,
+    SERVER_WORKER_THREADS, SERVER_MAX_REQUEST_BYTES
+)
+from . import telemetry
+from .retriever import ChatRetriever, PreparedQuery
+from .retrieval_filter import RetrievalFilter, make_filter
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 503: "Service Unavailable"}
+_STREAM_END = object()
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryServer:
+    """
+    asyncio tabanlı, bağımlılıksız HTTP sorgu servisi.
+
+    Tüm istekler tek bir ChatRetriever'ı (dolayısıyla tek Neo4j driver'ı ve tek
+    Ollama istemcisini) paylaşır. Bloklayan çağrılar (embedding, Neo4j, LLM akışı)
+    sınırlı bir iş parçacığı havuzunda çalışır; aynı anda çalışan cevap üretimi
+    sayısı 'max_generations' ile sınırlanır, fazlası sırada bekler.
+
+    Uç noktalar:
+      GET  /health            -> Süreç ayakta mı
+      GET  /ready             -> Neo4j ve Ollama erişilebilir mi
+      GET  /metrics           -> Prometheus metinleri (GRAPHRAG_TELEMETRY=1 ile dolar)
+      POST /ask {"soru": ...} -> Server-Sent Events: 'sources', 'token'..., 'done' (veya 'error')
+      GET  /ask?q=...         -> Aynısı (tarayıcı EventSource için)
+    """
+    def __init__(self, retriever: ChatRetriever, host: str = SERVER_HOST, port: int = SERVER_PORT,
+                 max_generations: int = MAX_CONCURRENT_GENERATIONS,
+                 worker_threads: int = SERVER_WORKER_THREADS):
+        self.retriever = retriever
+        self.host = host
+        self.port = port
+        self.max_generations = max(1, max_generations)
+        self.executor = ThreadPoolExecutor(max_workers=max(2, worker_threads), thread_name_prefix="sorgu")
+        self._generation_slots: Optional[asyncio.Semaphore] = None
+        self.active_requests = 0
+        self.waiting_generations = 0
+
+    # --- HTTP yardımcıları ---
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            raise HttpError(400, "Boş istek")
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Geçersiz istek satırı")
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length") or 0)
+        if length > SERVER_MAX_REQUEST_BYTES:
+            raise HttpError(413, "İstek gövdesi çok büyük")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def _send_text(writer: asyncio.StreamWriter, status: int, text: str, content_type: str):
+        body = text.encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def _send_event(writer: asyncio.StreamWriter, event: str, data: dict):
+        payload = json.dumps(data, ensure_ascii=False)
+        writer.write(f"event: {event}\ndata: {payload}\n\n".encode("utf-8"))
+        await writer.drain()
+
+    # --- Uç noktalar ---
+
+    def _check_ready(self) -> dict:
+        durum = {}
+        try:
+            self.retriever.driver.verify_connectivity(database=NEO4J_DATABASE)
+            durum["neo4j"] = "ok"
+        except Exception as e:
+            durum["neo4j"] = f"hata: {e}"
+        try:
+            self.retriever.client.list()
+            durum["ollama"] = "ok"
+        except Exception as e:
+            durum["ollama"] = f"hata: {e}"
+        return durum
+
+    async def _ready(self, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        durum = await loop.run_in_executor(self.executor, self._check_ready)
+        hazir = all(value == "ok" for value in durum.values())
+        await self._send_json(writer, 200 if hazir else 503, {"hazir": hazir, **durum})
+
+    @staticmethod
+    def _parse_question(method: str, target: str, body: bytes) -> Tuple[str, Optional[RetrievalFilter]]:
+        """
+        Soruyu ve isteğe bağlı kurum/tür filtresini okur: GET '?q=...&kurum=TEİAŞ&tur=Kanun'
+        (tekrarlanabilir), POST {"soru": ..., "kurum": "TEİAŞ" | [...], "tur": ...}.
+        Filtre verilmezse None döner (sorgudan çıkarılır).
+        """
+        if method == "GET":
+            params = parse_qs(urlsplit(target).query)
+            soru = (params.get("q") or [""])[0]
+            kurum, tur = params.get("kurum"), params.get("tur")
+        elif method == "POST":
+            try:
+                payload = json.loads(body.decode("utf-8") or "{}")
+                soru, kurum, tur = payload.get("soru", ""), payload.get("kurum"), payload.get("tur")
+            except (ValueError, AttributeError):
+                raise HttpError(400, "Gövde {\"soru\": \"...\"} biçiminde JSON olmalı")
+        else:
+            raise HttpError(405, "Yalnızca GET ve POST desteklenir")
+        if not isinstance(soru, str) or not soru.strip():
+            raise HttpError(400, "Soru boş olamaz")
+        for value in (kurum, tur):
+            if value is not None and not (isinstance(value, str)
+                                          or (isinstance(value, list) and all(isinstance(v, str) for v in value))):
+                raise HttpError(400, "'kurum' ve 'tur' metin ya da metin listesi olmalı")
+        filtre = make_filter(kurum, tur) if kurum is not None or tur is not None else None
+        return soru.strip(), filtre
+
+    def _produce_tokens(self, prepared: PreparedQuery, loop: asyncio.AbstractEventLoop,
+                        tokens: asyncio.Queue, cancelled: threading.Event):
+        """İş parçacığında LLM akışını okur ve token'ları olay döngüsündeki kuyruğa aktarır."""
+        try:
+            stream = self.retriever.stream_answer(prepared)
+            try:
+                for content in stream:
+                    if cancelled.is_set():
+                        break
+                    loop.call_soon_threadsafe(tokens.put_nowait, content)
+            finally:
+                stream.close()  # İstemci koptuysa Ollama akışını da kapatır
+        except Exception as e:
+            loop.call_soon_threadsafe(tokens.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(tokens.put_nowait, _STREAM_END)
+
+    async def _ask(self, writer: asyncio.StreamWriter, soru: str, filtre: Optional[RetrievalFilter] = None):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream; charset=utf-8\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        await writer.drain()
+
+        try:
+            prepared = await loop.run_in_executor(self.executor, self.retriever.prepare, soru, filtre)
+        except Exception as e:
+            print(f"[!!!] Bağlam hazırlanırken hata: {e}")
+            await self._send_event(writer, "error", {"mesaj": f"Bağlam hazırlanırken hata: {e}"})
+            return
+        if prepared.hata:
+            await self._send_event(writer, "error", {"mesaj": prepared.hata})
+            return
+        await self._send_event(writer, "sources", {
+            "onbellek": prepared.cached_answer is not None,
+            "dogrudan_atif": prepared.dogrudan_atif,
+            "filtre": prepared.filtre.to_dict() if prepared.filtre else None,
+            "kapsam_onceligi": prepared.kapsam_onceligi.to_dict() if prepared.kapsam_onceligi else None,
+            "kaynaklar": prepared.sources(),
+        })
+
+        cancelled = threading.Event()
+        tokens: asyncio.Queue = asyncio.Queue()
+        # Önbellekten dönen cevaplar LLM'e gitmediği için üretim sınırına takılmaz
+        slot = self._generation_slots if prepared.cached_answer is None else None
+        if slot is not None:
+            self.waiting_generations += 1
+            wait_start = time.perf_counter()
+            try:
+                await slot.acquire()
+            finally:
+                self.waiting_generations -= 1
+            telemetry.observe("generation_queue_seconds", time.perf_counter() - wait_start)
+        try:
+            producer = loop.run_in_executor(self.executor, self._produce_tokens, prepared, loop, tokens, cancelled)
+            try:
+                while True:
+                    item = await tokens.get()
+                    if item is _STREAM_END:
+                        break
+                    if isinstance(item, Exception):
+                        await self._send_event(writer, "error", {"mesaj": f"LLM ile cevap üretirken hata: {item}"})
+                        return
+                    await self._send_event(writer, "token", {"metin": item})
+            finally:
+                cancelled.set()
+                await producer
+        finally:
+            if slot is not None:
+                slot.release()
+
+        prepared.timings["toplam"] = time.perf_counter() - start
+        telemetry.observe("request_seconds", prepared.timings["toplam"],
+                          onbellek=prepared.cached_answer is not None)
+        await self._send_event(writer, "done", {
+            "sureler_ms": {name: round(sec * 1000, 1) for name, sec in prepared.timings.items()},
+            "baglam": prepared.context_stats,
+        })
+        print(f"[+] /ask tamamlandı ({prepared.timings['toplam'] * 1000:.0f} ms"
+              f"{', önbellek' if prepared.cached_answer is not None else ''}): {soru[:80]}")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.active_requests += 1
+        try:
+            try:
+                method, target, _, body = await self._read_request(reader)
+                path = urlsplit(target).path
+                if path == "/health":
+                    await self._send_json(writer, 200, {
+                        "durum": "ok",
+                        "aktif_istek": self.active_requests,
+                        "bekleyen_uretim": self.waiting_generations,
+                    })
+                elif path == "/ready":
+                    await self._ready(writer)
+                elif path == "/metrics":
+                    await self._send_text(writer, 200, telemetry.render_prometheus(),
+                                          "text/plain; version=0.0.4; charset=utf-8")
+                elif path == "/ask":
+                    await self._ask(writer, *self._parse_question(method, target, body))
+                else:
+                    raise HttpError(404, f"Bilinmeyen yol: {path}")
+            except HttpError as e:
+                await self._send_json(writer, e.status, {"hata": str(e)})
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass  # İstemci bağlantıyı kapattı
+            except Exception as e:
+                print(f"[!!!] İstek işlenirken hata: {e}")
+        finally:
+            self.active_requests -= 1
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def serve(self):
+        self._generation_slots = asyncio.Semaphore(self.max_generations)
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"Sorgu servisi http://{self.host}:{self.port} adresinde dinliyor "
+              f"(eşzamanlı üretim sınırı: {self.max_generations}).")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,273 @@
+"""
+Hafif izleme katmanı: zamanlanmış aşamalar (span), sayaçlar ve gecikme histogramları.
+
+    from . import telemetry
+    with telemetry.span("embedding", metin_sayisi=3):
+        ...
+    telemetry.inc("chunks_written_total", 12)
+    telemetry.observe("llm_ttft_seconds", 0.42)
+
+Açıkken her span bitişinde izleme dosyasına (JSONL) bir satır yazılır ve
+süresi 'graphrag_stage_seconds{stage=...}' histogramına eklenir. Metrikler
+Prometheus metin biçiminde 'render_prometheus()' ile alınır (HTTP servisinin
+/metrics uç noktası) ve 'write_metrics()' ile dosyaya yazılır (süreç
+sonunda otomatik).
+
+Kapalıyken 'span' paylaşılan boş bir nesne döndürür, 'inc'/'observe' tek bir
+bool kontrolünden sonra döner; ölçülen koda eklenen maliyet ihmal edilebilir.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from .config import TELEMETRY_ENABLED, TELEMETRY_TRACE_PATH, TELEMETRY_METRICS_PATH
+
+METRIC_PREFIX = "graphrag_"
+# Saniye cinsinden histogram sınırları (ms düzeyindeki önbellek isabetinden dakikalık LLM üretimine)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # Son kova: +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class _State:
+    def __init__(self):
+        self.enabled = False
+        self.trace_path: Optional[str] = None
+        self.metrics_path: Optional[str] = None
+        self.lock = threading.Lock()
+        self.trace_file = None
+        self.counters: Dict[str, Dict[_LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[_LabelKey, _Histogram]] = {}
+
+
+_state = _State()
+_current_span: ContextVar[Optional["_Span"]] = ContextVar("graphrag_span", default=None)
+
+
+def _labels(labels: dict) -> _LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def configure(enabled: bool = TELEMETRY_ENABLED, trace_path: Optional[str] = TELEMETRY_TRACE_PATH,
+              metrics_path: Optional[str] = TELEMETRY_METRICS_PATH):
+    """İzlemeyi açar/kapatır. 'trace_path' None ise span'lar yalnızca histogramlara işlenir."""
+    with _state.lock:
+        if _state.trace_file is not None:
+            _state.trace_file.close()
+            _state.trace_file = None
+        _state.trace_path = trace_path
+        _state.metrics_path = metrics_path
+        if enabled and trace_path:
+            directory = os.path.dirname(trace_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            _state.trace_file = open(trace_path, "a", encoding="utf-8", buffering=1)
+        _state.enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+# --- Metrikler ---
+
+def inc(name: str, value: float = 1, **labels):
+    """Sayaç artırır (Prometheus 'counter')."""
+    if not _state.enabled:
+        return
+    key = _labels(labels)
+    with _state.lock:
+        series = _state.counters.setdefault(name, {})
+        series[key] = series.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, **labels):
+    """Gecikme histogramına bir ölçüm ekler (saniye)."""
+    if not _state.enabled:
+        return
+    key = _labels(labels)
+    with _state.lock:
+        series = _state.histograms.setdefault(name, {})
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = _Histogram()
+        histogram.observe(seconds)
+
+
+def reset():
+    with _state.lock:
+        _state.counters.clear()
+        _state.histograms.clear()
+
+
+# --- Span'lar ---
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "span_id", "trace_id", "parent_id", "start", "wall_start", "_token")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Span'e öznitelik ekler (ör. işlenen chunk sayısı)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.span_id = uuid.uuid4().hex[:16]
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.parent_id = parent.span_id if parent else None
+        self._token = _current_span.set(self)
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        _current_span.reset(self._token)
+        observe("stage_seconds", elapsed, stage=self.name)
+        if exc_type is not None:
+            inc("stage_errors_total", stage=self.name)
+        if _state.trace_file is not None:
+            record = {
+                "ts": self.wall_start, "span": self.name, "ms": round(elapsed * 1000, 3),
+                "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            }
+            if exc_type is not None:
+                record["hata"] = f"{exc_type.__name__}: {exc}"
+            if self.attrs:
+                record["attrs"] = self.attrs
+            _write_trace(record)
+        return False
+
+
+def _write_trace(record: dict):
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _state.lock:
+        if _state.trace_file is not None:
+            _state.trace_file.write(line + "\n")
+
+
+def span(name: str, **attrs):
+    """Bir aşamayı zamanlar; iç içe span'ler aynı trace_id'yi paylaşır."""
+    if not _state.enabled:
+        return _NOOP_SPAN
+    return _Span(name, attrs)
+
+
+def record_span(name: str, seconds: float, **attrs):
+    """
+    Süresi zaten ölçülmüş bir aşamayı span olarak kaydeder. Üreteçler (generator)
+    gibi 'with' bloğunun yield'ler arasında askıda kalacağı yerler içindir.
+    """
+    if not _state.enabled:
+        return
+    observe("stage_seconds", seconds, stage=name)
+    if _state.trace_file is not None:
+        parent = _current_span.get()
+        record = {
+            "ts": time.time() - seconds, "span": name, "ms": round(seconds * 1000, 3),
+            "trace_id": parent.trace_id if parent else uuid.uuid4().hex,
+            "span_id": uuid.uuid4().hex[:16], "parent_id": parent.span_id if parent else None,
+        }
+        if attrs:
+            record["attrs"] = attrs
+        _write_trace(record)
+
+
+# --- Dışa aktarma ---
+
+def _format_labels(key: _LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (f'{name}="{value.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for name, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_prometheus() -> str:
+    """Tüm metrikleri Prometheus metin biçiminde döndürür."""
+    lines = []
+    with _state.lock:
+        for name, series in sorted(_state.counters.items()):
+            metric = METRIC_PREFIX + name
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{metric}{_format_labels(key)} {value:g}")
+        for name, series in sorted(_state.histograms.items()):
+            metric = METRIC_PREFIX + name
+            lines.append(f"# TYPE {metric} histogram")
+            for key, histogram in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{metric}_bucket{_format_labels(key, ('le', le))} {cumulative}")
+                lines.append(f"{metric}_sum{_format_labels(key)} {histogram.total:.6f}")
+                lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path: Optional[str] = None):
+    """Metrikleri Prometheus metin dosyasına yazar (node_exporter textfile toplayıcısı için)."""
+    path = path or _state.metrics_path
+    if not _state.enabled or not path:
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)  # Okuyucular yarım yazılmış dosya görmesin
+
+
+def _shutdown():
+    try:
+        write_metrics()
+    finally:
+        with _state.lock:
+            if _state.trace_file is not None:
+                _state.trace_file.close()
+                _state.trace_file = None
+
+
+atexit.register(_shutdown)
+configure()
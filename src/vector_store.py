@@ -0,0 +1,233 @@
+import os
+import json
+import numpy as np
+from typing import Callable, List, Optional, Sequence, Tuple
+from .config import NEO4J_DATABASE, VECTOR_STORE_PATH, VECTOR_STORE_QUANTIZE, VECTOR_STORE_RESCORE_FACTOR
+from .graph_builder import read_graph_generation
+from .retrieval_filter import RetrievalFilter
+
+_VECTORS_FILE = "vectors.f32"
+_QUANTIZED_FILE = "vectors.i8"
+_SCALES_FILE = "scales.f32"
+_META_FILE = "meta.json"
+_SEARCH_BLOCK_ROWS = 65536  # int8 taramasında bir seferde float32'ye açılan satır sayısı
+
+EXPORT_EMBEDDINGS_CYPHER = """
+MATCH (c:CHUNK) WHERE c.embedding IS NOT NULL
+RETURN elementId(c) AS chunk_id, c.embedding AS embedding, c.kurum AS kurum, c.tur AS tur
+"""
+
+
+def _write_atomic(path: str, write: Callable[[str], None]):
+    """'write' ile geçici dosyaya yazar ve hedefin yerine koyar (okuyucular yarım dosya görmez)."""
+    tmp_path = path + ".tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class LocalVectorIndex:
+    """
+    CHUNK embedding'leri için süreç içi (in-process) vektör indexi.
+
+    Vektörler normalize edilmiş float32 matris olarak diske yazılır ve
+    memory-map ile açılır; arama NumPy ile tam (exact) kosinüs benzerliğidir.
+    'quantized' ise ek olarak satır bazında ölçeklenmiş int8 kopyası RAM'de
+    tutulur: önce int8 üzerinde kaba tarama yapılır, en iyi
+    'k * rescore_factor' aday float32 vektörlerle yeniden puanlanır.
+
+    Skorlar Neo4j vektör indexiyle aynı ölçektedir: (1 + kosinüs) / 2.
+
+    Satır başına chunk'ın kurumu ve belge türü de saklanır; 'filter_mask'
+    bunlardan kapsamlı arama için 'search'e verilecek maskeyi üretir.
+
+    'generation', indexin dışa aktarıldığı andaki graf nesil sayacıdır; sorgu
+    tarafı bunu graf ile karşılaştırarak diskteki güncel indexi yeniden yükler.
+    """
+    def __init__(self, path: str, chunk_ids: List[str], vectors: np.ndarray,
+                 quantized: Optional[np.ndarray] = None, scales: Optional[np.ndarray] = None,
+                 rescore_factor: int = VECTOR_STORE_RESCORE_FACTOR,
+                 kurumlar: Optional[Sequence[Optional[str]]] = None,
+                 turler: Optional[Sequence[Optional[str]]] = None,
+                 generation: Optional[int] = None):
+        self.path = path
+        self.chunk_ids = chunk_ids
+        self.vectors = vectors
+        self.quantized = quantized
+        self.scales = scales
+        self.rescore_factor = max(1, rescore_factor)
+        self.kurumlar = np.asarray(kurumlar, dtype=object) if kurumlar is not None else None
+        self.turler = np.asarray(turler, dtype=object) if turler is not None else None
+        self.generation = generation
+        self._scope_warned = False
+        self._loaded_mtime = self._meta_mtime(path)
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    @staticmethod
+    def _meta_mtime(path: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(os.path.join(path, _META_FILE))
+        except OSError:
+            return None
+
+    def changed_on_disk(self) -> bool:
+        """Index yüklendikten sonra aynı konuma yeniden yazıldı mı (export_vectors.py / main_ingest.py)."""
+        return self._meta_mtime(self.path) != self._loaded_mtime
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @classmethod
+    def build(cls, path: str, chunk_ids: List[str], embeddings,
+              quantize: bool = VECTOR_STORE_QUANTIZE,
+              kurumlar: Optional[Sequence[Optional[str]]] = None,
+              turler: Optional[Sequence[Optional[str]]] = None,
+              generation: Optional[int] = None) -> "LocalVectorIndex":
+        """
+        Embedding'leri normalize edip diske yazar ve indexi açar ('kurumlar'/'turler':
+        satır başına kapsam, 'generation': kaynak grafın nesil sayacı).
+        """
+        os.makedirs(path, exist_ok=True)
+        if len(chunk_ids):
+            matrix = cls._normalize(np.asarray(embeddings, dtype=np.float32).reshape(len(chunk_ids), -1))
+        else:
+            # Boş graf: yalnızca boş meta yazılır, load() boş index döndürür
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        # Çalışan süreç bu dosyaları memory-map ile okuyor olabilir: yerinde kesilip
+        # yeniden yazılmaz, geçici dosyaya yazılıp atomik olarak değiştirilir (meta en son)
+        _write_atomic(os.path.join(path, _VECTORS_FILE), matrix.astype(np.float32).tofile)
+
+        if quantize and len(chunk_ids):
+            scales = np.abs(matrix).max(axis=1)
+            scales[scales == 0] = 1.0
+            quantized = np.round(matrix / scales[:, None] * 127).astype(np.int8)
+            _write_atomic(os.path.join(path, _QUANTIZED_FILE), quantized.tofile)
+            _write_atomic(os.path.join(path, _SCALES_FILE), (scales / 127).astype(np.float32).tofile)
+
+        meta = {
+            "dim": int(matrix.shape[1]) if len(chunk_ids) else 0,
+            "quantized": bool(quantize),
+            "chunk_ids": list(chunk_ids),
+            "kurumlar": list(kurumlar) if kurumlar is not None else None,
+            "turler": list(turler) if turler is not None else None,
+            "nesil": generation,
+        }
+
+        def write_meta(meta_path: str):
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        _write_atomic(os.path.join(path, _META_FILE), write_meta)
+        return cls.load(path)
+
+    @classmethod
+    def load(cls, path: str = VECTOR_STORE_PATH,
+             rescore_factor: int = VECTOR_STORE_RESCORE_FACTOR) -> "LocalVectorIndex":
+        with open(os.path.join(path, _META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        chunk_ids, dim = meta["chunk_ids"], meta["dim"]
+        shape = (len(chunk_ids), dim)
+        kurumlar, turler, generation = meta.get("kurumlar"), meta.get("turler"), meta.get("nesil")
+        if not chunk_ids:
+            return cls(path, [], np.zeros((0, 0), dtype=np.float32), rescore_factor=rescore_factor,
+                       kurumlar=kurumlar, turler=turler, generation=generation)
+
+        vectors = np.memmap(os.path.join(path, _VECTORS_FILE), dtype=np.float32, mode="r", shape=shape)
+        quantized = scales = None
+        if meta.get("quantized"):
+            quantized = np.fromfile(os.path.join(path, _QUANTIZED_FILE), dtype=np.int8).reshape(shape)
+            scales = np.fromfile(os.path.join(path, _SCALES_FILE), dtype=np.float32)
+        return cls(path, chunk_ids, vectors, quantized, scales, rescore_factor, kurumlar, turler, generation)
+
+    def filter_mask(self, filters: RetrievalFilter) -> Optional[np.ndarray]:
+        """
+        Filtreye uyan satırlar için bool maske. Filtre boşsa ya da index kapsam
+        bilgisi olmadan (eski sürümle) kurulmuşsa None döner: arama filtresiz yapılır.
+        """
+        if not filters:
+            return None
+        if self.kurumlar is None or self.turler is None:
+            if self._scope_warned:
+                return None
+            self._scope_warned = True
+            print("[!] Yerel vektör indexinde kurum/tür bilgisi yok, filtre uygulanamıyor "
+                  "(export_vectors.py ile yeniden oluşturun).")
+            return None
+        mask = np.ones(len(self), dtype=bool)
+        if filters.kurumlar:
+            mask &= np.isin(self.kurumlar, list(filters.kurumlar))
+        if filters.turler:
+            mask &= np.isin(self.turler, list(filters.turler))
+        return mask
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), _SEARCH_BLOCK_ROWS):
+            block = self.quantized[start:start + _SEARCH_BLOCK_ROWS].astype(np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores * self.scales
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        if k >= len(scores):
+            return np.argsort(-scores)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        return candidates[np.argsort(-scores[candidates])]
+
+    def search(self, query_embedding, k: int, mask: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """
+        En benzer 'k' chunk'ı [(chunk_id, skor)] olarak döndürür.
+        'mask' (bool dizisi) verilirse yalnızca True olan satırlar aranır.
+        """
+        if not len(self) or k <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        if self.quantized is not None:
+            approximate = self._approximate_scores(query)
+            if mask is not None:
+                approximate[~mask] = -np.inf
+            candidates = self._top_k(approximate, min(len(self), k * self.rescore_factor))
+            # Adayları tam float32 vektörlerle yeniden puanla (memmap'ten sıralı okuma)
+            candidates = np.sort(candidates[np.isfinite(approximate[candidates])])
+            exact = np.asarray(self.vectors[candidates]) @ query
+            order = self._top_k(exact, k)
+            rows, cosines = candidates[order], exact[order]
+        else:
+            scores = np.asarray(self.vectors) @ query
+            if mask is not None:
+                scores[~mask] = -np.inf
+            rows = self._top_k(scores, k)
+            rows = rows[np.isfinite(scores[rows])]
+            cosines = scores[rows]
+
+        return [(self.chunk_ids[row], float((1.0 + cosine) / 2.0)) for row, cosine in zip(rows, cosines)]
+
+
+def export_from_neo4j(driver, path: str = VECTOR_STORE_PATH,
+                      quantize: bool = VECTOR_STORE_QUANTIZE) -> LocalVectorIndex:
+    """Neo4j'deki tüm CHUNK embedding'lerini okuyup yerel vektör indexini (yeniden) kurar."""
+    chunk_ids, embeddings, kurumlar, turler = [], [], [], []
+    # Nesil okumadan önce alınır: dışa aktarım sırasında yazılan belgeler bir sonraki
+    # kontrolde indexi yine eski gösterir
+    generation = read_graph_generation(driver)
+    with driver.session(database=NEO4J_DATABASE) as session:
+        for record in session.run(EXPORT_EMBEDDINGS_CYPHER):
+            chunk_ids.append(record["chunk_id"])
+            embeddings.append(np.asarray(record["embedding"], dtype=np.float32))
+            kurumlar.append(record["kurum"])
+            turler.append(record["tur"])
+    matrix = np.vstack(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+    index = LocalVectorIndex.build(path, chunk_ids, matrix, quantize=quantize,
+                                   kurumlar=kurumlar, turler=turler, generation=generation)
+    print(f"Yerel vektör indexi '{path}' konumuna yazıldı: {len(index)} chunk"
+          f"{' (int8 nicemleme ile)' if quantize else ''}.")
+    return index